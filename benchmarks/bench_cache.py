@@ -0,0 +1,58 @@
+"""
+`/oncall ls` reads (rotation by date, current and next shifts) over SQLite: uncached vs shift reads cached
+in-process, and in Redis if REDIS_URL is set. Requests move through the day, as `now` does.
+
+    PYTHONPATH=src python benchmarks/bench_cache.py
+    REDIS_URL=redis://localhost:6379/0 PYTHONPATH=src python benchmarks/bench_cache.py
+"""
+
+import datetime as dt
+import os
+import time
+
+from sqlmodel import SQLModel
+
+from models import Rotation, Schedule, Temporal
+from service.oncall import OncallService
+from store.cache_mem import InMemoryCacheBackend
+from store.cache_redis import RedisCacheBackend
+from store.factory import CachingStoreFactory, SQLStoreFactory, StoreFactory
+from store.sa import create_sa_engine
+
+START = dt.datetime(2025, 1, 1)
+REQUESTS = 2000
+
+
+def ls(factory: StoreFactory) -> None:
+    svc = OncallService(factory)
+    for i in range(REQUESTS):
+        # a request every ~43s over a day
+        now = (START + dt.timedelta(days=30, seconds=i * 43)).replace(tzinfo=dt.UTC)
+        rotation = svc.get_rotation(now)
+        svc.get_shifts(now, rotation=rotation)
+
+
+def bench(name: str, factory: StoreFactory) -> None:
+    ls(factory)
+    start = time.perf_counter()
+    ls(factory)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed / REQUESTS * 1e6:8.0f}us/request")
+
+
+if __name__ == "__main__":
+    engine = create_sa_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    sql = SQLStoreFactory(engine)
+    OncallService(sql).create_rotation(
+        Rotation(
+            schedule=Schedule(each=1, temporal=Temporal.day),
+            fighters=[f"U{i}" for i in range(12)],
+            start_date=START,
+        )
+    )
+
+    bench("uncached", sql)
+    bench("mem", CachingStoreFactory(sql, InMemoryCacheBackend(300, 10_000)))
+    if url := os.environ.get("REDIS_URL"):
+        bench("redis", CachingStoreFactory(sql, RedisCacheBackend(url, 300)))
@@ -0,0 +1,58 @@
+"""
+Effective on-call set of layered rotations over 90 days: one sweep over all layers vs a lookup per layer
+at every shift boundary (bisect each layer, the per-instant approach of get_by_date/find).
+
+    PYTHONPATH=src python benchmarks/bench_layers.py
+"""
+
+import bisect
+import datetime as dt
+import time
+from collections.abc import Callable, Sequence
+
+from layers import sweep
+from models import Shift
+
+START = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+DAYS = 90
+
+
+def layer(n: int) -> list[Shift]:
+    """Daily shifts, offset per layer so boundaries don't coincide."""
+    offset = dt.timedelta(minutes=7 * n)
+    return [
+        Shift(
+            firefighter=f"U{n}-{day % 5}",
+            start_date=START + offset + dt.timedelta(days=day),
+            end_date=START + offset + dt.timedelta(days=day + 1),
+        )
+        for day in range(DAYS)
+    ]
+
+
+def lookups(layers: Sequence[Sequence[Shift]]) -> list[tuple[Shift | None, ...]]:
+    boundaries = sorted({s.start_date for shifts in layers for s in shifts})
+    starts = [[s.start_date for s in shifts] for shifts in layers]
+
+    def find(i: int, t: dt.datetime) -> Shift | None:
+        j = bisect.bisect_right(starts[i], t) - 1
+        return layers[i][j] if j >= 0 and t < layers[i][j].end_date else None
+
+    return [tuple(find(i, t) for i in range(len(layers))) for t in boundaries]
+
+
+def bench(name: str, fn: Callable[[], object], n: int = 3) -> None:
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    print(f"{name:<28} {(time.perf_counter() - start) / n * 1000:10.2f}ms")
+
+
+if __name__ == "__main__":
+    for n_layers in [2, 10, 100, 1000]:
+        layers = [layer(n) for n in range(n_layers)]
+        bench(f"sweep {n_layers} layers", lambda: sweep(layers))
+        # quadratic, skipped for many layers
+        if n_layers <= 100:
+            bench(f"lookups {n_layers} layers", lambda: lookups(layers))
@@ -0,0 +1,71 @@
+"""
+Per-request logging cost: eager f-string/json body logging vs lazy, sampled logging.
+
+    PYTHONPATH=src python benchmarks/bench_logging.py
+"""
+
+import datetime as dt
+import io
+import json
+import logging
+import timeit
+
+from logs import BodySampler, StructuredMessage
+from models import Shift
+
+N = 2_000
+
+# trimmed `view_submission` payload, real ones are ~5-10KB
+body = {
+    "type": "view_submission",
+    "team": {"id": "T0000000", "domain": "bob"},
+    "user": {"id": "U0000000", "username": "spongebob", "team_id": "T0000000"},
+    "view": {
+        "id": "V0000000",
+        "callback_id": "view-oncall-create",
+        "blocks": [{"type": "input", "block_id": f"block_{i}"} for i in range(20)],
+        "state": {
+            "values": {
+                "fighters_block": {
+                    "fighters_select": {
+                        "selected_users": [f"U{i:07}" for i in range(10)]
+                    }
+                }
+            }
+        },
+    },
+}
+shifts = [
+    Shift(
+        firefighter=f"U{i:07}",
+        start_date=dt.datetime(2025, 1, 1) + dt.timedelta(days=i),
+        end_date=dt.datetime(2025, 1, 2) + dt.timedelta(days=i),
+    )
+    for i in range(250)
+]
+
+logger = logging.getLogger("bench")
+logger.addHandler(logging.StreamHandler(io.StringIO()))
+logger.setLevel(logging.INFO)
+logger.propagate = False
+sample_body = BodySampler(0.0)
+
+
+def eager() -> None:
+    logger.info(body)
+    logger.info(f"{json.dumps(body)=}")
+    for shift in shifts:
+        logger.debug(f"create {shift=}")
+
+
+def lazy() -> None:
+    if sample_body() or logger.isEnabledFor(logging.DEBUG):
+        logger.info(StructuredMessage("request", body=body))
+    for shift in shifts:
+        logger.debug("create shift=%s", shift)
+
+
+if __name__ == "__main__":
+    for name, fn in [("eager", eager), ("lazy", lazy)]:
+        sec = timeit.timeit(fn, number=N)
+        print(f"{name:>6}: {sec / N * 1e6:10.1f} us/request")
@@ -0,0 +1,103 @@
+"""
+Parse view-oncall-create submission: lens focus chains (previous main.view_submission) vs pydantic TypeAdapter.
+
+    PYTHONPATH=src python benchmarks/bench_payloads.py
+"""
+
+import datetime as dt
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from lenses import lens
+
+from models import Allocation, Rotation, Schedule, Temporal
+from payloads import CreateRotationSubmission, create_rotation_submission
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from tests.test_payloads import BODY  # noqa: E402
+
+
+def parse_lenses(body: dict[str, Any]) -> tuple[Any, ...]:
+    values_focus = lens.Get("view").Get("state").Get("values")
+    option_val = lens.Get("selected_option").Get("value")
+    schedule_focus = values_focus & lens.Get("schedule_block")
+
+    each = (
+        body & (schedule_focus & lens["schedule_each_select"] & option_val).F(int).get()
+    )
+    temporal = (
+        body
+        & (schedule_focus & lens["schedule_temporal_select"] & option_val)
+        .F(Temporal)
+        .get()
+    )
+    allocation = (
+        body
+        & (schedule_focus & lens["schedule_allocation_select"] & option_val)
+        .F(Allocation)
+        .get()
+    )
+    horizon_weeks = (
+        body
+        & (schedule_focus & lens["schedule_horizon_select"] & option_val).F(int).get()
+    )
+    fighters_select = (
+        body & (values_focus & lens["fighters_block"]["fighters_select"]).get()
+    )
+    users = fighters_select.get("selected_users") or [
+        o["value"] for o in fighters_select.get("selected_options", [])
+    ]
+    start_date = (
+        body
+        & (
+            values_focus & lens["start_end_block"]["start_date_select"]["selected_date"]
+        ).get()
+    )
+    start_time_focus = lens["start_end_block"]["start_time_select"]
+    start_time = body & (values_focus & start_time_focus & lens["selected_time"]).get()
+    start_time_tz = body & (values_focus & start_time_focus & lens["timezone"]).get()
+
+    return (
+        Schedule(each=each, temporal=temporal),
+        users,
+        dt.datetime.fromisoformat(f"{start_date}T{start_time}"),
+        start_time_tz,
+        allocation,
+        horizon_weeks or None,
+    )
+
+
+def parse_adapter(body: dict[str, Any]) -> CreateRotationSubmission:
+    return create_rotation_submission.validate_python(body)
+
+
+def to_rotation(values: tuple[Any, ...]) -> Rotation:
+    schedule, fighters, start_date, timezone, allocation, horizon_weeks = values
+    return Rotation(
+        schedule=schedule,
+        fighters=fighters,
+        start_date=start_date,
+        timezone=timezone,
+        allocation=allocation,
+        horizon_weeks=horizon_weeks,
+    )
+
+
+def bench(name: str, parse: Callable[[dict[str, Any]], object], n: int) -> None:
+    start = time.perf_counter()
+    for _ in range(n):
+        parse(BODY)
+    print(
+        f"{name:<12} {(time.perf_counter() - start) / n * 1e6:8.1f}µs per submission (extraction only)"
+    )
+
+
+if __name__ == "__main__":
+    # Rotation construction (same for both) is left out, it's dominated by Config() default factories
+    lensed, adapted = to_rotation(parse_lenses(BODY)), parse_adapter(BODY).to_rotation()
+    assert lensed.model_dump(exclude={"id"}) == adapted.model_dump(exclude={"id"})
+    bench("lenses", parse_lenses, 2_000)
+    bench("TypeAdapter", parse_adapter, 2_000)
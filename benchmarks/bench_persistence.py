@@ -0,0 +1,128 @@
+"""
+Building and persisting a year of daily shifts: validated model round trips (model_dump -> ORM model_validate,
+session per shift), the same ORM models added in a single session, and plain insert parameters in one executemany.
+Time, and peak traced memory with tracemalloc.
+
+    PYTHONPATH=src python benchmarks/bench_persistence.py
+"""
+
+import datetime as dt
+import functools
+import itertools
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from sqlalchemy import Engine
+from sqlmodel import Session, SQLModel
+
+from models import Rotation, RotationORM, Schedule, Shift, ShiftORM, Temporal
+from service.oncall import OncallService
+from store.factory import InMemoryStoreFactory, SQLStoreFactory
+from store.rotation_sql import SQLAlchemyRotationStore
+from store.sa import create_sa_engine
+from store.shift_sql import SQLAlchemyShiftStore
+
+START = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+DAYS = 365
+ROTATION = Rotation(
+    id="bench",
+    schedule=Schedule(each=1, temporal=Temporal.day),
+    fighters=[f"U{i}" for i in range(12)],
+    start_date=START.replace(tzinfo=None),
+)
+BOUNDS = [START + dt.timedelta(days=i) for i in range(DAYS + 1)]
+
+
+def new_shifts() -> list[Shift]:
+    return [
+        Shift(firefighter="U1", start_date=start, end_date=end)
+        for start, end in zip(BOUNDS, BOUNDS[1:])
+    ]
+
+
+def model_round_trips(engine: Engine, rotation_id: str) -> Callable[[], None]:
+    """Previous SQL persistence: ORM models validated from dumps, a session per shift."""
+    rotation = ROTATION.model_copy(update={"id": rotation_id})
+
+    def persist() -> None:
+        with Session(engine) as session:
+            session.add(RotationORM.model_validate(rotation.model_dump()))
+            session.commit()
+        for shift in new_shifts():
+            shift_orm = ShiftORM.model_validate(
+                shift.model_dump() | {"rotation_id": rotation.id}
+            )
+            with Session(engine) as session:
+                session.add(shift_orm)
+                session.commit()
+
+    return persist
+
+
+def orm_single_session(engine: Engine, rotation_id: str) -> Callable[[], None]:
+    """Fair ORM baseline: the same validated models, added in one session and committed once."""
+    rotation = ROTATION.model_copy(update={"id": rotation_id})
+
+    def persist() -> None:
+        with Session(engine) as session:
+            session.add(RotationORM.model_validate(rotation.model_dump()))
+            session.add_all(
+                ShiftORM.model_validate(
+                    shift.model_dump() | {"rotation_id": rotation.id}
+                )
+                for shift in new_shifts()
+            )
+            session.commit()
+
+    return persist
+
+
+def insert_params(engine: Engine, rotation_id: str) -> Callable[[], None]:
+    rotation = ROTATION.model_copy(update={"id": rotation_id})
+
+    def persist() -> None:
+        SQLAlchemyRotationStore(engine).create(rotation)
+        SQLAlchemyShiftStore(rotation, engine).create_many(new_shifts())
+
+    return persist
+
+
+def measure(name: str, setup: Callable[[], Callable[[], object]], n: int = 5) -> None:
+    """`setup` returns a fresh function per run, so each run inserts new rows."""
+    runs = [setup() for _ in range(n + 2)]
+    runs.pop()()  # warm up
+    start = time.perf_counter()
+    for fn in runs[1:]:
+        fn()
+    elapsed = (time.perf_counter() - start) / n
+
+    tracemalloc.start()
+    runs[0]()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<36} {elapsed * 1000:9.2f}ms {peak / 1024:9.0f}KiB peak")
+
+
+def sql_engine() -> Engine:
+    engine = create_sa_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+if __name__ == "__main__":
+    # unique rotation ids per run, shift ids are generated
+    ids = (f"r{i}" for i in itertools.count())
+    engine = sql_engine()
+    measure("sql model round trips", lambda: model_round_trips(engine, next(ids)))
+    measure("sql orm single session", lambda: orm_single_session(engine, next(ids)))
+    measure("sql insert params", lambda: insert_params(engine, next(ids)))
+
+    for factory in [InMemoryStoreFactory(), SQLStoreFactory(sql_engine())]:
+        svc = OncallService(factory)
+        measure(
+            f"{type(factory).__name__} create_rotation",
+            lambda: functools.partial(
+                svc.create_rotation, ROTATION.model_copy(update={"id": next(ids)})
+            ),
+        )
@@ -0,0 +1,62 @@
+"""
+On-call hours per firefighter, 10 rotations x 3 years of daily shifts: loading shifts into Python vs store aggregation.
+
+    PYTHONPATH=src python benchmarks/bench_report.py
+"""
+
+import datetime as dt
+import time
+from collections import defaultdict
+from collections.abc import Callable
+
+from sqlmodel import SQLModel
+
+from models import Rotation, Schedule, Temporal
+from service.oncall import OncallService, as_utc
+from store.factory import InMemoryStoreFactory, SQLStoreFactory, StoreFactory
+from store.sa import create_sa_engine
+
+START = dt.datetime(2022, 1, 1)
+ROTATIONS = [
+    Rotation(
+        id=f"bench{n}",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=[f"U{n}-{i}" for i in range(12)],
+        start_date=START,
+        end_date=START + dt.timedelta(days=3 * 365),
+    )
+    for n in range(10)
+]
+RANGE = (dt.datetime(2023, 1, 1, tzinfo=dt.UTC), dt.datetime(2024, 7, 1, tzinfo=dt.UTC))
+
+
+def loop(factory: StoreFactory) -> dict[str, dt.timedelta]:
+    totals: dict[str, dt.timedelta] = defaultdict(dt.timedelta)
+    lo, hi = RANGE
+    for rotation in factory.rotation().list(lo, hi):
+        for s in factory.shifts(rotation).list():
+            start, end = max(as_utc(s.start_date), lo), min(as_utc(s.end_date), hi)
+            if start < end:
+                totals[s.firefighter] += end - start
+    return totals
+
+
+def bench(name: str, fn: Callable[[], object], n: int = 20) -> None:
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    print(f"{name:<24} {(time.perf_counter() - start) / n * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    engine = create_sa_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    for factory in [InMemoryStoreFactory(), SQLStoreFactory(engine)]:
+        svc = OncallService(factory)
+        for rotation in ROTATIONS:
+            svc.create_rotation(rotation)
+        impl = type(factory).__name__
+        assert svc.report(*RANGE) == dict(loop(factory))
+        bench(f"{impl} loop", lambda: loop(factory), n=3)
+        bench(f"{impl} report", lambda: svc.report(*RANGE))
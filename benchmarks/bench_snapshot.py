@@ -0,0 +1,61 @@
+"""
+Snapshot/restore of the in-memory store with a large history: 200 rotations x 2 years of daily shifts.
+
+    PYTHONPATH=src python benchmarks/bench_snapshot.py
+"""
+
+import datetime as dt
+from collections.abc import Callable
+import tempfile
+import time
+from pathlib import Path
+
+from models import Rotation, Schedule, Temporal
+from service.oncall import OncallService
+from store.factory import InMemoryStoreFactory
+
+ROTATIONS = 200
+
+
+def build() -> InMemoryStoreFactory:
+    factory = InMemoryStoreFactory()
+    svc = OncallService(factory)
+    for i in range(ROTATIONS):
+        start = dt.datetime(2024, 1, 1, 9) + dt.timedelta(days=i)
+        svc.create_rotation(
+            Rotation(
+                schedule=Schedule(each=1, temporal=Temporal.day),
+                fighters=[f"U{i}-{n}" for n in range(8)],
+                start_date=start,
+                end_date=start + dt.timedelta(days=730),
+            )
+        )
+    return factory
+
+
+def timed(name: str, fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed * 1000:9.1f}ms")
+    return elapsed
+
+
+if __name__ == "__main__":
+    factory = build()
+    rotations = factory.rotation().list()
+    shifts = sum(len(factory.shifts(r).list()) for r in rotations)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bob.snapshot"
+        print(f"{len(rotations)} rotations, {shifts} shifts")
+        timed("save", lambda: factory.save(path))
+        print(f"{'size':<28} {path.stat().st_size / 2**20:9.1f}MB")
+
+        restored = InMemoryStoreFactory()
+        timed("restore (boot)", lambda: restored.restore(path))
+        timed("first access, 1 rotation", lambda: restored.shifts(rotations[0]).list())
+        timed(
+            "first access, all rotations",
+            lambda: [restored.shifts(r).list() for r in rotations],
+        )
@@ -0,0 +1,54 @@
+"""
+Render 1k shifts across 50 timezones: per-field pytz lookups vs cached formatter.
+
+    PYTHONPATH=src python benchmarks/bench_timezones.py
+"""
+
+import datetime as dt
+import time
+import zoneinfo
+from collections.abc import Callable
+
+import pytz
+
+from config import Config
+from timezones import date_formatter
+
+SHIFTS = [dt.datetime(2025, 1, 1, 9) + dt.timedelta(hours=8 * i) for i in range(1000)]
+TIMEZONES = sorted(zoneinfo.available_timezones())[::10][:50]
+
+
+def convert_date(dt: dt.datetime, tz: str) -> str:
+    # previous main.convert_date
+    return (
+        pytz.utc.localize(dt)
+        .astimezone(pytz.timezone(tz))
+        .strftime(Config().view.shift_datetime_format)
+    )
+
+
+def convert_date_no_config(dt: dt.datetime, tz: str) -> str:
+    return pytz.utc.localize(dt).astimezone(pytz.timezone(tz)).strftime(FMT)
+
+
+FMT = Config().view.shift_datetime_format
+
+
+def bench(name: str, render: Callable[[str], list[str]], shifts: int) -> None:
+    start = time.perf_counter()
+    for tz in TIMEZONES:
+        render(tz)
+    sec = time.perf_counter() - start
+    n = shifts * len(TIMEZONES)
+    print(f"{name:>16}: {sec * 1e3:9.1f} ms ({sec / n * 1e6:.2f} us/shift)")
+
+
+if __name__ == "__main__":
+    # Config() is parsed from env per field, sample 10 shifts to keep it short
+    bench("convert_date", lambda tz: [convert_date(s, tz) for s in SHIFTS[:10]], 10)
+    bench("pytz", lambda tz: [convert_date_no_config(s, tz) for s in SHIFTS], 1000)
+    bench(
+        "date_formatter",
+        lambda tz: list(map(date_formatter(tz, FMT), SHIFTS)),
+        1000,
+    )
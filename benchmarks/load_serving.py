@@ -0,0 +1,71 @@
+"""
+Throughput of Bolt's development server (BOB_MODE=http) vs gunicorn workers (BOB_MODE=wsgi), see load_slack.
+
+    PYTHONPATH=src:. python benchmarks/load_serving.py -n 300 -c 8 --workers 1 4
+
+Each server is started as `python src/main.py` over a shared SQLite file, Slack Web API is a local stub.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from load_slack import SIGNING_SECRET, load, post, slack_stub, wait_ready
+
+PORT = 3300
+MAIN = Path(__file__).parent.parent / "src" / "main.py"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=200, help="requests per handler")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--handlers", nargs="+", default=["/oncall ls", "app_mention"])
+    args = parser.parse_args()
+
+    stub = slack_stub(0)
+    servers = [("dev", {"BOB_MODE": "http"})] + [
+        (f"wsgi{n}", {"BOB_MODE": "wsgi", "BOB_SERVER__WORKERS": str(n)})
+        for n in args.workers
+    ]
+    print(
+        f"{'server':<6} {'handler':<16} {'n':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+        flush=True,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, server_env in servers:
+            env = os.environ | server_env
+            env |= {
+                "SLACK_BOT_TOKEN": "xoxb-load",
+                "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+                "BOB_PORT": str(PORT),
+                "BOB_IMPL": "sql",
+                "BOB_SQL__URL": f"sqlite:///{tmp}/{name}.db",
+                "BOB_SLACK__API_URL": stub.base_url,
+                "BOB_LOG__LEVEL": "ERROR",
+            }
+            app = subprocess.Popen(
+                [sys.executable, str(MAIN)],
+                env=env,
+                # errors only (BOB_LOG__LEVEL) and server lifecycle
+                stdout=subprocess.DEVNULL,
+            )
+            try:
+                url = f"http://127.0.0.1:{PORT}/slack/events"
+                wait_ready(url)
+                load(post(url), name, stub.base_url, args)
+            finally:
+                # graceful shutdown, in-flight requests are finished
+                app.send_signal(signal.SIGTERM)
+                app.wait(timeout=60)
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Load test: signed Slack payloads replayed against the Bolt app, Slack Web API replaced by a local stub.
+Reports throughput and p50/p95/p99 latency per handler and store backend.
+
+    PYTHONPATH=src:. python benchmarks/load_slack.py -n 500 -c 8 --impl mem sql
+
+Requests go through `app.dispatch` in-process (signature check, middleware, listeners - same path as
+the HTTP adapter, without the server). Listeners run before the response (`BOB_SLACK__PROCESS_BEFORE_RESPONSE`),
+so latency covers handler work, not just the ack.
+
+Against a running HTTP-mode app (backend as configured there):
+
+    PYTHONPATH=src:. python benchmarks/load_slack.py --stub-port 3100 --url http://127.0.0.1:3000/slack/events
+    # waits for the app started with the stub as Web API
+    SLACK_BOT_TOKEN=xoxb-load SLACK_SIGNING_SECRET=load-secret BOB_MODE=http \\
+        BOB_SLACK__API_URL=http://127.0.0.1:3100/api/ python src/main.py
+
+Limit CPU like the container does to get per-container numbers, ie `docker run --cpus=0.5` or `taskset -c 0`.
+"""
+
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlencode
+
+from slack_sdk.signature import SignatureVerifier
+
+from tests.slack_stub import SlackStub, ok
+
+SIGNING_SECRET = "load-secret"
+TEAM = "T1"
+CHANNEL = "C1"
+USERS = [f"U{i}" for i in range(20)]
+# unique event/view/trigger ids across runs, duplicates are short-circuited by dedup
+SEQ = itertools.count()
+
+# (request number, stub base url) -> (raw body, content type)
+Payload = Callable[[int, str], tuple[str, str]]
+
+
+def command(text: str) -> Payload:
+    def payload(n: int, base_url: str) -> tuple[str, str]:
+        body = {
+            "command": "/oncall",
+            "text": text,
+            "team_id": TEAM,
+            "channel_id": CHANNEL,
+            "user_id": USERS[n % len(USERS)],
+            "trigger_id": f"load-{text}-{n}",
+            "response_url": f"{base_url}respond",
+        }
+        return urlencode(body), "application/x-www-form-urlencoded"
+
+    return payload
+
+
+def mention(n: int, base_url: str) -> tuple[str, str]:
+    body = {
+        "type": "event_callback",
+        "team_id": TEAM,
+        "api_app_id": "A1",
+        "event_id": f"EvLoad{n}",
+        "event": {
+            "type": "app_mention",
+            "user": USERS[n % len(USERS)],
+            "text": "<@UBOB> who is on call?",
+            "ts": f"{n}.0",
+            "channel": CHANNEL,
+        },
+    }
+    return json.dumps(body), "application/json"
+
+
+def submission(n: int, base_url: str) -> tuple[str, str]:
+    def select(value: str) -> dict[str, Any]:
+        return {"selected_option": {"value": value}}
+
+    body = {
+        "type": "view_submission",
+        "team": {"id": TEAM},
+        "user": {"id": USERS[n % len(USERS)], "team_id": TEAM},
+        "api_app_id": "A1",
+        "trigger_id": f"load-submit-{n}",
+        "view": {
+            "id": f"VLoad{n}",
+            "type": "modal",
+            "callback_id": "view-oncall-create",
+            "state": {
+                "values": {
+                    "fighters_block": {
+                        "fighters_select": {"selected_users": USERS[:5]}
+                    },
+                    "schedule_block": {
+                        "schedule_each_select": select("1"),
+                        "schedule_temporal_select": select("day"),
+                        "schedule_allocation_select": select("round_robin"),
+                        "schedule_horizon_select": select("4"),
+                    },
+                    "start_end_block": {
+                        "start_date_select": {
+                            "selected_date": dt.date.today().isoformat()
+                        },
+                        "start_time_select": {
+                            "selected_time": "09:00",
+                            "timezone": "America/New_York",
+                        },
+                    },
+                }
+            },
+        },
+    }
+    return urlencode({"payload": json.dumps(body)}), "application/x-www-form-urlencoded"
+
+
+SCENARIOS: dict[str, Payload] = {
+    "/oncall ls": command("ls"),
+    "/oncall report": command("report"),
+    "/oncall create": command("create"),
+    "app_mention": mention,
+    "view_submission": submission,
+}
+
+
+def slack_stub(port: int) -> SlackStub:
+    stub = SlackStub(port=port)
+    stub.route(
+        "auth.test",
+        ok({"team_id": TEAM, "user_id": "UBOB", "bot_id": "BBOB", "url": ""}),
+    )
+    stub.route(
+        "users.info",
+        lambda params: (
+            200,
+            {},
+            {"ok": True, "user": {"id": params["user"], "tz": "Europe/Berlin"}},
+        ),
+    )
+    stub.route("views.open", ok({"view": {"id": "V1", "hash": "1.0"}}))
+    stub.route(
+        "conversations.members",
+        ok({"members": USERS, "response_metadata": {"next_cursor": ""}}),
+    )
+    return stub.start()
+
+
+def signed_headers(body: str, content_type: str) -> dict[str, str]:
+    ts = str(int(time.time()))
+    signature = SignatureVerifier(SIGNING_SECRET).generate_signature(
+        timestamp=ts, body=body
+    )
+    assert signature
+    return {
+        "content-type": content_type,
+        "x-slack-request-timestamp": ts,
+        "x-slack-signature": signature,
+    }
+
+
+# (raw body, headers) -> status
+Send = Callable[[str, dict[str, str]], int]
+
+
+def dispatch() -> Send:
+    from slack_bolt import BoltRequest
+
+    from main import app
+
+    def send(body: str, headers: dict[str, str]) -> int:
+        request_headers: dict[str, str | Sequence[str]] = dict(headers)
+        response = app.dispatch(BoltRequest(body=body, headers=request_headers))
+        status: int = response.status
+        return status
+
+    return send
+
+
+def post(url: str) -> Send:
+    def send(body: str, headers: dict[str, str]) -> int:
+        req = urllib.request.Request(url, data=body.encode(), headers=headers)
+        with urllib.request.urlopen(req) as res:
+            res.read()
+            return int(res.status)
+
+    return send
+
+
+def wait_ready(url: str, timeout: float = 60) -> None:
+    """Wait for the app to listen, it verifies the token against the stub on start."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(urllib.request.Request(url, data=b""))
+            return
+        except urllib.error.HTTPError:
+            # unsigned request is rejected, but the app is up
+            return
+        except urllib.error.URLError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def run(
+    send: Send, payload: Payload, base_url: str, n: int, concurrency: int
+) -> tuple[float, list[float]]:
+    """Send n requests from `concurrency` threads, total seconds and per request latencies."""
+
+    def one(_: int) -> float:
+        body, content_type = payload(next(SEQ), base_url)
+        headers = signed_headers(body, content_type)
+        start = time.perf_counter()
+        status = send(body, headers)
+        elapsed = time.perf_counter() - start
+        if status != 200:
+            raise RuntimeError(f"unexpected status {status}")
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(one, range(n)))
+    return time.perf_counter() - start, latencies
+
+
+def report(backend: str, handler: str, total: float, latencies: list[float]) -> None:
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    p50, p95, p99 = (q[i] * 1000 for i in (49, 94, 98))
+    print(
+        f"{backend:<6} {handler:<16} {len(latencies):>6} {len(latencies) / total:>9.1f}"
+        f" {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}"
+    )
+
+
+def load(send: Send, backend: str, base_url: str, args: argparse.Namespace) -> None:
+    # a rotation to list/report/mention, and warm-up of imports and caches
+    run(send, submission, base_url, 1, 1)
+    for handler in args.handlers:
+        payload = SCENARIOS[handler]
+        run(send, payload, base_url, min(args.n, 10), args.concurrency)
+        total, latencies = run(send, payload, base_url, args.n, args.concurrency)
+        report(backend, handler, total, latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=200, help="requests per handler")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--impl", nargs="+", default=["mem", "sql"])
+    parser.add_argument("--handlers", nargs="+", default=list(SCENARIOS))
+    parser.add_argument(
+        "--sql-url", help="BOB_SQL__URL, a temporary SQLite file if not set"
+    )
+    parser.add_argument("--stub-port", type=int, default=0)
+    parser.add_argument("--url", help="post to a running HTTP-mode app instead")
+    # internal: load the app of this process, configured by the parent's env
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        load(dispatch(), args.backend, os.environ["BOB_SLACK__API_URL"], args)
+        return
+
+    stub = slack_stub(args.stub_port)
+    print(
+        f"{'store':<6} {'handler':<16} {'n':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+        flush=True,
+    )
+    if args.url:
+        print(
+            f"app is expected to run with SLACK_SIGNING_SECRET={SIGNING_SECRET} BOB_SLACK__API_URL={stub.base_url}",
+            file=sys.stderr,
+        )
+        wait_ready(args.url)
+        load(post(args.url), "remote", stub.base_url, args)
+    else:
+        # a process per backend: main wires the store (and dedup) from config at import
+        with tempfile.TemporaryDirectory() as tmp:
+            for backend in args.impl:
+                env = os.environ | {
+                    "SLACK_BOT_TOKEN": "xoxb-load",
+                    "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+                    "BOB_IMPL": backend,
+                    "BOB_SQL__URL": args.sql_url or f"sqlite:///{tmp}/{backend}.db",
+                    "BOB_SLACK__API_URL": stub.base_url,
+                    "BOB_SLACK__PROCESS_BEFORE_RESPONSE": "true",
+                    "BOB_LOG__LEVEL": "ERROR",
+                }
+                cmd = [sys.executable, __file__, "--backend", backend]
+                cmd += sys.argv[1:]
+                subprocess.run(cmd, env=env, check=True)
+
+    print(f"slack api calls: {dict(stub.calls)}", file=sys.stderr)
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
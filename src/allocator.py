@@ -0,0 +1,88 @@
+import datetime as dt
+import heapq
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from itertools import cycle
+from typing import assert_never
+
+from pydantic import BaseModel, Field
+
+from config import Config
+from models import Allocation
+
+HOUR = dt.timedelta(hours=1)
+
+
+class Allocator(BaseModel, ABC):
+    """Assign fighters to shift intervals (local, naive datetimes)."""
+
+    fighters: list[str]
+
+    @abstractmethod
+    def assign(
+        self, intervals: Iterable[tuple[dt.datetime, dt.datetime]]
+    ) -> Iterator[str]: ...
+
+    @classmethod
+    def apply(
+        cls,
+        allocation: Allocation,
+        fighters: list[str],
+        holidays: frozenset[dt.date] = frozenset(),
+    ) -> "Allocator":
+        match allocation:
+            case Allocation.round_robin:
+                return RoundRobinAllocator(fighters=fighters)
+            case Allocation.balanced:
+                return BalancedAllocator(fighters=fighters, holidays=holidays)
+            case _:
+                assert_never(allocation)
+
+
+class RoundRobinAllocator(Allocator):
+    def assign(
+        self, intervals: Iterable[tuple[dt.datetime, dt.datetime]]
+    ) -> Iterator[str]:
+        for _, fighter in zip(intervals, cycle(self.fighters)):
+            yield fighter
+
+
+class BalancedAllocator(Allocator):
+    """
+    Greedy assignment of each shift to the least loaded fighter, O(n log k) with a min-heap.
+    Load is the number of shift hours, weekend and holiday hours are weighted extra,
+    ties are resolved in favour of the fighter who waited longest (round-robin on equal load).
+    """
+
+    holidays: frozenset[dt.date] = frozenset()
+    weekend_weight: float = Field(
+        default_factory=lambda: Config().allocation.weekend_weight
+    )
+    holiday_weight: float = Field(
+        default_factory=lambda: Config().allocation.holiday_weight
+    )
+
+    def cost(self, start: dt.datetime, end: dt.datetime) -> float:
+        cost = 0.0
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            next_day = day + dt.timedelta(days=1)
+            hours = (min(end, next_day) - max(start, day)) / HOUR
+            if day.date() in self.holidays:
+                cost += hours * (1 + self.holiday_weight)
+            elif day.weekday() >= 5:
+                cost += hours * (1 + self.weekend_weight)
+            else:
+                cost += hours
+            day = next_day
+        return cost
+
+    def assign(
+        self, intervals: Iterable[tuple[dt.datetime, dt.datetime]]
+    ) -> Iterator[str]:
+        # (load, last assigned shift number, fighter position)
+        heap = [(0.0, i - len(self.fighters), i) for i in range(len(self.fighters))]
+        for n, (start, end) in enumerate(intervals):
+            load, _, i = heapq.heappop(heap)
+            heapq.heappush(heap, (load + self.cost(start, end), n, i))
+            yield self.fighters[i]
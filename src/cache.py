@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache with per-entry expiration."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def add(self, key: K, value: V) -> bool:
+        """Set value only if key is missing (or expired), returns whether it was set."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > self.clock():
+                return False
+            self._set(key, value)
+            return True
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _set(self, key: K, value: V) -> None:
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight(Generic[K, V]):
+    """Deduplicate concurrent calls with the same key: followers wait for the leader's result."""
+
+    def __init__(self) -> None:
+        self._calls: dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,58 @@
+import datetime
+import functools
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from config import Config
+
+CALENDAR_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class CalendarRegistry:
+    """
+    Holiday calendars loaded from `<path>/<calendar_id>.txt` files: one ISO date per line, `#` starts a comment.
+    Compiled business day offsets are cached by calendar id, so generating shifts for many rotations
+    doesn't re-read files and rebuild holiday tables (numpy.busdaycalendar) each time.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        # calendar id -> offset, ids are checked against the files so the caches stay small
+        self._calendars: dict[str, pd.offsets.CustomBusinessDay] = {}
+        self._holidays: dict[str, frozenset[datetime.date]] = {}
+
+    def ids(self) -> list[str]:
+        return sorted(p.stem for p in self.path.glob("*.txt"))
+
+    def get(self, calendar_id: str) -> pd.offsets.CustomBusinessDay:
+        if (calendar := self._calendars.get(calendar_id)) is not None:
+            return calendar
+        if not CALENDAR_ID.match(calendar_id):
+            raise ValueError(f"Invalid calendar id: {calendar_id!r}")
+
+        file = self.path / f"{calendar_id}.txt"
+        if not file.is_file():
+            raise ValueError(f"Calendar {calendar_id!r} not found in {self.path}")
+
+        holidays = [
+            datetime.date.fromisoformat(day)
+            for line in file.read_text().splitlines()
+            if (day := line.split("#", 1)[0].strip())
+        ]
+        calendar = pd.offsets.CustomBusinessDay(holidays=holidays)
+        self._calendars[calendar_id] = calendar
+        return calendar
+
+    def holidays(self, calendar_id: str) -> frozenset[datetime.date]:
+        if calendar_id not in self._holidays:
+            self._holidays[calendar_id] = frozenset(
+                pd.Timestamp(day).date() for day in self.get(calendar_id).holidays
+            )
+        return self._holidays[calendar_id]
+
+
+@functools.cache
+def calendar_registry() -> CalendarRegistry:
+    return CalendarRegistry(Config().calendar.path)
@@ -9,26 +9,161 @@ class Impl(StrEnum):
     sql = auto()
 
 
+class CacheImpl(StrEnum):
+    # process-local LRU
+    mem = auto()
+    # shared by replicas, Redis protocol
+    redis = auto()
+
+
 class SlackMode(StrEnum):
+    # Bolt's single-threaded development server
     http = auto()
     socket = auto()
+    # Bolt's WSGI adapter under gunicorn workers, see server
+    wsgi = auto()
+
+
+class SlackConfig(BaseModel):
+    # Web API base url (https://slack.com/api/ if not set), ie a local stub for load tests
+    api_url: str | None = None
+    # run listeners before acking (FaaS, load tests), Slack expects ack within 3 seconds
+    process_before_response: bool = False
+
+
+class ServerConfig(BaseModel):
+    # gunicorn worker processes, in-memory store (BOB_IMPL=mem) keeps state per process and needs 1
+    workers: int = 2
+    # threads per worker
+    threads: int = 4
+    # seconds to wait for requests on a keep-alive connection
+    keepalive: int = 5
+    # seconds workers get to finish in-flight requests on SIGTERM/restart
+    graceful_timeout: int = 30
+    # silent workers are killed and restarted after this many seconds
+    timeout: int = 30
 
 
 class SQLConfing(BaseModel):
     url: str
+    # log every emitted statement, noisy and expensive, dev only
+    echo: bool = False
+    # read replica, queries go to the primary `url` if not set
+    read_url: str | None = None
+    # seconds a user reads from the primary after own writes, should cover replication lag
+    read_your_writes: float = 10
+
+
+class CacheConfig(BaseModel):
+    # shift reads cache of the SQL store, disabled if not set
+    impl: CacheImpl | None = None
+    # redis://[:password@]host[:port][/db]
+    url: str = "redis://localhost:6379/0"
+    # entries are keyed by rotation version and don't go stale, ttl bounds memory
+    ttl: int = 300
+    # mem only
+    maxsize: int = 10_000
+
+
+class LogConfig(BaseModel):
+    level: str = "INFO"
+    # fraction of incoming Slack payloads to log in full (0 - none, 1 - all)
+    body_sample_rate: float = 0.0
+
+
+class ProfileConfig(BaseModel):
+    # fraction of listener calls profiled (0 - off), changed at runtime with `/oncall profile <rate>`
+    rate: float = 0.0
+    # directory of `<pid>.pstats` and `<pid>.collapsed`
+    path: str = "profiles"
+    # seconds between stack samples of profiled calls
+    sample_interval: float = 0.005
+    # seconds between dumps, also dumped at exit and with `/oncall profile dump`
+    dump_interval: int = 60
+    # user ids allowed to run `/oncall profile`
+    admins: list[str] = []
 
 
 class View(BaseModel):
     shift_datetime_format: str = "%a, %Y-%m-%d %H:%M"
 
 
+class CalendarConfig(BaseModel):
+    # directory with `<calendar_id>.txt` holiday files
+    path: str = "holidays"
+    # calendar applied to business day rotations by default
+    default: str | None = None
+
+
+class IcsConfig(BaseModel):
+    # serve iCalendar feed on a separate port, disabled if not set
+    port: int | None = None
+    # shared secret required as `?token=` query param, feed is public if not set
+    token: str | None = None
+    # shifts fetched from the store per query while streaming the feed
+    page_size: int = 500
+
+
+class AllocationConfig(BaseModel):
+    # extra load per weekend/holiday hour, ie 1.0 counts weekend hour twice
+    weekend_weight: float = 1.0
+    holiday_weight: float = 2.0
+
+
+class DirectoryConfig(BaseModel):
+    # Slack channel members and user profiles cache
+    ttl: int = 600
+    maxsize: int = 10_000
+
+
+class RollingConfig(BaseModel):
+    # how often rolling rotations are extended, seconds
+    interval: int = 3600
+
+
+class DedupConfig(BaseModel):
+    # how long processed Slack requests are remembered, Slack retries within minutes
+    ttl: int = 3600
+    # in-memory store only
+    maxsize: int = 10_000
+
+
+class SnapshotConfig(BaseModel):
+    # in-memory store snapshot file, restored on boot and saved periodically/at shutdown, disabled if not set
+    path: str | None = None
+    # seconds between snapshots
+    interval: int = 300
+
+
+class ArchiveConfig(BaseModel):
+    # shifts ended more than N days ago are moved to the archive (still counted in reports), kept live if not set
+    retention_days: int | None = None
+    # seconds between runs, deleted rotations are purged by the same job
+    interval: int = 3600
+    # rows moved/deleted per transaction, keeps write locks short
+    batch_size: int = 1000
+
+
 class Config(BaseSettings):
     mode: SlackMode = SlackMode.socket
     port: int = 3000
+    server: ServerConfig = ServerConfig()
     impl: Impl = Impl.sql
+    slack: SlackConfig = SlackConfig()
     sql: SQLConfing | None = SQLConfing(url="sqlite:///:memory:")
+    cache: CacheConfig = CacheConfig()
     # timezone: str = "America/New_York"
     timezone: str = "UTC"  # TODO UTC is depicted as "Time zone: Monrovia, Reykjavik" in Slack time-picker
     view: View = View()
+    log: LogConfig = LogConfig()
+    profile: ProfileConfig = ProfileConfig()
+    calendar: CalendarConfig = CalendarConfig()
+    ics: IcsConfig = IcsConfig()
+    allocation: AllocationConfig = AllocationConfig()
+    directory: DirectoryConfig = DirectoryConfig()
+    rolling: RollingConfig = RollingConfig()
+    dedup: DedupConfig = DedupConfig()
+    snapshot: SnapshotConfig = SnapshotConfig()
+    archive: ArchiveConfig = ArchiveConfig()
 
     model_config = SettingsConfigDict(env_prefix="BOB_", env_nested_delimiter="__")
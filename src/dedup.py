@@ -0,0 +1,105 @@
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from slack_bolt import Ack, BoltContext, BoltRequest, BoltResponse
+
+from models import Outcome
+from store.dedup import DedupStore
+
+logger = logging.getLogger(__name__)
+
+Middleware = Callable[..., BoltResponse]
+
+
+def request_key(body: dict[str, Any]) -> str | None:
+    """
+    Stable id of a Slack request, the same for the original delivery and its retries.
+    Returns None for requests that can't be identified (they are processed as is).
+    """
+    if event_id := body.get("event_id"):
+        return f"event:{event_id}"
+    if body.get("type") == "view_submission" and (view := body.get("view")):
+        return f"view:{view['id']}"
+    if actions := body.get("actions"):
+        return f"action:{body['user']['id']}:{actions[0]['action_ts']}"
+    # slash commands and shortcuts, unique per user interaction
+    if trigger_id := body.get("trigger_id"):
+        return f"trigger:{trigger_id}"
+    return None
+
+
+class RecordingAck(Ack):
+    """
+    `ack()` that records the response, listeners run after middleware returns.
+    Rejected view submissions (`response_action="errors"`) are released instead: the corrected submission
+    of the same modal has the same view id and must be processed.
+    """
+
+    def __init__(
+        self, record: Callable[[BoltResponse], None], release: Callable[[], None]
+    ) -> None:
+        super().__init__()  # type: ignore[no-untyped-call]
+        self._record = record
+        self._release = release
+
+    def __call__(self, *args: Any, **kwargs: Any) -> BoltResponse:
+        response = super().__call__(*args, **kwargs)
+        if kwargs.get("response_action") == "errors":
+            self._release()
+        else:
+            self._record(response)
+        return response
+
+
+def to_outcome(response: BoltResponse) -> Outcome:
+    return Outcome(
+        status=response.status,
+        body=response.body,
+        headers={k: list(v) for k, v in response.headers.items()},
+    )
+
+
+def dedup_requests(store: DedupStore) -> Middleware:
+    """
+    Bolt middleware answering retried/redelivered requests without running listeners again.
+    Slack retries events when ack is slow (`X-Slack-Retry-Num` header), socket mode may redeliver payloads.
+    The first delivery claims the request key, its ack response is recorded and replayed for duplicates;
+    duplicates arriving while the first one is in progress are acked with an empty response.
+    Listeners failing before ack leave the key claimed until it expires, rejected view submissions release it.
+    """
+
+    def dedup(
+        body: dict[str, Any],
+        request: BoltRequest,
+        context: BoltContext,
+        next: Callable[[], BoltResponse],
+    ) -> BoltResponse:
+        key = request_key(body)
+        if key is None:
+            return next()
+
+        if store.claim(key):
+            context["ack"] = RecordingAck(
+                lambda resp: store.put(key, to_outcome(resp)),
+                lambda: store.release(key),
+            )
+            return next()
+
+        retry = request.headers.get("x-slack-retry-num", [None])[0]
+        reason = request.headers.get("x-slack-retry-reason", [None])[0]
+        if outcome := store.get(key):
+            logger.info(
+                "duplicate request %s (retry=%s, %s), replay", key, retry, reason
+            )
+            return BoltResponse(
+                status=outcome.status,
+                body=outcome.body,
+                headers=dict(outcome.headers),
+            )
+        logger.info(
+            "duplicate request %s (retry=%s, %s), in progress", key, retry, reason
+        )
+        return BoltResponse(status=200, body="")
+
+    return dedup
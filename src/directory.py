@@ -0,0 +1,96 @@
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import BaseModel
+from slack_sdk import WebClient
+
+from cache import SingleFlight, TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class UserProfile(BaseModel):
+    id: str
+    name: str
+    tz: str | None = None
+    is_bot: bool = False
+    deleted: bool = False
+
+    @classmethod
+    def from_slack(cls, user: dict[str, Any]) -> "UserProfile":
+        profile = user.get("profile") or {}
+        return cls(
+            id=str(user["id"]),
+            name=str(
+                profile.get("display_name")
+                or profile.get("real_name")
+                or user.get("name")
+                or user["id"]
+            ),
+            tz=str(user["tz"]) if user.get("tz") else None,
+            is_bot=bool(user.get("is_bot")) or user["id"] == "USLACKBOT",
+            deleted=bool(user.get("deleted")),
+        )
+
+
+class SlackDirectory:
+    """
+    Cached view of Slack channel members and user profiles.
+    Web API methods are rate limited per tier (users.info - tier 4, conversations.members - tier 4),
+    so lookups are served from a TTL+LRU cache, concurrent misses for the same key share a single API call,
+    and batches look up only the missing profiles, `concurrency` users.info calls at a time.
+    """
+
+    def __init__(
+        self,
+        client: WebClient,
+        ttl: float = 600,
+        maxsize: int = 10_000,
+        page_size: int = 200,
+        concurrency: int = 4,
+    ) -> None:
+        self.client = client
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self._members: TTLCache[str, list[str]] = TTLCache(maxsize, ttl)
+        self._users: TTLCache[str, UserProfile] = TTLCache(maxsize, ttl)
+        self._members_flight: SingleFlight[str, list[str]] = SingleFlight()
+        self._users_flight: SingleFlight[str, UserProfile] = SingleFlight()
+
+    def members(self, channel_id: str) -> list[str]:
+        if (members := self._members.get(channel_id)) is not None:
+            return members
+
+        def fetch() -> list[str]:
+            members: list[str] = []
+            for page in self.client.conversations_members(
+                channel=channel_id, limit=self.page_size
+            ):
+                members += page["members"]
+            self._members.set(channel_id, members)
+            return members
+
+        return self._members_flight.do(channel_id, fetch)
+
+    def user(self, user_id: str) -> UserProfile:
+        if (profile := self._users.get(user_id)) is not None:
+            return profile
+
+        def fetch() -> UserProfile:
+            resp = self.client.users_info(user=user_id)
+            profile = UserProfile.from_slack(resp["user"])
+            self._users.set(user_id, profile)
+            return profile
+
+        return self._users_flight.do(user_id, fetch)
+
+    def users(self, user_ids: Iterable[str]) -> dict[str, UserProfile]:
+        user_ids = list(user_ids)
+        missing = list(dict.fromkeys(u for u in user_ids if self._users.get(u) is None))
+        if len(missing) > 1:
+            with ThreadPoolExecutor(min(self.concurrency, len(missing))) as pool:
+                list(pool.map(self.user, missing))
+            logger.debug("looked up %s user profiles", len(missing))
+        return {u: self.user(u) for u in user_ids}
@@ -0,0 +1,121 @@
+"""
+iCalendar feed of rotation shifts, served over HTTP (WSGI) or written to a file:
+
+    GET /ics/<rotation_id|current>.ics[?user=<slack_user_id>][&token=<token>]
+
+    python src/feed.py <rotation_id|current> [--user U123] [-o oncall.ics]
+"""
+
+import argparse
+import datetime
+import hmac
+import logging
+import re
+import sys
+import threading
+from collections.abc import Iterable
+from datetime import UTC
+from typing import Any
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.types import StartResponse, WSGIEnvironment
+
+from config import Config
+from models import Rotation
+from service.ics import IcsService
+from store.factory import StoreFactory
+
+logger = logging.getLogger(__name__)
+
+ROUTE = re.compile(r"^/ics/(?P<rotation_id>[\w-]+)\.ics$")
+CURRENT = "current"
+
+
+def get_rotation(store_factory: StoreFactory, rotation_id: str) -> Rotation | None:
+    if rotation_id == CURRENT:
+        return store_factory.rotation().get_by_date(datetime.datetime.now(tz=UTC))
+    return store_factory.rotation().get_by_id(rotation_id)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class FeedApp:
+    def __init__(self, store_factory: StoreFactory, token: str | None = None):
+        self.store_factory = store_factory
+        self.ics = IcsService(store_factory, page_size=Config().ics.page_size)
+        self.token = token
+
+    def __call__(
+        self, environ: WSGIEnvironment, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        method = environ["REQUEST_METHOD"]
+        if method not in ("GET", "HEAD"):
+            return self.error(start_response, "405 Method Not Allowed")
+
+        match = ROUTE.match(environ.get("PATH_INFO", ""))
+        if match is None:
+            return self.error(start_response, "404 Not Found")
+
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        if self.token and not hmac.compare_digest(
+            query.get("token", [""])[0], self.token
+        ):
+            return self.error(start_response, "403 Forbidden")
+
+        rotation = get_rotation(self.store_factory, match["rotation_id"])
+        if rotation is None:
+            return self.error(start_response, "404 Not Found")
+
+        user = query.get("user", [None])[0]
+        etag = self.ics.etag(rotation, user)
+        headers = [("ETag", etag), ("Cache-Control", "no-cache")]
+
+        if etag_matches(environ.get("HTTP_IF_NONE_MATCH", ""), etag):
+            start_response("304 Not Modified", headers)
+            return []
+
+        start_response(
+            "200 OK", [("Content-Type", "text/calendar; charset=utf-8"), *headers]
+        )
+        if method == "HEAD":
+            return []
+        return (line.encode() for line in self.ics.iter_lines(rotation, user))
+
+    @staticmethod
+    def error(start_response: StartResponse, status: str) -> list[bytes]:
+        start_response(status, [("Content-Type", "text/plain; charset=utf-8")])
+        return [status.encode()]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format, *args)
+
+
+def serve_feed(app: FeedApp, port: int) -> WSGIServer:
+    """Serve feed in a background thread next to the Slack app."""
+    server = make_server("", port, app, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="ics-feed", daemon=True).start()
+    logger.info("iCalendar feed is served on port %s", port)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export rotation shifts as iCalendar")
+    parser.add_argument("rotation_id", help=f"rotation id or '{CURRENT}'")
+    parser.add_argument("--user", help="export shifts of a single firefighter")
+    parser.add_argument("-o", "--output", help="output file (stdout by default)")
+    args = parser.parse_args()
+
+    store_factory = StoreFactory.apply(Config())
+    rotation = get_rotation(store_factory, args.rotation_id)
+    if rotation is None:
+        sys.exit(f"Rotation {args.rotation_id!r} not found")
+
+    ics = IcsService(store_factory, page_size=Config().ics.page_size)
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    with out:
+        out.writelines(ics.iter_lines(rotation, args.user))
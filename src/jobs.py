@@ -0,0 +1,30 @@
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob(threading.Thread):
+    """Run function in a daemon thread after `delay` (right away by default) and then every `interval` seconds until stopped."""
+
+    def __init__(
+        self, name: str, interval: float, fn: Callable[[], object], delay: float = 0
+    ) -> None:
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self.fn = fn
+        self.delay = delay
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        self._stopped.wait(self.delay)
+        while not self._stopped.is_set():
+            try:
+                self.fn()
+            except Exception:
+                logger.exception("job %s failed", self.name)
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
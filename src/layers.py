@@ -0,0 +1,121 @@
+"""
+Layered rotations (primary, secondary, ...): the effective on-call set over time, merged in a single sweep.
+
+Within a layer shifts may overlap (ie follow-the-sun rotations handing off to each other, or a newer rotation
+replacing an older one), the latest started shift wins - the same rule as RotationStore.get_by_date.
+"""
+
+import bisect
+import datetime
+import heapq
+from collections.abc import Mapping, Sequence
+from typing import NamedTuple
+
+from models import Shift
+
+
+class Segment(NamedTuple):
+    """[start, end) with the same on-call shift per layer (None if the layer is uncovered)."""
+
+    start: datetime.datetime
+    end: datetime.datetime
+    shifts: tuple[Shift | None, ...]
+
+
+def sweep(layers: Sequence[Sequence[Shift]]) -> list[Segment]:
+    """
+    Segments of the effective shift per layer, `layers` are sorted by shift start (dates comparable across layers).
+    Starts of all layers are k-way merged, ends are kept in a heap, each shift is pushed and popped once, and only
+    layers changed at a boundary are looked at: O(n log n) for n shifts, plus a shift per layer in every emitted
+    segment. Gaps with no layer covered are skipped.
+    """
+    # (start, layer, n, shift), n breaks ties without comparing shifts
+    starts = iter(
+        heapq.merge(
+            *(
+                [(shift.start_date, i, n, shift) for n, shift in enumerate(layer)]
+                for i, layer in enumerate(layers)
+            )
+        )
+    )
+    # (end, layer, n)
+    ends: list[tuple[datetime.datetime, int, int]] = []
+    ended: set[tuple[int, int]] = set()
+    # started shifts per layer in start order, the top one not ended is effective, ended ones are dropped lazily
+    stacks: list[list[tuple[int, Shift]]] = [[] for _ in layers]
+    current: list[Shift | None] = [None] * len(layers)
+    # layers with an effective shift
+    covered = 0
+    # effective shifts changed since the last segment was emitted
+    dirty = False
+
+    segments: list[Segment] = []
+    pending = next(starts, None)
+    last: datetime.datetime | None = None
+    while pending is not None or ends:
+        if pending is not None and (not ends or pending[0] < ends[0][0]):
+            t = pending[0]
+        else:
+            t = ends[0][0]
+        if last is not None and last < t and covered:
+            if dirty or segments[-1].end != last:
+                segments.append(Segment(last, t, tuple(current)))
+                dirty = False
+            else:
+                segments[-1] = segments[-1]._replace(end=t)
+
+        changed: set[int] = set()
+        while ends and ends[0][0] <= t:
+            _, i, n = heapq.heappop(ends)
+            ended.add((i, n))
+            changed.add(i)
+        while pending is not None and pending[0] <= t:
+            _, i, n, shift = pending
+            if shift.end_date > t:
+                stacks[i].append((n, shift))
+                heapq.heappush(ends, (shift.end_date, i, n))
+                changed.add(i)
+            pending = next(starts, None)
+        for i in changed:
+            stack = stacks[i]
+            while stack and (i, stack[-1][0]) in ended:
+                ended.discard((i, stack.pop()[0]))
+            effective = stack[-1][1] if stack else None
+            if effective is not current[i]:
+                covered += (effective is not None) - (current[i] is not None)
+                current[i] = effective
+                dirty = True
+        last = t
+    return segments
+
+
+class Timeline(NamedTuple):
+    """Merged layers, `layers` holds layer numbers in the order of Segment.shifts."""
+
+    layers: list[int]
+    segments: list[Segment]
+
+    @classmethod
+    def of(cls, shifts: Mapping[int, Sequence[Shift]]) -> "Timeline":
+        layers = sorted(shifts)
+        return cls(layers, sweep([shifts[layer] for layer in layers]))
+
+    def clip(self, dt_from: datetime.datetime, dt_to: datetime.datetime) -> "Timeline":
+        """Segments within [dt_from, dt_to)."""
+        segments = [
+            s._replace(start=max(s.start, dt_from), end=min(s.end, dt_to))
+            for s in self.segments
+            if s.start < dt_to and dt_from < s.end
+        ]
+        return self._replace(segments=segments)
+
+    def at(self, dt: datetime.datetime) -> dict[int, Shift]:
+        """On-call shift per layer at `dt`, primary first."""
+        i = bisect.bisect_right(self.segments, dt, key=lambda s: s.start) - 1
+        if i < 0 or dt >= self.segments[i].end:
+            return {}
+        return {
+            layer: shift
+            for layer, shift in zip(self.layers, self.segments[i].shifts)
+            if shift is not None
+        }
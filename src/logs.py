@@ -0,0 +1,43 @@
+import json
+import logging
+import random
+from typing import Any
+
+from config import LogConfig
+
+
+class StructuredMessage:
+    """
+    Log record message rendered as `message {json}`.
+    Rendering (and json encoding) is deferred until a handler actually emits the record,
+    so messages below the effective level cost a single object allocation.
+
+    https://docs.python.org/3/howto/logging-cookbook.html#implementing-structured-logging
+    """
+
+    __slots__ = ("message", "kwargs")
+
+    def __init__(self, message: str, /, **kwargs: Any) -> None:
+        self.message = message
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return f"{self.message} {json.dumps(self.kwargs, default=str)}"
+
+
+class BodySampler:
+    """Decide whether a request body should be logged, keeping log volume bounded under load."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = min(max(rate, 0.0), 1.0)
+
+    def __call__(self) -> bool:
+        if self.rate <= 0.0:
+            return False
+        if self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+def setup_logging(cfg: LogConfig) -> None:
+    logging.basicConfig(level=cfg.level.upper())
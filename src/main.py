@@ -1,23 +1,32 @@
-import json
+import atexit
+import functools
 import logging
 import os
-from datetime import date, datetime
+import re
+from datetime import UTC, date, datetime, time, timedelta
 from functools import reduce
 from logging import Logger
 from operator import concat
 from typing import Any, Callable, assert_never
+from zoneinfo import ZoneInfoNotFoundError
 
-import pytz
-from lenses import lens
-from slack_bolt import Ack, App, BoltResponse, Respond, Say
+from pydantic import ValidationError
+from slack_bolt import Ack, App, BoltResponse, Respond
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 from slack_sdk.models.blocks import (
     ActionsBlock,
+    Block,
+    ButtonElement,
+    ConfirmObject,
     DatePickerElement,
     InputBlock,
     MarkdownTextObject,
+    StaticMultiSelectElement,
     Option,
+    PlainTextInputElement,
     PlainTextObject,
     SectionBlock,
     StaticSelectElement,
@@ -26,19 +35,71 @@ from slack_sdk.models.blocks import (
 )
 from slack_sdk.models.views import View
 
-from config import Config, SlackMode
-from models import Rotation, Schedule, Temporal
+from config import Config, Impl, SlackMode
+from dedup import dedup_requests
+from directory import SlackDirectory, UserProfile
+from jobs import PeriodicJob
+from logs import BodySampler, StructuredMessage, setup_logging
+from models import Allocation, Rotation, Shift, Temporal
+from payloads import create_rotation_submission, view_errors
+from outbound import Dispatcher
+from profiling import Profiler
 from service.oncall import OncallService
-from store.factory import StoreFactory
+from store.factory import InMemoryStoreFactory, StoreFactory
+from store.sa import in_memory
+from store.shift import Cursor
+from timezones import date_formatter, get_timezone
 
-logging.basicConfig(level=logging.INFO)
+setup_logging(Config().log)
 
+slack_cfg = Config().slack
 app = App(
     token=os.environ.get("SLACK_BOT_TOKEN"),
     signing_secret=os.environ.get("SLACK_SIGNING_SECRET"),
+    client=WebClient(
+        token=os.environ.get("SLACK_BOT_TOKEN"), base_url=slack_cfg.api_url
+    )
+    if slack_cfg.api_url
+    else None,
+    process_before_response=slack_cfg.process_before_response,
 )
+# handler calls (views.open, directory lookups) are retried once after `Retry-After`, bulk posts go through outbound
+app.client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=1))
 
 store_factory = StoreFactory.apply(Config())
+sample_body = BodySampler(Config().log.body_sample_rate)
+# listeners are wrapped with `profiler.wrap`, see `/oncall profile`
+profiler = Profiler(
+    Config().profile.rate,
+    Config().profile.path,
+    Config().profile.sample_interval,
+    Config().profile.dump_interval,
+)
+# every process dumps its own profiles
+atexit.register(profiler.dump)
+directory = SlackDirectory(
+    app.client, ttl=Config().directory.ttl, maxsize=Config().directory.maxsize
+)
+# replies not awaited by handlers are posted within rate limits, the worker thread starts on first post
+outbound = Dispatcher(app.client)
+atexit.register(outbound.stop, timeout=5)
+
+# SectionBlock fields cannot exceed 10 items, each shift takes 2 (shift+swap side-by-side)
+LIST_PAGE_SIZE = 5
+# static select menus are limited to 100 options
+MAX_FIGHTERS_OPTIONS = 100
+# rotation horizon, weeks ("0" - fixed 1 year rotation)
+HORIZON_OPTIONS = [
+    ("1 year", "0"),
+    ("rolling 4 weeks", "4"),
+    ("rolling 12 weeks", "12"),
+]
+# escalation layer, see layers
+LAYER_OPTIONS = [
+    ("primary", "0"),
+    ("secondary", "1"),
+    ("tertiary", "2"),
+]
 
 
 def match_ls(command: dict[str, Any]) -> bool:
@@ -51,87 +112,527 @@ def match_create(command: dict[str, Any]) -> bool:
     return str(command.get("text", "")) == "create"
 
 
-def convert_date(dt: datetime, tz: str) -> str:
-    return (
-        pytz.utc.localize(dt)
-        .astimezone(pytz.timezone(tz))
-        .strftime(Config().view.shift_datetime_format)
-    )
+def match_report(command: dict[str, Any]) -> bool:
+    return str(command.get("text", "")).split(" ", 1)[0] == "report"
+
+
+def match_delete(command: dict[str, Any]) -> bool:
+    return str(command.get("text", "")) == "delete"
+
+
+def match_me(command: dict[str, Any]) -> bool:
+    return str(command.get("text", "")) == "me"
+
+
+def match_profile(command: dict[str, Any]) -> bool:
+    return str(command.get("text", "")).split(" ", 1)[0] == "profile"
+
+
+def user_timezone(user_id: str, default: str, logger: Logger) -> str:
+    """Requesting user's timezone from (cached) Slack profile, fall back to default (ie rotation's)."""
+    try:
+        if tz := directory.user(user_id).tz:
+            get_timezone(tz)
+            return tz
+    except (SlackApiError, OSError, ZoneInfoNotFoundError) as e:
+        logger.warning("can't get user %s timezone: %s", user_id, e)
+    return default
 
 
 @app.middleware  # or app.use(log_request)
 def log_request(
     logger: Logger, body: dict[str, Any], next: Callable[[], BoltResponse]
 ) -> BoltResponse:
-    logger.debug(body)
+    if sample_body() or logger.isEnabledFor(logging.DEBUG):
+        logger.info(StructuredMessage("request", body=body))
     return next()
 
 
+# registered after log_request, so retries are still logged
+app.use(dedup_requests(store_factory.dedup()))
+
+
+def encode_page(rotation_id: str, shift: Shift, tz: str) -> str:
+    return f"{rotation_id}|{shift.start_date.isoformat()}|{shift.id}|{tz}"
+
+
+def decode_page(value: str) -> tuple[str, Cursor, str]:
+    rotation_id, start_date, shift_id, tz = value.split("|")
+    return rotation_id, Cursor(datetime.fromisoformat(start_date), shift_id), tz
+
+
+def render_shifts(
+    rotation_id: str, shifts: list[Shift], tz: str, current: Shift | None = None
+) -> list[Block]:
+    fmt = date_formatter(tz, Config().view.shift_datetime_format)
+
+    # headers = [MarkdownTextObject(text="*Shifts:*"), MarkdownTextObject(text="*Swaps:*")]
+    fields = [
+        MarkdownTextObject(
+            text=f"`{fmt(s.start_date)}` <@{s.firefighter}>",
+        )
+        for s in shifts
+    ]
+    # TODO pad with swaps
+    padding_fields = [MarkdownTextObject(text=" ") for _ in shifts]
+
+    blocks: list[Block] = []
+    if current:
+        blocks.append(
+            SectionBlock(
+                block_id="list_current",
+                text=MarkdownTextObject(
+                    text=f"*Current firefighter:* <@{current.firefighter}>"
+                ),
+            )
+        )
+    blocks += [
+        SectionBlock(
+            block_id="list_shifts_header",
+            fields=[
+                MarkdownTextObject(text="*Shifts:*"),
+                MarkdownTextObject(text="*Swaps:*"),
+            ],
+        ),
+        SectionBlock(
+            block_id="list_shifts",
+            # slack_sdk.errors.SlackObjectFormationError: fields attribute cannot exceed 10 items
+            fields=reduce(
+                concat,  # type: ignore[arg-type]
+                zip(fields, padding_fields),
+            ),  # flatten pairwise (shifts+swaps side-by-side)
+        ),
+        SectionBlock(
+            block_id="list_tz",
+            # TODO format timezone
+            text=f"Timezone: {tz}",
+        ),
+        ActionsBlock(
+            block_id="list_pages",
+            # cursors are passed as button values, so paging doesn't repeat the rotation lookup by date
+            elements=[
+                ButtonElement(
+                    text="Prev",
+                    action_id="list_prev",
+                    value=encode_page(rotation_id, shifts[0], tz),
+                ),
+                ButtonElement(
+                    text="Next",
+                    action_id="list_next",
+                    value=encode_page(rotation_id, shifts[-1], tz),
+                ),
+            ],
+        ),
+    ]
+    return blocks
+
+
 @app.command("/oncall", matchers=[match_ls])
+@profiler.wrap
 def handle_list(
     body: dict[str, Any], ack: Ack, respond: Respond, client: WebClient, logger: Logger
 ) -> None:
-    logger.info(body)
     ack()
 
-    oncall_svc = OncallService(store_factory)
-    shifts = oncall_svc.get_shifts(limit=5)
-    logger.info(f"{shifts=}")
+    oncall_svc = OncallService(store_factory.for_user(body["user_id"]))
+    rotation = oncall_svc.get_rotation()
+    shifts = (
+        oncall_svc.get_shifts(limit=LIST_PAGE_SIZE, rotation=rotation)
+        if rotation
+        else []
+    )
+    logger.debug("shifts=%s", shifts)
 
-    if not shifts:
+    if rotation is None or not shifts:
         respond(text=":poop: No shifts are set!", response_type="ephemeral")
         return
 
-    current_shift = shifts[0]
-    firefighter = current_shift.firefighter
+    tz = user_timezone(body["user_id"], default=rotation.timezone, logger=logger)
+    respond(
+        blocks=render_shifts(rotation.id, shifts, tz, current=shifts[0]),
+        response_type="ephemeral",
+    )
 
-    # TODO read timezone from rotation object?!
-    tz = Config().timezone
 
-    # headers = [MarkdownTextObject(text="*Shifts:*"), MarkdownTextObject(text="*Swaps:*")]
+def parse_report_range(text: str, tz: str) -> tuple[datetime, datetime]:
+    """`report <from> <to>` dates (inclusive) in the user's timezone to [from, to + 1 day) datetimes."""
+    _, dt_from, dt_to = text.split()
+    tzinfo = get_timezone(tz)
+    start = datetime.combine(date.fromisoformat(dt_from), time(), tzinfo)
+    end = datetime.combine(
+        date.fromisoformat(dt_to) + timedelta(days=1), time(), tzinfo
+    )
+    if end <= start:
+        raise ValueError(f"{dt_to} is before {dt_from}")
+    return start, end
+
+
+def render_report(report: dict[str, timedelta], period: str, tz: str) -> list[Block]:
+    total = sum(report.values(), timedelta())
     fields = [
         MarkdownTextObject(
-            text=f"`{convert_date(s.start_date, tz)}` <@{s.firefighter}>",
+            text=f"<@{firefighter}> `{duration / timedelta(hours=1):.1f}h` ({duration / total:.0%})"
         )
-        for s in shifts
+        for firefighter, duration in report.items()
     ]
-    # TODO pad with swaps
-    padding_fields = [MarkdownTextObject(text=" ") for _ in shifts]
+    blocks: list[Block] = [
+        SectionBlock(
+            block_id="report_header",
+            text=MarkdownTextObject(text=f"*On-call hours* {period}, timezone: {tz}"),
+        )
+    ]
+    # section fields cannot exceed 10 items
+    blocks += [
+        SectionBlock(block_id=f"report_{i}", fields=fields[i : i + 10])
+        for i in range(0, len(fields), 10)
+    ]
+    return blocks
+
+
+@app.command("/oncall", matchers=[match_report])
+@profiler.wrap
+def handle_report(
+    body: dict[str, Any], ack: Ack, respond: Respond, logger: Logger
+) -> None:
+    ack()
+
+    tz = user_timezone(body["user_id"], default=Config().timezone, logger=logger)
+    try:
+        dt_from, dt_to = parse_report_range(body["text"], tz)
+    except ValueError as e:
+        logger.debug("invalid report range %r: %s", body["text"], e)
+        respond(
+            text="Usage: `/oncall report <from> <to>`, ie `/oncall report 2025-01-01 2025-03-31`",
+            response_type="ephemeral",
+        )
+        return
+
+    oncall_svc = OncallService(store_factory.for_user(body["user_id"]))
+    report = oncall_svc.report(dt_from, dt_to)
+    if not report:
+        respond(text=":poop: No shifts in this range!", response_type="ephemeral")
+        return
 
     respond(
-        blocks=[
-            SectionBlock(
-                block_id="list_current",
-                text=MarkdownTextObject(
-                    text=f"*Current firefighter:* <@{firefighter}>"
+        blocks=render_report(report, " - ".join(body["text"].split()[1:]), tz),
+        response_type="ephemeral",
+    )
+
+
+def render_me(shifts: dict[int, Shift], now: datetime, tz: str) -> list[Block]:
+    fmt = date_formatter(tz, Config().view.shift_datetime_format)
+    lines = [
+        f"*{layer_name(layer)}*: on call now until `{fmt(shift.end_date)}`"
+        if shift.start_date <= now
+        else f"*{layer_name(layer)}*: `{fmt(shift.start_date)}` - `{fmt(shift.end_date)}`"
+        for layer, shift in shifts.items()
+    ]
+    return [
+        SectionBlock(
+            block_id="me",
+            text=MarkdownTextObject(text="\n".join(["*Your next shifts*", *lines])),
+        )
+    ]
+
+
+@app.command("/oncall", matchers=[match_me])
+@profiler.wrap
+def handle_me(body: dict[str, Any], ack: Ack, respond: Respond, logger: Logger) -> None:
+    ack()
+
+    now = datetime.now(tz=UTC)
+    oncall_svc = OncallService(store_factory.for_user(body["user_id"]))
+    shifts = oncall_svc.next_shifts(body["user_id"], now)
+    if not shifts:
+        respond(text=":palm_tree: You have no shifts ahead!", response_type="ephemeral")
+        return
+
+    tz = user_timezone(body["user_id"], default=Config().timezone, logger=logger)
+    respond(blocks=render_me(shifts, now, tz), response_type="ephemeral")
+
+
+def render_delete(rotation: Rotation, tz: str) -> list[Block]:
+    fmt = date_formatter(tz, Config().view.shift_datetime_format)
+    fighters = ", ".join(f"<@{f}>" for f in rotation.fighters)
+    return [
+        SectionBlock(
+            block_id="delete_rotation",
+            text=MarkdownTextObject(
+                text=f"*Current rotation:* {fighters}, `{fmt(rotation.start_date)}` - `{fmt(rotation.end_date)}`"
+            ),
+        ),
+        ActionsBlock(
+            block_id="delete_actions",
+            elements=[
+                ButtonElement(
+                    text="Delete",
+                    action_id="delete_rotation",
+                    value=rotation.id,
+                    style="danger",
+                    confirm=ConfirmObject(
+                        title="Delete rotation?",
+                        text="The rotation and all its shifts are deleted for everyone.",
+                        confirm="Delete",
+                        deny="Cancel",
+                        style="danger",
+                    ),
                 ),
+            ],
+        ),
+    ]
+
+
+@app.command("/oncall", matchers=[match_delete])
+@profiler.wrap
+def handle_delete(
+    body: dict[str, Any], ack: Ack, respond: Respond, logger: Logger
+) -> None:
+    ack()
+
+    rotation = OncallService(store_factory.for_user(body["user_id"])).get_rotation()
+    if rotation is None:
+        respond(text=":poop: No rotation is set!", response_type="ephemeral")
+        return
+
+    tz = user_timezone(body["user_id"], default=rotation.timezone, logger=logger)
+    respond(blocks=render_delete(rotation, tz), response_type="ephemeral")
+
+
+@app.action("delete_rotation")
+@profiler.wrap
+def handle_delete_rotation(
+    ack: Ack,
+    body: dict[str, Any],
+    action: dict[str, Any],
+    respond: Respond,
+    logger: Logger,
+) -> None:
+    ack()
+
+    # soft-delete, shifts are purged in batches by the compact job
+    oncall_svc = OncallService(store_factory.for_user(body["user"]["id"]))
+    if not oncall_svc.delete_rotation(action["value"]):
+        respond(
+            text="Rotation is deleted already",
+            response_type="ephemeral",
+            replace_original=True,
+        )
+        return
+
+    logger.info(
+        StructuredMessage(
+            "rotation deleted", id=action["value"], user=body["user"]["id"]
+        )
+    )
+    respond(
+        text=f":wastebasket: Rotation has been deleted by <@{body['user']['id']}>",
+        response_type="in_channel",
+        delete_original=True,
+    )
+
+
+@app.action(re.compile(r"^list_(prev|next)$"))
+@profiler.wrap
+def handle_list_page(
+    ack: Ack,
+    body: dict[str, Any],
+    action: dict[str, Any],
+    respond: Respond,
+    logger: Logger,
+) -> None:
+    ack()
+
+    rotation_id, cursor, tz = decode_page(action["value"])
+    oncall_svc = OncallService(store_factory.for_user(body["user"]["id"]))
+    shifts = oncall_svc.get_shifts_page(
+        rotation_id,
+        cursor,
+        limit=LIST_PAGE_SIZE,
+        backward=action["action_id"] == "list_prev",
+    )
+    logger.debug("shifts=%s", shifts)
+
+    if not shifts:
+        respond(
+            text="No more shifts", response_type="ephemeral", replace_original=False
+        )
+        return
+
+    respond(
+        blocks=render_shifts(rotation_id, shifts, tz),
+        response_type="ephemeral",
+        replace_original=True,
+    )
+
+
+def fighter_label(profile: UserProfile) -> str:
+    label = f"{profile.name} ({profile.tz})" if profile.tz else profile.name
+    # option text cannot exceed 75 chars
+    return label[:75]
+
+
+def fighters_element(
+    channel_id: str, logger: Logger
+) -> StaticMultiSelectElement | None:
+    """Pick fighters from the channel members, None for large/inaccessible channels, see `any_fighters_element`."""
+    try:
+        members = directory.members(channel_id)
+        if len(members) <= MAX_FIGHTERS_OPTIONS:
+            profiles = [
+                p
+                for p in directory.users(members).values()
+                if not p.is_bot and not p.deleted
+            ]
+            if profiles:
+                return StaticMultiSelectElement(
+                    action_id="fighters_select",
+                    placeholder=PlainTextObject(text="Choose you fighters"),
+                    options=[
+                        Option(text=PlainTextObject(text=fighter_label(p)), value=p.id)
+                        for p in profiles
+                    ],
+                )
+    except (SlackApiError, OSError) as e:
+        logger.warning("can't list channel %s members: %s", channel_id, e)
+    return None
+
+
+def any_fighters_element() -> UserMultiSelectElement:
+    return UserMultiSelectElement(
+        action_id="fighters_select",
+        placeholder=PlainTextObject(text="Choose you fighters"),
+        initial_users=[],
+    )
+
+
+def create_view(
+    fighters: StaticMultiSelectElement | UserMultiSelectElement,
+) -> View:
+    return View(
+        type="modal",
+        callback_id="view-oncall-create",
+        title=PlainTextObject(text="Create rotation"),
+        submit=PlainTextObject(text="Submit"),
+        close=PlainTextObject(text="Cancel"),
+        blocks=[
+            InputBlock(
+                block_id="fighters_block",
+                # UserMultiSelectElement doesn't allow to filter users from the current channel only
+                element=fighters,
+                label=PlainTextObject(text="Fighters"),
             ),
-            SectionBlock(
-                block_id="list_shifts_header",
-                fields=[
-                    MarkdownTextObject(text="*Shifts:*"),
-                    MarkdownTextObject(text="*Swaps:*"),
+            ActionsBlock(
+                block_id="schedule_block",
+                elements=[
+                    StaticSelectElement(
+                        action_id="schedule_each_select",
+                        options=[
+                            Option(text=PlainTextObject(text=str(i)), value=str(i))
+                            for i in range(1, 32)
+                        ],
+                        initial_option=Option(
+                            text=PlainTextObject(text="1"), value="1"
+                        ),
+                    ),
+                    StaticSelectElement(
+                        action_id="schedule_temporal_select",
+                        options=[
+                            Option(
+                                text=PlainTextObject(text="days"),
+                                value=Temporal.day,
+                            ),
+                            Option(
+                                text=PlainTextObject(text="business days"),
+                                value=Temporal.bday,
+                            ),
+                            Option(
+                                text=PlainTextObject(text="weeks"),
+                                value=Temporal.week,
+                            ),
+                            Option(
+                                text=PlainTextObject(text="custom"),
+                                value=Temporal.rrule,
+                            ),
+                        ],
+                        initial_option=Option(
+                            text=PlainTextObject(text="business days"),
+                            value=Temporal.bday,
+                        ),
+                    ),
+                    StaticSelectElement(
+                        action_id="schedule_allocation_select",
+                        options=[
+                            Option(
+                                text=PlainTextObject(text="round-robin"),
+                                value=Allocation.round_robin,
+                            ),
+                            Option(
+                                text=PlainTextObject(text="balance weekends"),
+                                value=Allocation.balanced,
+                            ),
+                        ],
+                        initial_option=Option(
+                            text=PlainTextObject(text="round-robin"),
+                            value=Allocation.round_robin,
+                        ),
+                    ),
+                    StaticSelectElement(
+                        action_id="schedule_horizon_select",
+                        options=[
+                            Option(text=PlainTextObject(text=text), value=value)
+                            for text, value in HORIZON_OPTIONS
+                        ],
+                        initial_option=Option(
+                            text=PlainTextObject(text=HORIZON_OPTIONS[0][0]),
+                            value=HORIZON_OPTIONS[0][1],
+                        ),
+                    ),
+                    StaticSelectElement(
+                        action_id="schedule_layer_select",
+                        options=[
+                            Option(text=PlainTextObject(text=text), value=value)
+                            for text, value in LAYER_OPTIONS
+                        ],
+                        initial_option=Option(
+                            text=PlainTextObject(text=LAYER_OPTIONS[0][0]),
+                            value=LAYER_OPTIONS[0][1],
+                        ),
+                    ),
                 ],
             ),
-            SectionBlock(
-                block_id="list_shifts",
-                # slack_sdk.errors.SlackObjectFormationError: fields attribute cannot exceed 10 items
-                fields=reduce(
-                    concat,  # type: ignore[arg-type]
-                    zip(fields, padding_fields),
-                ),  # flatten pairwise (shifts+swaps side-by-side)
+            InputBlock(
+                block_id="rule_block",
+                optional=True,
+                element=PlainTextInputElement(
+                    action_id="schedule_rule_input",
+                    placeholder="FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;BYHOUR=10",
+                ),
+                label=PlainTextObject(text="Custom schedule (RRULE)"),
+                hint=PlainTextObject(
+                    text="Shifts change on every <n>-th occurrence, FREQ=DAILY|WEEKLY"
+                ),
             ),
-            SectionBlock(
-                block_id="list_tz",
-                # TODO format timezone
-                text=f"Timezone: {tz}",
+            ActionsBlock(
+                block_id="start_end_block",
+                # use DatePickerElement + TimePickerElement over DateTimePickerElement for better UI alignment
+                elements=[
+                    DatePickerElement(
+                        action_id="start_date_select",
+                        initial_date=date.today().isoformat(),
+                    ),
+                    TimePickerElement(
+                        action_id="start_time_select",
+                        initial_time="09:00",
+                        timezone=Config().timezone,
+                    ),
+                ],
             ),
         ],
-        response_type="ephemeral",
     )
 
 
 @app.command("/oncall", matchers=[match_create])
+@profiler.wrap
 def handle_create(
     body: dict[str, Any],
     ack: Ack,
@@ -139,84 +640,23 @@ def handle_create(
     logger: Logger,
     respond: Respond,
 ) -> None:
-    logger.info(body)
     ack()
 
+    # trigger_id expires in 3s, channel members are loaded once the modal is open
     res = client.views_open(
-        trigger_id=body["trigger_id"],
-        view=View(
-            type="modal",
-            callback_id="view-oncall-create",
-            title=PlainTextObject(text="Create rotation"),
-            submit=PlainTextObject(text="Submit"),
-            close=PlainTextObject(text="Cancel"),
-            blocks=[
-                InputBlock(
-                    block_id="fighters_block",
-                    # TODO UserMultiSelectElement doesn't allow to filter users from the current channel only
-                    element=UserMultiSelectElement(
-                        action_id="fighters_select",
-                        placeholder=PlainTextObject(text="Choose you fighters"),
-                        initial_users=[],
-                    ),
-                    label=PlainTextObject(text="Fighters"),
-                ),
-                ActionsBlock(
-                    block_id="schedule_block",
-                    elements=[
-                        StaticSelectElement(
-                            action_id="schedule_each_select",
-                            options=[
-                                Option(text=PlainTextObject(text=str(i)), value=str(i))
-                                for i in range(1, 32)
-                            ],
-                            initial_option=Option(
-                                text=PlainTextObject(text="1"), value="1"
-                            ),
-                        ),
-                        StaticSelectElement(
-                            action_id="schedule_temporal_select",
-                            options=[
-                                Option(
-                                    text=PlainTextObject(text="days"),
-                                    value=Temporal.day,
-                                ),
-                                Option(
-                                    text=PlainTextObject(text="business days"),
-                                    value=Temporal.bday,
-                                ),
-                                Option(
-                                    text=PlainTextObject(text="weeks"),
-                                    value=Temporal.week,
-                                ),
-                            ],
-                            initial_option=Option(
-                                text=PlainTextObject(text="business days"),
-                                value=Temporal.bday,
-                            ),
-                        ),
-                    ],
-                ),
-                ActionsBlock(
-                    block_id="start_end_block",
-                    # use DatePickerElement + TimePickerElement over DateTimePickerElement for better UI alignment
-                    elements=[
-                        DatePickerElement(
-                            action_id="start_date_select",
-                            initial_date=date.today().isoformat(),
-                        ),
-                        TimePickerElement(
-                            action_id="start_time_select",
-                            initial_time="09:00",
-                            timezone=Config().timezone,
-                        ),
-                    ],
-                ),
-            ],
-        ),
+        trigger_id=body["trigger_id"], view=create_view(any_fighters_element())
     )
+    logger.debug("view response: %s", res)
+
+    if fighters := fighters_element(body["channel_id"], logger):
+        view = res["view"]
+        try:
+            client.views_update(
+                view_id=view["id"], hash=view["hash"], view=create_view(fighters)
+            )
+        except SlackApiError as e:
+            logger.warning("can't update view %s: %s", view["id"], e)
 
-    logger.info(f"view response: {res}")
     # TODO handle list to show the shifts on completion
     respond(
         ":white_check_mark: New rotation has been created!", response_type="in_channel"
@@ -224,84 +664,164 @@ def handle_create(
 
 
 @app.view("view-oncall-create")
+@profiler.wrap
 def view_submission(ack: Ack, body: dict[str, Any], logger: Logger) -> None:
+    try:
+        rotation = create_rotation_submission.validate_python(body).to_rotation()
+    except ValidationError as e:
+        logger.info(StructuredMessage("invalid submission", errors=e.errors()))
+        ack(response_action="errors", errors=view_errors(e, body["view"]["blocks"]))
+        return
     ack()
-    logger.info(f"{json.dumps(body)=}")
-    values_focus = lens.Get("view").Get("state").Get("values")
-
-    option_val = lens.Get("selected_option").Get("value")
-    each_focus = (
-        values_focus
-        & lens.Get("schedule_block").Get("schedule_each_select")
-        & option_val
-    )
-    temporal_focus = (
-        values_focus
-        & lens.Get("schedule_block").Get("schedule_temporal_select")
-        & option_val
-    )
 
-    each = body & each_focus.F(int).get()
-    temporal = body & temporal_focus.F(Temporal).get()
+    # the user's next /oncall ls reads from primary, replica may not have the rotation yet
+    oncall_svc = OncallService(store_factory.for_user(body["user"]["id"]))
+    shifts = oncall_svc.create_rotation(rotation)
 
-    users = (
-        body
-        & (
-            values_focus & lens["fighters_block"]["fighters_select"]["selected_users"]
-        ).get()
+    logger.info(
+        StructuredMessage("rotation created", id=rotation.id, shifts=len(shifts))
     )
 
-    start_date = (
-        body
-        & (
-            values_focus & lens["start_end_block"]["start_date_select"]["selected_date"]
-        ).get()
-    )
-    start_time_focus = lens["start_end_block"]["start_time_select"]
-    start_time = body & (values_focus & start_time_focus & lens["selected_time"]).get()
-    # TODO set default TZ from config if not passed
-    start_time_tz = body & (values_focus & start_time_focus & lens["timezone"]).get()
-
-    rotation = Rotation(
-        schedule=Schedule(each=each, temporal=temporal),
-        fighters=users,
-        # TODO if start/end dates are timezone-aware, timezone field looks redundant
-        # start_date=datetime.fromisoformat(f"{start_date}T{start_time}").replace(
-        #     tzinfo=ZoneInfo(start_time_tz)
-        # ),
-        start_date=datetime.fromisoformat(f"{start_date}T{start_time}"),
-        timezone=start_time_tz,
-    )
 
-    oncall_svc = OncallService(store_factory)
-    shifts = oncall_svc.create_rotation(rotation)
-
-    logger.info(f"{shifts[:5]=}")
+def layer_name(layer: int) -> str:
+    return next(
+        (text for text, value in LAYER_OPTIONS if value == str(layer)), f"layer {layer}"
+    )
 
 
 @app.event("app_mention")
-def ping_firefighter(body: dict[str, Any], say: Say, logger: Logger) -> None:
-    oncall_svc = OncallService(store_factory)
-    shift = oncall_svc.get_current_shift()
-    logger.info(f"current {shift=}")
+@profiler.wrap
+def ping_firefighter(body: dict[str, Any], logger: Logger) -> None:
+    event = body["event"]
+    oncall_svc = OncallService(store_factory.for_user(event.get("user")))
+    oncall = oncall_svc.get_oncall()
+    logger.debug("oncall=%s", oncall)
     # TODO hint the future rotation/shifts if any
-    if shift is None:
-        say(":poop: No shifts are set!", thread_ts=body["event"]["ts"])
+    if not oncall:
+        outbound.post(event["channel"], ":poop: No shifts are set!", event["ts"])
+        return
+
+    if list(oncall) == [0]:
+        text = f"cc <@{oncall[0].firefighter}> as current firefighter"
+    else:
+        # every layer, primary first
+        fighters = ", ".join(
+            f"<@{shift.firefighter}> ({layer_name(layer)})"
+            for layer, shift in oncall.items()
+        )
+        text = f"cc {fighters} as current firefighters"
+    outbound.post(event["channel"], text, event["ts"])
+
+
+@app.command("/oncall", matchers=[match_profile])
+def handle_profile(
+    body: dict[str, Any], ack: Ack, respond: Respond, logger: Logger
+) -> None:
+    ack()
+
+    if body["user_id"] not in Config().profile.admins:
+        respond(text=":no_entry: Admins only", response_type="ephemeral")
         return
 
-    firefighter = shift.firefighter
-    say(f"cc <@{firefighter}> as current firefighter", thread_ts=body["event"]["ts"])
+    # settings are per process, each gunicorn worker has its own
+    arg = body["text"].removeprefix("profile").strip()
+    match arg:
+        case "":
+            pass
+        case "dump":
+            paths = profiler.dump()
+            respond(
+                text="\n".join(f"`{path}`" for path in paths) or "Nothing profiled yet",
+                response_type="ephemeral",
+            )
+            return
+        case _:
+            try:
+                profiler.rate = float(arg)
+            except ValueError:
+                respond(
+                    text="Usage: `/oncall profile [<rate 0..1>|dump]`, ie `/oncall profile 0.1`",
+                    response_type="ephemeral",
+                )
+                return
+            logger.info(
+                StructuredMessage("profiling", rate=profiler.rate, user=body["user_id"])
+            )
+
+    respond(
+        text=f"Profiling {profiler.rate:.0%} of calls, {profiler.calls} profiled in pid {os.getpid()}, "
+        f"dumped to `{profiler.path}`",
+        response_type="ephemeral",
+    )
+
+
+def keep_snapshot(factory: InMemoryStoreFactory, path: str, interval: int) -> None:
+    """Warm restart of in-memory store: restore snapshot (shifts are read lazily), save periodically and at exit."""
+    if os.path.exists(path):
+        factory.restore(path)
+    PeriodicJob(
+        "snapshot", interval, lambda: factory.save(path), delay=interval
+    ).start()
+    atexit.register(factory.save, path)
+
+
+def start_background(cfg: Config) -> None:
+    """Services next to the Slack handlers: snapshots, calendar feed, rolling rotations and compaction."""
+    if isinstance(store_factory, InMemoryStoreFactory) and cfg.snapshot.path:
+        keep_snapshot(store_factory, cfg.snapshot.path, cfg.snapshot.interval)
+    if cfg.ics.port:
+        from feed import FeedApp, serve_feed
+
+        serve_feed(FeedApp(store_factory, token=cfg.ics.token), cfg.ics.port)
+    # read-modify-write jobs, replica may lag behind
+    jobs_svc = OncallService(store_factory.primary())
+    # extends rotations after their last shift
+    PeriodicJob("roll", cfg.rolling.interval, jobs_svc.roll).start()
+    # purges deleted rotations, archives ended shifts
+    retention = (
+        timedelta(days=cfg.archive.retention_days)
+        if cfg.archive.retention_days
+        else None
+    )
+    PeriodicJob(
+        "compact",
+        cfg.archive.interval,
+        lambda: jobs_svc.compact(retention, cfg.archive.batch_size),
+    ).start()
 
 
 if __name__ == "__main__":
     # Create an app-level token with connections:write scope
     cfg = Config()
+
     match cfg.mode:
         case SlackMode.http:
+            start_background(cfg)
             app.start(port=cfg.port)
         case SlackMode.socket:
+            start_background(cfg)
             # TODO put tokens into config
             handler = SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"])
             handler.start()  # type:ignore[no-untyped-call]
+        case SlackMode.wsgi:
+            from server import serve
+
+            # in-memory state lives in the worker, so do snapshots and jobs; workers sharing the database
+            # run jobs once
+            per_worker = cfg.impl == Impl.mem or bool(
+                cfg.sql and in_memory(cfg.sql.url)
+            )
+            if per_worker and cfg.server.workers != 1:
+                raise ValueError(
+                    "in-memory store is per process, set BOB_SERVER__WORKERS=1"
+                )
+            background = functools.partial(start_background, cfg)
+            serve(
+                app,
+                cfg.server,
+                cfg.port,
+                post_fork=background if per_worker else None,
+                background=None if per_worker else background,
+            )
         case default:
             assert_never(default)
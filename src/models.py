@@ -2,7 +2,7 @@ import datetime
 import uuid
 from enum import StrEnum, auto
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from sqlmodel import SQLModel, Field
 
 from config import Config
@@ -12,11 +12,21 @@ class Temporal(StrEnum):
     day = auto()
     bday = auto()
     week = auto()
+    # custom recurrence, see Schedule.rule
+    rrule = auto()
+
+
+class Allocation(StrEnum):
+    round_robin = auto()
+    # balance weekend/holiday load between fighters, see allocator.BalancedAllocator
+    balanced = auto()
 
 
 class Schedule(SQLModel):
     each: int
     temporal: Temporal
+    # RRULE subset for Temporal.rrule (see rrule.RRule), ie "FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=10"
+    rule: str | None = None
 
 
 class Shift(SQLModel):
@@ -27,10 +37,29 @@ class Shift(SQLModel):
 
 
 class ShiftORM(Shift, table=True):
+    __table_args__ = (
+        # keyset pagination over rotation shifts, see ShiftStore.page
+        Index("ix_shiftorm_rotation_start_date_id", "rotation_id", "start_date", "id"),
+        # firefighter's shifts across rotations by start, see StoreFactory.shifts_of
+        Index(
+            "ix_shiftorm_firefighter_start_date_id", "firefighter", "start_date", "id"
+        ),
+    )
+
     rotation_id: str = Field(foreign_key="rotationorm.id")
     # rotation: "RotationORM" = Relationship(back_populates="shifts")
 
 
+class ShiftArchiveORM(Shift, table=True):
+    """Shifts ended before the retention, moved out of ShiftORM, see ShiftStore.archive."""
+
+    __table_args__ = (
+        Index("ix_shiftarchiveorm_rotation_end_date", "rotation_id", "end_date"),
+    )
+
+    rotation_id: str = Field(foreign_key="rotationorm.id")
+
+
 class Rotation(SQLModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     schedule: Schedule = Field(sa_type=JSON)
@@ -42,6 +71,15 @@ class Rotation(SQLModel):
         default_factory=lambda data: data["start_date"] + datetime.timedelta(days=365)  # type:ignore[misc,arg-type]
     )
     timezone: str = Field(default_factory=lambda: Config().timezone)
+    # holiday calendar id, business days only (see calendars.CalendarRegistry)
+    calendar: str | None = Field(default_factory=lambda: Config().calendar.default)
+    allocation: Allocation = Allocation.round_robin
+    # rolling rotation keeps only N weeks of shifts ahead, see OncallService.roll
+    horizon_weeks: int | None = None
+    # escalation layer, lower ones are paged first: 0 - primary, 1 - secondary, see layers
+    layer: int = 0
+    # bumped by every write of the rotation or its shifts, see RotationStore.changes_since
+    version: int = 0
     # TODO BaseTzInfo?
     # timezone: BaseTzInfo = Field(default_factory=lambda: timezone(Config().timezone), sa_type=String)
 
@@ -64,4 +102,53 @@ class RotationORM(Rotation, table=True):
     """
 
     # shifts: list[ShiftORM] = Relationship(back_populates="rotation")
-    pass
+
+    # soft-deleted rotations are hidden, their rows are purged in batches, see RotationStore.purge
+    deleted_at: datetime.datetime | None = Field(default=None, index=True)
+    # changes up to this version are compacted, see RotationStore.changes_since
+    log_floor: int = 0
+
+
+class ChangeKind(StrEnum):
+    created = auto()
+    swapped = auto()
+    deleted = auto()
+    archived = auto()
+
+
+class Change(SQLModel):
+    """Shift change logged at the rotation version it produced, see RotationStore.changes_since."""
+
+    version: int
+    kind: ChangeKind
+    shift: Shift
+
+
+class ChangeORM(SQLModel, table=True):
+    __table_args__ = (Index("ix_changeorm_rotation_version", "rotation_id", "version"),)
+
+    seq: int | None = Field(default=None, primary_key=True)
+    rotation_id: str = Field(foreign_key="rotationorm.id")
+    version: int
+    kind: ChangeKind
+    # shift as of the change (deleted shifts included)
+    shift_id: str
+    firefighter: str
+    start_date: datetime.datetime
+    # compaction drops changes of ended shifts
+    end_date: datetime.datetime = Field(index=True)
+
+
+class Outcome(SQLModel):
+    """Recorded ack response of a processed Slack request, see dedup.dedup_requests."""
+
+    status: int = 200
+    body: str = ""
+    headers: dict[str, list[str]] = Field(default_factory=dict)
+
+
+class RequestORM(SQLModel, table=True):
+    key: str = Field(primary_key=True)
+    expires_at: datetime.datetime = Field(index=True)
+    # not set while the request is in progress
+    outcome: Outcome | None = Field(default=None, sa_type=JSON)
@@ -0,0 +1,274 @@
+"""
+Outbound Slack Web API calls (announcements, notifications) sent from a background thread within Slack rate limits.
+
+Web API methods are rate limited per workspace by tiers (calls per minute): tier 2 - 20, tier 3 - 50, tier 4 - 100,
+chat.postMessage is special - about 1 message per second per channel with short bursts allowed.
+Over the limit Slack answers HTTP 429 `ratelimited` with a `Retry-After` header (seconds).
+See https://api.slack.com/apis/rate-limits
+
+Calls wait for a token of their method's bucket (per channel for chat.postMessage), 429s pause the bucket for
+`Retry-After` and the call is retried. Plain text messages posted to the same channel/thread within a short window
+are sent as one message.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+
+class Limit(NamedTuple):
+    per_minute: float
+    # calls allowed right away after idling
+    burst: int = 1
+    # bucket per channel rather than per workspace
+    per_channel: bool = False
+
+
+TIER_2 = Limit(20, burst=2)
+TIER_3 = Limit(50, burst=3)
+TIER_4 = Limit(100, burst=5)
+# write methods only, answers aren't returned to the caller and calls are sent as JSON bodies (read methods take
+# form arguments), handlers read with the WebClient
+LIMITS = {
+    "chat.postMessage": Limit(60, burst=3, per_channel=True),
+    "chat.postEphemeral": TIER_4,
+    "chat.update": TIER_3,
+    "reactions.add": TIER_3,
+    "views.open": TIER_4,
+}
+# unknown methods
+DEFAULT_LIMIT = TIER_2
+# coalesced messages are split above this, Slack truncates longer texts
+MAX_TEXT = 4000
+
+
+class TokenBucket:
+    """`burst` tokens refilled at `rate` per second, not thread-safe."""
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = now
+        # no tokens before this (Retry-After)
+        self._paused_until = now
+
+    def wait(self, now: float) -> float:
+        """Seconds until a token is available."""
+        self._refill(now)
+        return max(self._paused_until - now, (1 - self._tokens) / self.rate, 0)
+
+    def take(self, now: float) -> bool:
+        if self.wait(now) > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    def pause(self, now: float, seconds: float) -> None:
+        """Rate limited by Slack: nothing for `seconds`, then a single token to start over."""
+        self._refill(now)
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = min(self._tokens, 1)
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            start = max(self._updated, self._paused_until)
+            if now > start:
+                self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+            self._updated = now
+
+
+class Call:
+    """Queued Web API call, chat.postMessage texts are collected until it's sent."""
+
+    def __init__(
+        self, method: str, params: dict[str, Any], texts: list[str] | None = None
+    ) -> None:
+        self.method = method
+        self.params = params
+        self.texts = texts
+        self.attempts = 0
+
+    @property
+    def channel(self) -> str | None:
+        channel = self.params.get("channel")
+        return channel if isinstance(channel, str) else None
+
+    def payload(self) -> dict[str, Any]:
+        params = {k: v for k, v in self.params.items() if v is not None}
+        if self.texts is not None:
+            params["text"] = "\n".join(self.texts)
+        return params
+
+
+class Dispatcher:
+    """
+    Queue of outbound Web API calls sent in order of readiness by a worker thread, started on first call (so the
+    dispatcher can be created before gunicorn forks workers). Calls are sent as JSON bodies (write methods).
+    """
+
+    def __init__(
+        self,
+        client: WebClient,
+        limits: dict[str, Limit] = LIMITS,
+        coalesce_window: float = 0.5,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.limits = limits
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.clock = clock
+        self._cond = threading.Condition()
+        # (ready at, seq, call), seq keeps FIFO order among ready calls
+        self._queue: list[tuple[float, int, Call]] = []
+        self._seq = itertools.count()
+        # (channel, thread_ts) -> chat.postMessage not sent yet, more texts are appended
+        self._open: dict[tuple[str, str | None], Call] = {}
+        # (method, channel or None)
+        self._buckets: dict[tuple[str, str | None], TokenBucket] = {}
+        # queued or in flight
+        self._pending = 0
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def post(
+        self,
+        channel: str,
+        text: str,
+        thread_ts: str | None = None,
+        blocks: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """chat.postMessage, texts (without blocks) to the same channel/thread are joined until it's sent."""
+        key = (channel, thread_ts)
+        with self._cond:
+            call = self._open.get(key) if blocks is None else None
+            if call is not None and call.texts is not None:
+                if sum(map(len, call.texts)) + len(call.texts) + len(text) <= MAX_TEXT:
+                    call.texts.append(text)
+                    return
+            call = Call(
+                "chat.postMessage",
+                {"channel": channel, "thread_ts": thread_ts, "blocks": blocks},
+                texts=[text],
+            )
+            if blocks is None:
+                self._open[key] = call
+            self._push(call, self.clock() + self.coalesce_window)
+
+    def call(self, method: str, **params: Any) -> None:
+        """Web API write method, sent once its rate limit allows, see LIMITS."""
+        with self._cond:
+            self._push(Call(method, params), self.clock())
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued is sent (or dropped), False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Send what's queued and stop the worker."""
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _push(self, call: Call, ready_at: float) -> None:
+        if self._stopped:
+            raise RuntimeError("dispatcher is stopped")
+        self._pending += 1
+        heapq.heappush(self._queue, (ready_at, next(self._seq), call))
+        self._cond.notify_all()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="outbound", daemon=True
+            )
+            self._thread.start()
+
+    def _bucket(self, call: Call, now: float) -> TokenBucket:
+        limit = self.limits.get(call.method, DEFAULT_LIMIT)
+        key = (call.method, call.channel if limit.per_channel else None)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(limit.per_minute / 60, limit.burst, now)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _next(self) -> Call | None:
+        """Wait for a ready call with a token, None once stopped."""
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                now = self.clock()
+                ready_at, seq, call = self._queue[0]
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+                bucket = self._bucket(call, now)
+                wait = bucket.wait(now)
+                if wait > 0:
+                    # requeued, messages keep coalescing while waiting
+                    heapq.heapreplace(self._queue, (now + wait, seq, call))
+                    continue
+                bucket.take(now)
+                heapq.heappop(self._queue)
+                if call.texts is not None and call.channel is not None:
+                    key = (call.channel, call.params.get("thread_ts"))
+                    if self._open.get(key) is call:
+                        del self._open[key]
+                return call
+
+    def _run(self) -> None:
+        while (call := self._next()) is not None:
+            retry_after = self._send(call)
+            with self._cond:
+                if retry_after is not None:
+                    now = self.clock()
+                    self._bucket(call, now).pause(now, retry_after)
+                    heapq.heappush(
+                        self._queue, (now + retry_after, next(self._seq), call)
+                    )
+                else:
+                    self._pending -= 1
+                self._cond.notify_all()
+
+    def _send(self, call: Call) -> float | None:
+        """Seconds to retry after if rate limited, None once sent or failed."""
+        try:
+            self.client.api_call(call.method, json=call.payload())
+        except SlackApiError as e:
+            if e.response.status_code == 429 and call.attempts < self.max_retries:
+                call.attempts += 1
+                retry_after = next(
+                    (
+                        v
+                        for k, v in e.response.headers.items()
+                        if k.lower() == "retry-after"
+                    ),
+                    "1",
+                )
+                logger.info(
+                    "%s rate limited, retry %d in %ss",
+                    call.method,
+                    call.attempts,
+                    retry_after,
+                )
+                return float(retry_after)
+            logger.error("%s failed: %s", call.method, e.response.get("error"))
+        except Exception:
+            logger.exception("%s failed", call.method)
+        return None
@@ -0,0 +1,182 @@
+"""
+Typed Slack interaction payloads, validated in one pass by precompiled adapters.
+Field names follow block/action ids of the views built in main.
+"""
+
+import datetime
+from typing import Any, Generic, TypeVar
+
+from pydantic import (
+    BaseModel,
+    TypeAdapter,
+    ValidationError,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
+
+from models import Allocation, Rotation, Schedule, Temporal
+from rrule import RRule
+
+T = TypeVar("T")
+
+
+class Option(BaseModel, Generic[T]):
+    value: T
+
+
+class StaticSelect(BaseModel, Generic[T]):
+    selected_option: Option[T]
+
+
+class FightersSelect(BaseModel):
+    # users_select (selected_users) or static_select of channel members (selected_options)
+    selected_users: list[str] | None = None
+    selected_options: list[Option[str]] | None = None
+
+    @model_validator(mode="after")
+    def check_selected(self) -> "FightersSelect":
+        if not self.users:
+            raise ValueError("select at least one fighter")
+        return self
+
+    @property
+    def users(self) -> list[str]:
+        if self.selected_users:
+            return self.selected_users
+        return [o.value for o in self.selected_options or []]
+
+
+class DatePicker(BaseModel):
+    selected_date: datetime.date
+
+
+class TimePicker(BaseModel):
+    selected_time: datetime.time
+    timezone: str
+
+
+class ScheduleBlock(BaseModel):
+    schedule_each_select: StaticSelect[int]
+    schedule_temporal_select: StaticSelect[Temporal]
+    schedule_allocation_select: StaticSelect[Allocation]
+    # weeks, 0 - fixed 1 year rotation
+    schedule_horizon_select: StaticSelect[int]
+    # escalation layer, primary if not sent
+    schedule_layer_select: StaticSelect[int] = StaticSelect(
+        selected_option=Option(value=0)
+    )
+
+
+class FightersBlock(BaseModel):
+    fighters_select: FightersSelect
+
+
+class StartEndBlock(BaseModel):
+    start_date_select: DatePicker
+    start_time_select: TimePicker
+
+
+class RuleInput(BaseModel):
+    value: str | None = None
+
+    @field_validator("value")
+    @classmethod
+    def check_rule(cls, value: str | None) -> str | None:
+        if value:
+            RRule.parse(value)
+        return value
+
+
+class RuleBlock(BaseModel):
+    schedule_rule_input: RuleInput = RuleInput()
+
+
+class CreateRotationValues(BaseModel):
+    schedule_block: ScheduleBlock
+    fighters_block: FightersBlock
+    start_end_block: StartEndBlock
+    # optional input block
+    rule_block: RuleBlock = RuleBlock()
+
+    @field_validator("rule_block")
+    @classmethod
+    def check_rule_required(
+        cls, rule_block: RuleBlock, info: ValidationInfo
+    ) -> RuleBlock:
+        schedule: ScheduleBlock | None = info.data.get("schedule_block")
+        if (
+            schedule
+            and schedule.schedule_temporal_select.selected_option.value
+            == Temporal.rrule
+            and not rule_block.schedule_rule_input.value
+        ):
+            raise ValueError("custom schedule requires a rule")
+        return rule_block
+
+
+class CreateRotationState(BaseModel):
+    values: CreateRotationValues
+
+
+class CreateRotationView(BaseModel):
+    state: CreateRotationState
+
+
+class CreateRotationSubmission(BaseModel):
+    """`view-oncall-create` view_submission payload, only fields in use."""
+
+    view: CreateRotationView
+
+    def to_rotation(self) -> Rotation:
+        values = self.view.state.values
+        schedule = values.schedule_block
+        start = values.start_end_block
+        temporal = schedule.schedule_temporal_select.selected_option.value
+        return Rotation(
+            schedule=Schedule(
+                each=schedule.schedule_each_select.selected_option.value,
+                temporal=temporal,
+                rule=values.rule_block.schedule_rule_input.value
+                if temporal == Temporal.rrule
+                else None,
+            ),
+            fighters=values.fighters_block.fighters_select.users,
+            # TODO if start/end dates are timezone-aware, timezone field looks redundant
+            start_date=datetime.datetime.combine(
+                start.start_date_select.selected_date,
+                start.start_time_select.selected_time,
+            ),
+            timezone=start.start_time_select.timezone,
+            allocation=schedule.schedule_allocation_select.selected_option.value,
+            horizon_weeks=schedule.schedule_horizon_select.selected_option.value
+            or None,
+            layer=schedule.schedule_layer_select.selected_option.value,
+        )
+
+
+create_rotation_submission = TypeAdapter(CreateRotationSubmission)
+
+
+def view_errors(error: ValidationError, blocks: list[dict[str, Any]]) -> dict[str, str]:
+    """Validation errors by input block id, as expected by `ack(response_action="errors")`.
+
+    Slack rejects errors keyed by any other block type, so errors in an actions block
+    are shown on the nearest input block above it, next to its own.
+    """
+    inputs: dict[str, str] = {}
+    last = next((b["block_id"] for b in blocks if b["type"] == "input"), None)
+    for b in blocks:
+        if b["type"] == "input":
+            last = b["block_id"]
+        if last is not None:
+            inputs[b["block_id"]] = last
+
+    errors: dict[str, list[str]] = {}
+    for e in error.errors():
+        loc: tuple[Any, ...] = e["loc"]
+        if "values" in loc[:-1]:
+            block_id = inputs.get(str(loc[loc.index("values") + 1]))
+            if block_id is not None and e["msg"] not in errors.get(block_id, []):
+                errors.setdefault(block_id, []).append(e["msg"])
+    return {block_id: "; ".join(msgs) for block_id, msgs in errors.items()}
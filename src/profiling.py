@@ -0,0 +1,169 @@
+"""
+On-demand profiling of Slack listeners in production, enabled by config or `/oncall profile <rate>`.
+
+A sampled fraction of listener calls runs under cProfile, while their stacks are sampled by a background thread.
+Both are aggregated per process and dumped to `<path>/<pid>.pstats` (`python -m pstats`, snakeviz) and
+`<path>/<pid>.collapsed` (folded stacks for flamegraph.pl, speedscope). Stacks start at the listener,
+Bolt's dispatching is left out.
+"""
+
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+if TYPE_CHECKING:
+    import pstats
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def collapse(frame: FrameType | None, root: CodeType) -> str:
+    """`outer;...;inner` frames up to (not including) `root`."""
+    names = []
+    while frame is not None and frame.f_code is not root:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profiler:
+    """
+    Profiles `rate` of the calls of wrapped listeners (0 - off, costs a comparison per call), see `wrap`.
+    Stacks of profiled calls are sampled every `interval` seconds. Profiles are dumped by the profiled calls
+    once `dump_interval` seconds passed since the last dump, so each (gunicorn worker) process writes its own.
+
+    A single call is profiled at a time (cProfile hooks are per process since Python 3.12), calls arriving
+    meanwhile run as is. Profiler failures are logged, they never fail the listener.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        path: str | Path,
+        interval: float = 0.005,
+        dump_interval: float | None = None,
+    ) -> None:
+        self.rate = rate
+        self.path = Path(path)
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self._dumped_at = time.monotonic()
+        # profiled calls since start
+        self.calls = 0
+        self._stats: "pstats.Stats | None" = None
+        self._stacks: Counter[str] = Counter()
+        # threads running profiled calls
+        self._active: set[int] = set()
+        self._cond = threading.Condition()
+        self._sampler: threading.Thread | None = None
+        # held by the profiled call
+        self._profiling = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float) -> None:
+        # NaN is off
+        self._rate = min(rate, 1.0) if rate > 0 else 0.0
+
+    def wrap(self, fn: F) -> F:
+        """Listener decorator, the signature is kept for Bolt's argument injection."""
+
+        @functools.wraps(fn)
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            if self._rate <= 0.0 or random.random() >= self._rate:
+                return fn(*args, **kwargs)
+            if not self._profiling.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                return self._profile(fn, *args, **kwargs)
+            finally:
+                self._profiling.release()
+
+        return cast(F, profiled)
+
+    def dump(self) -> list[Path]:
+        """Write aggregated profiles, written files (none if nothing was profiled yet)."""
+        with self._cond:
+            if self._stats is None:
+                return []
+            self.path.mkdir(parents=True, exist_ok=True)
+            stats_path = self.path / f"{os.getpid()}.pstats"
+            self._stats.dump_stats(stats_path)
+            stacks_path = self.path / f"{os.getpid()}.collapsed"
+            stacks_path.write_text(
+                "".join(f"{stack} {n}\n" for stack, n in sorted(self._stacks.items()))
+            )
+            calls = self.calls
+            self._dumped_at = time.monotonic()
+        logger.info("dumped %s profiled calls to %s", calls, self.path)
+        return [stats_path, stacks_path]
+
+    def _profile(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        try:
+            # fails if another profiler (ie a debugger's) is active
+            profile.enable()
+        except Exception:
+            logger.exception("profiling failed")
+            return fn(*args, **kwargs)
+        thread_id = threading.get_ident()
+        with self._cond:
+            self._active.add(thread_id)
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample, name="profiler", daemon=True
+                )
+                self._sampler.start()
+            self._cond.notify_all()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            try:
+                with self._cond:
+                    self._active.discard(thread_id)
+                    self.calls += 1
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+                    due = (
+                        self.dump_interval is not None
+                        and time.monotonic() - self._dumped_at >= self.dump_interval
+                    )
+                if due:
+                    self.dump()
+            except Exception:
+                logger.exception("profiling failed")
+
+    def _sample(self) -> None:
+        # stacks start at the listener
+        root = Profiler._profile.__code__
+        while True:
+            with self._cond:
+                # idle until a profiled call starts
+                self._cond.wait_for(lambda: bool(self._active))
+                frames = sys._current_frames()
+                for thread_id in self._active:
+                    if stack := collapse(frames.get(thread_id), root):
+                        self._stacks[stack] += 1
+                del frames
+            time.sleep(self.interval)
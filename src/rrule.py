@@ -0,0 +1,123 @@
+"""
+Recurrence rules for custom rotation schedules, a subset of RFC 5545 RRULE:
+
+    FREQ=DAILY|WEEKLY;INTERVAL=<n>;BYDAY=MO,TH;BYHOUR=10;BYMINUTE=0
+
+ie "Monday and Thursday at 10:00" is `FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=10`,
+"every other week starting Wednesday" is `FREQ=WEEKLY;INTERVAL=2;BYDAY=WE`.
+BYDAY defaults to the start weekday, BYHOUR/BYMINUTE to the start time (as DTSTART in RFC 5545).
+"""
+
+import bisect
+import datetime as dt
+from collections.abc import Iterator
+from enum import StrEnum
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+class Freq(StrEnum):
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+
+
+class RRule(BaseModel):
+    freq: Freq
+    interval: Annotated[int, Field(gt=0)] = 1
+    # weekday numbers, Monday is 0
+    byday: tuple[Annotated[int, Field(ge=0, le=6)], ...] = ()
+    byhour: tuple[Annotated[int, Field(ge=0, le=23)], ...] = ()
+    byminute: tuple[Annotated[int, Field(ge=0, le=59)], ...] = ()
+
+    @classmethod
+    def parse(cls, rule: str) -> "RRule":
+        """Parse `KEY=VALUE;...` rule, raises ValueError (pydantic.ValidationError) for invalid rules."""
+        parts: dict[str, str] = {}
+        for part in rule.strip().removeprefix("RRULE:").split(";"):
+            key, sep, value = part.partition("=")
+            if not sep or not value:
+                raise ValueError(f"Invalid rule part: {part!r}")
+            parts[key.strip().upper()] = value.strip().upper()
+
+        unknown = parts.keys() - {"FREQ", "INTERVAL", "BYDAY", "BYHOUR", "BYMINUTE"}
+        if unknown:
+            raise ValueError(f"Unsupported rule parts: {', '.join(sorted(unknown))}")
+        if "BYDAY" in parts and parts.get("FREQ") != Freq.WEEKLY:
+            raise ValueError("BYDAY is supported for FREQ=WEEKLY only")
+
+        def ints(key: str) -> list[str]:
+            return parts[key].split(",") if key in parts else []
+
+        byday = []
+        for day in ints("BYDAY"):
+            if day not in WEEKDAYS:
+                raise ValueError(f"Invalid weekday: {day!r}")
+            byday.append(WEEKDAYS.index(day))
+
+        return cls.model_validate(
+            {
+                "freq": parts.get("FREQ"),
+                "interval": parts.get("INTERVAL", 1),
+                "byday": byday,
+                "byhour": ints("BYHOUR"),
+                "byminute": ints("BYMINUTE"),
+            }
+        )
+
+
+class Recurrence:
+    """
+    Occurrences of a rule starting at `start`. Each period (day or week) has the same sorted offsets
+    from its beginning, and only every `interval`-th period counting from the start one is active,
+    so the first occurrence after any timestamp is found with arithmetic and a bisect over offsets,
+    without iterating from the start.
+    """
+
+    def __init__(self, rule: RRule, start: dt.datetime) -> None:
+        self.rule = rule
+        self.start = start
+        midnight = dt.datetime.combine(start.date(), dt.time(), start.tzinfo)
+
+        match rule.freq:
+            case Freq.DAILY:
+                self.period = dt.timedelta(days=1)
+                self.anchor = midnight
+                days = [0]
+            case Freq.WEEKLY:
+                self.period = dt.timedelta(weeks=1)
+                self.anchor = midnight - dt.timedelta(days=start.weekday())
+                days = sorted(set(rule.byday or [start.weekday()]))
+
+        hours = sorted(set(rule.byhour or [start.hour]))
+        minutes = sorted(set(rule.byminute or [start.minute]))
+        self.offsets = [
+            dt.timedelta(days=d, hours=h, minutes=m)
+            for d in days
+            for h in hours
+            for m in minutes
+        ]
+
+    def after(self, t: dt.datetime) -> Iterator[dt.datetime]:
+        """Lazily yield occurrences at or after `t` (but not before start)."""
+        t = max(t, self.start)
+        interval = self.rule.interval
+        period = (t - self.anchor) // self.period
+        if period % interval:
+            # inactive period, jump to the next active one
+            period += interval - period % interval
+            i = 0
+        else:
+            i = bisect.bisect_left(self.offsets, t - self.anchor - period * self.period)
+
+        while True:
+            period_start = self.anchor + period * self.period
+            for offset in self.offsets[i:]:
+                yield period_start + offset
+            period += interval
+            i = 0
+
+    def __iter__(self) -> Iterator[dt.datetime]:
+        return self.after(self.start)
@@ -0,0 +1,105 @@
+"""
+Production HTTP serving (SlackMode.wsgi): Bolt's WSGI adapter under gunicorn worker processes.
+
+Workers are forked from the master process that built the app, and may be re-forked at any time
+(timeouts, restarts), so the master never queries stores: engines are created in workers after the fork
+(`reset_global_engines` drops any inherited pool), background jobs run in a process of their own.
+"""
+
+import logging
+import os
+import signal
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from slack_bolt import App
+from slack_bolt.adapter.wsgi import SlackRequestHandler
+
+from config import ServerConfig
+from store.sa import reset_global_engines
+
+logger = logging.getLogger(__name__)
+
+
+class BoltServer(BaseApplication):  # type: ignore[misc]
+    def __init__(
+        self,
+        app: App,
+        cfg: ServerConfig,
+        port: int,
+        post_fork: Callable[[], None] | None = None,
+        background: Callable[[], None] | None = None,
+    ) -> None:
+        self.app = app
+        self.options = {
+            "bind": f"0.0.0.0:{port}",
+            "workers": cfg.workers,
+            # threads share a worker's stores and caches, keep-alive is supported by threaded workers only
+            "worker_class": "gthread",
+            "threads": cfg.threads,
+            "keepalive": cfg.keepalive,
+            "graceful_timeout": cfg.graceful_timeout,
+            "timeout": cfg.timeout,
+            "on_starting": self._on_starting,
+            "post_fork": self._post_fork,
+            "on_exit": self._on_exit,
+        }
+        self.post_fork = post_fork
+        self.background = background
+        self._background_pid: int | None = None
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> SlackRequestHandler:
+        return SlackRequestHandler(self.app)
+
+    def _on_starting(self, server: Any) -> None:
+        # before the master installs its signal handlers and forks workers
+        if self.background is None:
+            return
+        pid = os.fork()
+        if pid:
+            self._background_pid = pid
+            logger.info("background jobs started, pid %s", pid)
+            return
+        try:
+            self.background()
+            # jobs are daemon threads
+            threading.Event().wait()
+        finally:
+            os._exit(1)
+
+    def _post_fork(self, server: Any, worker: Any) -> None:
+        reset_global_engines()
+        if self.post_fork:
+            self.post_fork()
+        logger.info("worker %s started", worker.pid)
+
+    def _on_exit(self, server: Any) -> None:
+        if self._background_pid is None:
+            return
+        try:
+            os.kill(self._background_pid, signal.SIGTERM)
+            os.waitpid(self._background_pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            # died already, reaped by the master
+            pass
+
+
+def serve(
+    app: App,
+    cfg: ServerConfig,
+    port: int,
+    post_fork: Callable[[], None] | None = None,
+    background: Callable[[], None] | None = None,
+) -> None:
+    """
+    Serve until SIGTERM/SIGINT. `post_fork` runs in every worker (ie jobs next to per-process state),
+    `background` starts jobs once, in a process forked before the workers and stopped with the master.
+    """
+    BoltServer(app, cfg, port, post_fork, background).run()
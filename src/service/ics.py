@@ -0,0 +1,96 @@
+import datetime
+import hashlib
+from collections.abc import Iterator
+from datetime import UTC
+
+from models import Rotation, Shift
+from store.factory import StoreFactory
+
+CRLF = "\r\n"
+DT_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+def format_dt(dt: datetime.datetime) -> str:
+    # SQLite doesn't persist timezone, all stored dates are UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC).strftime(DT_FORMAT)
+
+
+def escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold content lines longer than 75 octets: https://datatracker.ietf.org/doc/html/rfc5545#section-3.1"""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + CRLF
+
+    chunks = []
+    start, limit = 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        # don't split multibyte utf-8 sequences
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        chunks.append(raw[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return (CRLF + " ").join(chunks) + CRLF
+
+
+class IcsService:
+    """
+    iCalendar (RFC 5545) export of rotation shifts.
+    Shifts are read from the store page by page and rendered lazily,
+    so the feed is streamed to the client without loading the whole rotation.
+    """
+
+    def __init__(self, store_factory: StoreFactory, page_size: int = 500):
+        self.store_factory = store_factory
+        self.page_size = page_size
+
+    def etag(self, rotation: Rotation, user: str | None = None) -> str:
+        # every write of the rotation or its shifts bumps the version, shifts aren't read
+        digest = hashlib.sha1(f"{rotation.id}:{rotation.version}".encode())
+        digest.update((user or "").encode())
+        return f'"{digest.hexdigest()}"'
+
+    def iter_shifts(
+        self, rotation: Rotation, user: str | None = None
+    ) -> Iterator[Shift]:
+        shift_store = self.store_factory.shifts(rotation)
+        dt_from = None
+        while True:
+            page = shift_store.list(dt_from, limit=self.page_size)
+            for shift in page:
+                if user is None or shift.firefighter == user:
+                    yield shift
+            if len(page) < self.page_size:
+                return
+            dt_from = page[-1].start_date
+
+    def iter_lines(self, rotation: Rotation, user: str | None = None) -> Iterator[str]:
+        dtstamp = format_dt(rotation.start_date)
+        yield fold("BEGIN:VCALENDAR")
+        yield fold("VERSION:2.0")
+        yield fold("PRODID:-//shift-bob//oncall//EN")
+        yield fold("CALSCALE:GREGORIAN")
+        yield fold(f"X-WR-CALNAME:{escape('On-call rotation')}")
+        for shift in self.iter_shifts(rotation, user):
+            yield (
+                fold("BEGIN:VEVENT")
+                + fold(f"UID:{shift.id}@shift-bob")
+                + fold(f"DTSTAMP:{dtstamp}")
+                + fold(f"DTSTART:{format_dt(shift.start_date)}")
+                + fold(f"DTEND:{format_dt(shift.end_date)}")
+                + fold(f"SUMMARY:{escape(f'On-call: {shift.firefighter}')}")
+                + fold("TRANSP:TRANSPARENT")
+                + fold("END:VEVENT")
+            )
+        yield fold("END:VCALENDAR")
@@ -1,18 +1,43 @@
+import bisect
 import datetime
 import logging
-from itertools import cycle, pairwise
+from collections import defaultdict
+from itertools import pairwise
 from zoneinfo import ZoneInfo
 
 import pytz
 
 from datetime import UTC
 from config import Config
-from models import Rotation, Shift
-from shifter import Shifter
+from layers import Timeline
+from models import Allocation, Rotation, Shift, Temporal
 from store.factory import StoreFactory
+from store.shift import Cursor
 
 logger = logging.getLogger(__name__)
 
+# smallest datetime step, [now, now + TICK) covers the instant
+TICK = datetime.timedelta(microseconds=1)
+
+
+def as_utc(dt: datetime.datetime) -> datetime.datetime:
+    # SQLite doesn't persist timezone, all stored dates are UTC
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
+
+
+def utc_shift(shift: Shift) -> Shift:
+    # SQLite returns naive dates, shifts of different rotations are compared
+    if shift.start_date.tzinfo:
+        return shift
+    return shift.model_copy(
+        update={
+            "start_date": as_utc(shift.start_date),
+            "end_date": as_utc(shift.end_date),
+        }
+    )
+
 
 class OncallService:
     def __init__(self, store_factory: StoreFactory):
@@ -21,45 +46,160 @@ class OncallService:
     def create_rotation(self, rotation: Rotation) -> list[Shift]:
         """
         Create rotation with all shifts between start and end dates (1 year by default).
+        Rolling rotations get only `horizon_weeks` of shifts, the rest is appended by `roll` later.
         All dates are converted from user specific timezone and stored in UTC.
         """
-        logger.debug(f"create {rotation=}")
-        rotation = rotation.model_copy()
+        logger.debug("create rotation=%s", rotation)
         tz = pytz.timezone(rotation.timezone)
 
-        # UTC doesn't respect daylight-saving (DST)
-        #   Sat, 2025-03-08 09:00 EST -> Sat, 2025-03-08 14:00 UTC
-        #   Mon, 2025-03-10 10:00 EDT -> Mon, 2025-03-10 14:00 UTC
-        # hence, generate dates with naive datetime first to skip DST offsets
-        shifter = Shifter.apply(
-            start_dt=rotation.start_date,
-            end_dt=rotation.end_date,
-            temporal=rotation.schedule.temporal,
-        )
+        start_dt, end_dt = rotation.start_date, rotation.end_date
+        if rotation.horizon_weeks:
+            end_dt = start_dt + datetime.timedelta(weeks=rotation.horizon_weeks)
 
         # set timezone with localize, it doesn't change date/time parts (just adds tz info)
         # and then convert to UTC, ie
         # 06:00:00, EST-0500 -> 06:00:00 EST-0500 -> 12:00:00 CET+0100
-        rotation.start_date = tz.localize(rotation.start_date).astimezone(UTC)
-        rotation.end_date = tz.localize(rotation.end_date).astimezone(UTC)
+        # single shallow copy with UTC dates, validated fields are reused as is
+        rotation = rotation.model_copy(
+            update={
+                "start_date": tz.localize(start_dt).astimezone(UTC),
+                "end_date": tz.localize(end_dt).astimezone(UTC),
+            }
+        )
         self.store_factory.rotation().create(rotation)
 
-        # create all shifts
-        fighters = cycle(rotation.fighters)
+        return self._create_shifts(rotation, start_dt, end_dt, rotation.fighters)
 
+    def extend_rotation(
+        self, rotation: Rotation, until: datetime.datetime
+    ) -> list[Shift]:
+        """Append shifts after the last stored one up to `until`, continuing the fighters cycle."""
         shift_store = self.store_factory.shifts(rotation)
+        last = shift_store.last()
+        if last is None:
+            return []
 
-        shifts = []
-        for start_dt, end_dt in pairwise(shifter.get_index(rotation.schedule.each)):
-            shift = Shift(
-                firefighter=next(fighters),
-                start_date=tz.localize(start_dt).astimezone(UTC),
-                end_date=tz.localize(end_dt).astimezone(UTC),
+        tz = pytz.timezone(rotation.timezone)
+        start_dt = as_utc(last.end_date).astimezone(tz).replace(tzinfo=None)
+        end_dt = as_utc(until).astimezone(tz).replace(tzinfo=None)
+        if end_dt <= start_dt:
+            return []
+
+        # next fighter goes first
+        i = (
+            rotation.fighters.index(last.firefighter) + 1
+            if last.firefighter in rotation.fighters
+            else 0
+        )
+        fighters = rotation.fighters[i:] + rotation.fighters[:i]
+        shifts = self._create_shifts(rotation, start_dt, end_dt, fighters)
+
+        if as_utc(until) > as_utc(rotation.end_date):
+            self.store_factory.rotation().update(
+                rotation.model_copy(update={"end_date": as_utc(until)})
             )
-            logger.debug(f"create {shift=}")
-            shift_store.create(shift)
-            shifts.append(shift)
+        return shifts
+
+    def roll(self, now: datetime.datetime | None = None) -> int:
+        """
+        Extend rolling rotations to keep `horizon_weeks` of shifts ahead of now.
+        Supposed to run periodically, so each run appends just a few shifts.
+        Returns number of created shifts.
+        """
+        if now is None:
+            now = datetime.datetime.now(tz=UTC)
+
+        created = 0
+        for rotation in self.store_factory.rotation().list_rolling():
+            assert rotation.horizon_weeks
+            until = now + datetime.timedelta(weeks=rotation.horizon_weeks)
+            created += len(self.extend_rotation(rotation, until))
+        logger.debug("rolled %s shifts", created)
+        return created
+
+    def delete_rotation(self, rotation_id: str) -> bool:
+        """Soft-delete, the rotation is gone for readers right away, its rows are purged by `compact`."""
+        return self.store_factory.rotation().delete(rotation_id)
+
+    def compact(
+        self,
+        retention: datetime.timedelta | None,
+        batch_size: int,
+        now: datetime.datetime | None = None,
+    ) -> int:
+        """
+        Keep only live data in hot tables: purge deleted rotations, and if `retention` is set, archive shifts
+        ended before `now - retention` and drop their change log. Supposed to run periodically.
+        Returns number of purged/moved rows.
+        """
+        if now is None:
+            now = datetime.datetime.now(tz=UTC)
+
+        rotations = self.store_factory.rotation()
+        rows = rotations.purge(batch_size)
+        if retention is not None:
+            before = as_utc(now) - retention
+            for rotation in rotations.list():
+                rows += self.store_factory.shifts(rotation).archive(before, batch_size)
+            rows += rotations.compact(before, batch_size)
+        logger.debug("compacted %s rows", rows)
+        return rows
+
+    def _create_shifts(
+        self,
+        rotation: Rotation,
+        start_dt: datetime.datetime,
+        end_dt: datetime.datetime,
+        fighters: list[str],
+    ) -> list[Shift]:
+        """Create shifts between naive start/end dates in the rotation timezone."""
+        # pandas takes a large part of the cold start, load it on first rotation/shifts creation
+        from allocator import Allocator
+        from calendars import calendar_registry
+        from shifter import Shifter
+
+        tz = pytz.timezone(rotation.timezone)
+        # holidays matter to business day schedules and balanced allocation only
+        calendar = (
+            rotation.calendar if rotation.schedule.temporal == Temporal.bday else None
+        )
+        holidays = (
+            rotation.calendar if rotation.allocation == Allocation.balanced else None
+        )
+
+        # UTC doesn't respect daylight-saving (DST)
+        #   Sat, 2025-03-08 09:00 EST -> Sat, 2025-03-08 14:00 UTC
+        #   Mon, 2025-03-10 10:00 EDT -> Mon, 2025-03-10 14:00 UTC
+        # hence, generate dates with naive datetime first to skip DST offsets
+        shifter = Shifter.apply(
+            start_dt=start_dt,
+            end_dt=end_dt,
+            temporal=rotation.schedule.temporal,
+            calendar=calendar_registry().get(calendar) if calendar else None,
+            rule=rotation.schedule.rule,
+        )
 
+        allocator = Allocator.apply(
+            rotation.allocation,
+            fighters,
+            holidays=calendar_registry().holidays(holidays)
+            if holidays
+            else frozenset(),
+        )
+        index = list(shifter.get_index(rotation.schedule.each))
+        intervals = list(pairwise(index))
+
+        # adjacent shifts share boundaries, convert each one once
+        utc = [tz.localize(dt).astimezone(UTC) for dt in index]
+        # validating constructor runs in pydantic-core, it's faster than SQLModel's python model_construct
+        shifts = [
+            Shift(firefighter=firefighter, start_date=start, end_date=end)
+            for (start, end), firefighter in zip(
+                pairwise(utc), allocator.assign(intervals)
+            )
+        ]
+        logger.debug("create shifts=%s", shifts)
+        self.store_factory.shifts(rotation).create_many(shifts)
         return shifts
 
     def get_current_shift(self, now: datetime.datetime | None = None) -> Shift | None:
@@ -73,16 +213,159 @@ class OncallService:
 
         return self.store_factory.shifts(rotation).find(utc_now)
 
+    def get_oncall(self, now: datetime.datetime | None = None) -> dict[int, Shift]:
+        """Current shift of every layer (primary, secondary, ...), primary first."""
+        if now is None:
+            now = datetime.datetime.now(tz=UTC)
+
+        # one seek per live rotation, the latest started shift of a layer wins (see layers)
+        utc_now = as_utc(now)
+        oncall: dict[int, Shift] = {}
+        for rotation in self.store_factory.rotation().list(utc_now, utc_now + TICK):
+            shift = self.store_factory.shifts(rotation).find(utc_now)
+            if shift is None:
+                continue
+            shift = utc_shift(shift)
+            current = oncall.get(rotation.layer)
+            if current is None or shift.start_date >= current.start_date:
+                oncall[rotation.layer] = shift
+        return dict(sorted(oncall.items()))
+
+    def next_shifts(
+        self, firefighter: str, now: datetime.datetime | None = None
+    ) -> dict[int, Shift]:
+        """
+        The firefighter's current or next shift per layer, primary first, UTC dates. Their shifts of all live
+        rotations come from a single lookup of the per-firefighter index (see StoreFactory.shifts_of).
+        Shifts of a rotation replaced by a later started one of the layer are skipped, or cut where the later one
+        takes over.
+        """
+        if now is None:
+            now = datetime.datetime.now(tz=UTC)
+
+        utc_now = as_utc(now)
+        fighter_shifts: defaultdict[str, list[Shift]] = defaultdict(list)
+        for rotation_id, shift in self.store_factory.shifts_of(firefighter, utc_now):
+            fighter_shifts[rotation_id].append(utc_shift(shift))
+        if not fighter_shifts:
+            return {}
+
+        layers: defaultdict[int, list[Rotation]] = defaultdict(list)
+        for rotation in sorted(
+            self.store_factory.rotation().list(utc_now),
+            key=lambda r: as_utc(r.start_date),
+        ):
+            layers[rotation.layer].append(rotation)
+
+        shifts: dict[int, Shift] = {}
+        for layer, rotations in sorted(layers.items()):
+            starts = [as_utc(r.start_date) for r in rotations]
+            for rotation, start in zip(rotations, starts):
+                if rotation.id not in fighter_shifts:
+                    continue
+                later = rotations[bisect.bisect_right(starts, start) :]
+                effective = self._next_effective(
+                    fighter_shifts[rotation.id], later, utc_now
+                )
+                current = shifts.get(layer)
+                if effective and (
+                    current is None or effective.start_date < current.start_date
+                ):
+                    shifts[layer] = effective
+        return shifts
+
+    @staticmethod
+    def _next_effective(
+        shifts: list[Shift], later: list[Rotation], now: datetime.datetime
+    ) -> Shift | None:
+        """
+        The first of the firefighter's `shifts` of a rotation (not over at `now`, sorted by start) not replaced by
+        `later` rotations of the layer (sorted by start).
+        """
+        # shifts of a rotation don't overlap, ends are sorted too
+        ends = [shift.end_date for shift in shifts]
+        dt = now
+        while (i := bisect.bisect_right(ends, dt)) < len(shifts):
+            shift = shifts[i]
+            start, end = shift.start_date, shift.end_date
+            # effective from, the current shift keeps its start
+            since = max(start, dt)
+            replaced_by = next(
+                (
+                    r
+                    for r in later
+                    if as_utc(r.start_date) <= since < as_utc(r.end_date)
+                ),
+                None,
+            )
+            if replaced_by is None:
+                # the first rotation started after takes over
+                takes_over = next(
+                    (
+                        as_utc(r.start_date)
+                        for r in later
+                        if as_utc(r.start_date) > since
+                    ),
+                    end,
+                )
+                end = min(end, takes_over)
+                # skipped shifts resume where the replacing rotation ends
+                start = start if dt == now else since
+                return shift.model_copy(update={"start_date": start, "end_date": end})
+            dt = as_utc(replaced_by.end_date)
+        return None
+
+    def timeline(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> Timeline:
+        """Effective shifts of all layers within [dt_from, dt_to), merged in one sweep (see layers)."""
+        utc_from, utc_to = as_utc(dt_from), as_utc(dt_to)
+        shifts: defaultdict[int, list[Shift]] = defaultdict(list)
+        for rotation in self.store_factory.rotation().list(utc_from, utc_to):
+            shifts[rotation.layer] += self._shifts_between(rotation, utc_from, utc_to)
+        for layer_shifts in shifts.values():
+            layer_shifts.sort(key=lambda shift: shift.start_date)
+        return Timeline.of(shifts).clip(utc_from, utc_to)
+
+    def _shifts_between(
+        self,
+        rotation: Rotation,
+        dt_from: datetime.datetime,
+        dt_to: datetime.datetime,
+        page_size: int = 500,
+    ) -> list[Shift]:
+        """Shifts overlapping [dt_from, dt_to) with UTC dates, sorted by start."""
+        shift_store = self.store_factory.shifts(rotation)
+        current = shift_store.find(dt_from)
+        shifts = [current] if current and as_utc(current.start_date) < dt_from else []
+        cursor = Cursor(dt_from, "")
+        while page := shift_store.page(cursor, page_size, until=dt_to):
+            shifts += page
+            if len(page) < page_size:
+                break
+            cursor = Cursor.of(page[-1])
+        return [utc_shift(s) for s in shifts]
+
+    def get_rotation(self, now: datetime.datetime | None = None) -> Rotation | None:
+        if now is None:
+            now = datetime.datetime.now(tz=UTC)
+
+        return self.store_factory.rotation().get_by_date(now.astimezone(UTC))
+
     def get_shifts(
-        self, now: datetime.datetime | None = None, limit: int = 5
+        self,
+        now: datetime.datetime | None = None,
+        limit: int = 5,
+        rotation: Rotation | None = None,
     ) -> list[Shift]:
-        """Sorted list of shifts starting from now."""
+        """Sorted list of shifts starting from now, pass rotation to skip the lookup by date."""
         if now is None:
             now = datetime.datetime.now(tz=ZoneInfo(Config().timezone))
 
         utc_now = now.astimezone(UTC)
 
-        rotation = self.store_factory.rotation().get_by_date(utc_now)
+        if rotation is None:
+            rotation = self.store_factory.rotation().get_by_date(utc_now)
         if rotation is None:
             return []
 
@@ -98,3 +381,30 @@ class OncallService:
         # SQLite doesn't persist timezone (should be passed as timezone formatted str vs datetime object)
         # TODO review if we need to compensate timezone for backends other than SQLite
         return shifts_all
+
+    def report(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        """
+        On-call time per firefighter within [dt_from, dt_to) across all rotations, the longest first.
+        Aggregation runs in the store (SQL GROUP BY, NumPy for in-memory), shifts aren't loaded.
+        """
+        utc_from, utc_to = as_utc(dt_from), as_utc(dt_to)
+        totals: defaultdict[str, datetime.timedelta] = defaultdict(datetime.timedelta)
+        for rotation in self.store_factory.rotation().list(utc_from, utc_to):
+            shift_store = self.store_factory.shifts(rotation)
+            for firefighter, duration in shift_store.durations(
+                utc_from, utc_to
+            ).items():
+                totals[firefighter] += duration
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def get_shifts_page(
+        self, rotation_id: str, cursor: Cursor, limit: int = 5, backward: bool = False
+    ) -> list[Shift]:
+        """Page of shifts next to the cursor (see ShiftStore.page)."""
+        rotation = self.store_factory.rotation().get_by_id(rotation_id)
+        if rotation is None:
+            return []
+
+        return self.store_factory.shifts(rotation).page(cursor, limit, backward)
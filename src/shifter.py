@@ -1,12 +1,15 @@
 import datetime as dt
+import itertools
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
 from typing import Type, assert_never
 
 import pandas as pd
 from pandas import DatetimeIndex
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from models import Temporal
+from rrule import Recurrence, RRule
 
 
 class Shifter(BaseModel, ABC):
@@ -14,19 +17,31 @@ class Shifter(BaseModel, ABC):
     end_dt: dt.datetime
 
     @abstractmethod
-    def get_index(self, freq: int) -> DatetimeIndex: ...
+    def get_index(self, freq: int) -> Sequence[dt.datetime]:
+        """Shift boundaries between start and end, every `freq`-th schedule occurrence."""
 
     @classmethod
     def apply(
-        cls, start_dt: dt.datetime, end_dt: dt.datetime, temporal: Temporal
+        cls,
+        start_dt: dt.datetime,
+        end_dt: dt.datetime,
+        temporal: Temporal,
+        calendar: pd.offsets.CustomBusinessDay | None = None,
+        rule: str | None = None,
     ) -> "Shifter":
         match temporal:
             case Temporal.day:
                 return DailyShifter(start_dt=start_dt, end_dt=end_dt)
             case Temporal.bday:
-                return BDayShifter(start_dt=start_dt, end_dt=end_dt)
+                return BDayShifter(start_dt=start_dt, end_dt=end_dt, calendar=calendar)
             case Temporal.week:
                 return WeeklyShifter(start_dt=start_dt, end_dt=end_dt)
+            case Temporal.rrule:
+                if rule is None:
+                    raise ValueError("rule is required for rrule schedule")
+                return RRuleShifter(
+                    start_dt=start_dt, end_dt=end_dt, rule=RRule.parse(rule)
+                )
             case _:
                 assert_never(temporal)
 
@@ -34,9 +49,12 @@ class Shifter(BaseModel, ABC):
 class BaseShifter(Shifter):
     offset: Type[pd.offsets.BaseOffset]
 
+    def get_offset(self, freq: int) -> pd.offsets.BaseOffset:
+        return self.offset(freq)
+
     def get_index(self, freq: int) -> DatetimeIndex:
         return pd.date_range(
-            start=self.start_dt, end=self.end_dt, freq=self.offset(freq)
+            start=self.start_dt, end=self.end_dt, freq=self.get_offset(freq)
         ).to_pydatetime()
 
 
@@ -46,7 +64,29 @@ class DailyShifter(BaseShifter):
 
 class BDayShifter(BaseShifter):
     offset: Type[pd.offsets.BaseOffset] = pd.offsets.BDay
+    # holidays aware business day, see calendars.CalendarRegistry
+    calendar: pd.offsets.CustomBusinessDay | None = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def get_offset(self, freq: int) -> pd.offsets.BaseOffset:
+        if self.calendar is None:
+            return super().get_offset(freq)
+        # multiplication shares compiled holidays calendar with the cached offset
+        return self.calendar * freq
 
 
 class WeeklyShifter(BaseShifter):
     offset: Type[pd.offsets.BaseOffset] = pd.offsets.Week
+
+
+class RRuleShifter(Shifter):
+    rule: RRule
+
+    def iter_after(self, t: dt.datetime) -> Iterator[dt.datetime]:
+        """Occurrences from `t` up to end, the first one is found without iterating from start."""
+        occurrences = Recurrence(self.rule, self.start_dt).after(t)
+        return itertools.takewhile(lambda o: o <= self.end_dt, occurrences)
+
+    def get_index(self, freq: int) -> Sequence[dt.datetime]:
+        return list(itertools.islice(self.iter_after(self.start_dt), 0, None, freq))
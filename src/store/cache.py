@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+
+class CacheBackend(ABC):
+    """
+    Bytes by string key with expiration, see store.shift_cached. Best effort: backend failures are misses,
+    the store is the source of truth.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Store value for the backend's ttl."""
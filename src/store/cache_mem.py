@@ -0,0 +1,15 @@
+from cache import TTLCache
+from store.cache import CacheBackend
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local LRU, for single process deployments."""
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self._data: TTLCache[str, bytes] = TTLCache(maxsize, ttl)
+
+    def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._data.set(key, value)
@@ -0,0 +1,122 @@
+"""
+Cache backend speaking the Redis protocol (RESP2) to Redis or compatible servers (Valkey, KeyDB, Dragonfly).
+Just GET and SET with expiration, so a few lines over a socket instead of a client library dependency.
+"""
+
+import logging
+import os
+import socket
+import threading
+from io import BufferedIOBase
+from urllib.parse import unquote, urlsplit
+
+from store.cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# RESP reply: simple/bulk string, integer, nil or array
+Reply = bytes | int | None | list["Reply"]
+
+
+class RedisError(Exception):
+    """Error reply of the server."""
+
+
+def encode_command(*args: str | bytes | int) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts += [b"$%d\r\n" % len(data), data, b"\r\n"]
+    return b"".join(parts)
+
+
+def read_reply(f: BufferedIOBase) -> Reply:
+    line = f.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    match kind:
+        case b"+":
+            return rest
+        case b"-":
+            raise RedisError(rest.decode())
+        case b":":
+            return int(rest)
+        case b"$":
+            size = int(rest)
+            return None if size < 0 else f.read(size + 2)[:-2]
+        case b"*":
+            size = int(rest)
+            return None if size < 0 else [read_reply(f) for _ in range(size)]
+        case _:
+            raise RedisError(f"unexpected reply {line!r}")
+
+
+class Connection:
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        # connections aren't shared with forked workers
+        self.pid = os.getpid()
+
+    def call(self, *args: str | bytes | int) -> Reply:
+        self.sock.sendall(encode_command(*args))
+        return read_reply(self.file)
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """`redis://[:password@]host[:port][/db]`, a connection per thread opened on first use."""
+
+    def __init__(self, url: str, ttl: float, timeout: float = 0.5) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.ttl = ttl
+        # a slow cache is worse than none, reads fall back to the store
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self, key: str) -> bytes | None:
+        reply = self._call("GET", key)
+        return reply if isinstance(reply, bytes) else None
+
+    def set(self, key: str, value: bytes) -> None:
+        self._call("SET", key, value, "PX", int(self.ttl * 1000))
+
+    def _connect(self) -> Connection:
+        conn: Connection | None = getattr(self._local, "conn", None)
+        if conn is not None and conn.pid == os.getpid():
+            return conn
+        conn = Connection(
+            socket.create_connection((self.host, self.port), timeout=self.timeout)
+        )
+        try:
+            if self.password:
+                conn.call("AUTH", self.password)
+            if self.db:
+                conn.call("SELECT", self.db)
+        except Exception:
+            conn.close()
+            raise
+        self._local.conn = conn
+        return conn
+
+    def _call(self, *args: str | bytes | int) -> Reply:
+        try:
+            return self._connect().call(*args)
+        except RedisError as e:
+            logger.warning("redis %s failed: %s", args[0], e)
+        except OSError as e:
+            # reconnect on the next call
+            logger.warning("redis %s:%s unavailable: %s", self.host, self.port, e)
+            conn: Connection | None = getattr(self._local, "conn", None)
+            if conn is not None:
+                self._local.conn = None
+                conn.close()
+        return None
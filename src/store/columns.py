@@ -0,0 +1,44 @@
+"""Columnar (NumPy) representation of shifts, imported on demand: NumPy adds to the cold start."""
+
+import datetime
+from typing import NamedTuple, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from models import Shift
+from store.shift import to_micros
+
+
+class Columns(NamedTuple):
+    """Columnar copy of shifts for vectorized aggregations, epoch microseconds."""
+
+    starts: npt.NDArray[np.int64]
+    ends: npt.NDArray[np.int64]
+    # firefighter codes, index into fighters
+    codes: npt.NDArray[np.intp]
+    fighters: list[str]
+
+    @classmethod
+    def of(cls, shifts: list[Shift]) -> "Columns":
+        fighters, codes = np.unique(
+            np.array([s.firefighter for s in shifts], dtype=object), return_inverse=True
+        )
+        return cls(
+            np.array([to_micros(s.start_date) for s in shifts], dtype=np.int64),
+            np.array([to_micros(s.end_date) for s in shifts], dtype=np.int64),
+            codes,
+            [str(f) for f in fighters],
+        )
+
+    def durations(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        lo, hi = to_micros(dt_from), to_micros(dt_to)
+        clipped = np.clip(self.ends, lo, hi) - np.clip(self.starts, lo, hi)
+        totals = np.bincount(self.codes, weights=clipped, minlength=len(self.fighters))
+        return {
+            fighter: datetime.timedelta(microseconds=int(total))
+            for fighter, total in zip(self.fighters, cast(list[float], totals.tolist()))
+            if total > 0
+        }
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+from models import Outcome
+
+
+class DedupStore(ABC):
+    """
+    Bounded TTL registry of processed Slack requests keyed by request id (see dedup.request_key).
+    A key is claimed once before processing, the outcome is recorded afterward.
+    """
+
+    @abstractmethod
+    def claim(self, key: str) -> bool:
+        """Atomically register key, returns False if it's already claimed (and not expired)."""
+
+    @abstractmethod
+    def get(self, key: str) -> Outcome | None:
+        """Recorded outcome, None if key is unknown or still in progress."""
+
+    @abstractmethod
+    def put(self, key: str, outcome: Outcome) -> None: ...
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Forget key, its next delivery is processed as a new request."""
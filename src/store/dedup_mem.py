@@ -0,0 +1,21 @@
+from cache import TTLCache
+from models import Outcome
+from store.dedup import DedupStore
+
+
+class InMemoryDedupStore(DedupStore):
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        # None marks claimed keys in progress
+        self._requests: TTLCache[str, Outcome | None] = TTLCache(maxsize, ttl)
+
+    def claim(self, key: str) -> bool:
+        return self._requests.add(key, None)
+
+    def get(self, key: str) -> Outcome | None:
+        return self._requests.get(key)
+
+    def put(self, key: str, outcome: Outcome) -> None:
+        self._requests.set(key, outcome)
+
+    def release(self, key: str) -> None:
+        self._requests.delete(key)
@@ -0,0 +1,68 @@
+import datetime
+from collections.abc import Callable
+
+from sqlalchemy import Engine, delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
+
+from models import Outcome, RequestORM
+from store.dedup import DedupStore
+from store.sa import EngineRouter, as_router
+
+
+def utcnow() -> datetime.datetime:
+    # SQLite doesn't persist timezone, keep naive UTC
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+class SQLAlchemyDedupStore(DedupStore):
+    """Claims rely on primary key uniqueness, so concurrent workers sharing the database agree on a single winner."""
+
+    def __init__(
+        self,
+        engine: Engine | EngineRouter,
+        ttl: float,
+        clock: Callable[[], datetime.datetime] = utcnow,
+    ) -> None:
+        self._engines = as_router(engine)
+        self.ttl = datetime.timedelta(seconds=ttl)
+        self.clock = clock
+
+    def claim(self, key: str) -> bool:
+        now = self.clock()
+        with Session(self._engines.write) as session:
+            # purge expired requests, keeps the table bounded and frees expired key
+            session.exec(delete(RequestORM).where(col(RequestORM.expires_at) <= now))  # type: ignore[call-overload]
+            session.commit()
+            session.add(RequestORM(key=key, expires_at=now + self.ttl))
+            try:
+                session.commit()
+                return True
+            except IntegrityError:
+                session.rollback()
+                return False
+
+    def get(self, key: str) -> Outcome | None:
+        stmt = (
+            select(RequestORM)
+            .where(RequestORM.key == key)
+            .where(RequestORM.expires_at > self.clock())
+        )
+        with Session(self._engines.write) as session:
+            result = session.exec(stmt).first()
+            if result and result.outcome:
+                return Outcome.model_validate(result.outcome)
+            return None
+
+    def put(self, key: str, outcome: Outcome) -> None:
+        request = RequestORM(
+            key=key, expires_at=self.clock() + self.ttl, outcome=outcome
+        )
+        with Session(self._engines.write) as session:
+            session.merge(request)
+            session.commit()
+
+    def release(self, key: str) -> None:
+        with Session(self._engines.write) as session:
+            session.exec(delete(RequestORM).where(col(RequestORM.key) == key))  # type: ignore[call-overload]
+            session.commit()
@@ -1,18 +1,35 @@
+import copy
+import datetime
 import functools
+import logging
+import threading
+import time
 from abc import abstractmethod
-from typing import assert_never
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, assert_never
 
 from sqlalchemy import Engine
 
-from config import Config, Impl
-from models import Rotation
+from config import CacheConfig, CacheImpl, Config, DedupConfig, Impl
+from models import ChangeKind, Rotation, Shift
+from store.cache import CacheBackend
+from store.dedup import DedupStore
+from store.dedup_mem import InMemoryDedupStore
+from store.dedup_sql import SQLAlchemyDedupStore
 from store.rotation import RotationStore
 from store.rotation_mem import InMemoryRotationStore
 from store.rotation_sql import SQLAlchemyRotationStore
-from store.sa import global_engine
+from store.sa import EngineRouter, as_router, global_router
 from store.shift import ShiftStore
-from store.shift_mem import InMemoryShiftStore
-from store.shift_sql import SQLAlchemyShiftStore
+from store.shift_cached import CachingShiftStore
+from store.shift_mem import FighterIndex, InMemoryShiftStore
+from store.shift_sql import SQLAlchemyShiftStore, shifts_of
+
+if TYPE_CHECKING:
+    from store.snapshot import ShiftsLoader
+
+logger = logging.getLogger(__name__)
 
 
 class StoreFactory:
@@ -22,35 +39,219 @@ class StoreFactory:
     @abstractmethod
     def shifts(self, rotation: Rotation) -> ShiftStore: ...
 
+    @abstractmethod
+    def dedup(self) -> DedupStore: ...
+
+    @abstractmethod
+    def shifts_of(
+        self, firefighter: str, dt: datetime.datetime
+    ) -> list[tuple[str, Shift]]:
+        """
+        The firefighter's shifts of live rotations not over at `dt` with their rotation id, sorted by
+        (start_date, id). A single lookup of the per-firefighter index across rotations.
+        """
+
+    def for_user(self, user_id: str | None) -> "StoreFactory":
+        """Stores reading the user's own recent writes, see store.sa.EngineRouter."""
+        return self
+
+    def primary(self) -> "StoreFactory":
+        """Stores reading from the primary only, for read-modify-write jobs."""
+        return self
+
     @classmethod
     def apply(cls, config: Config) -> "StoreFactory":
         match config.impl:
             case Impl.mem:
-                return InMemoryStoreFactory()
+                return InMemoryStoreFactory(config.dedup)
             case Impl.sql:
-                return SQLStoreFactory(global_engine())
+                factory: StoreFactory = SQLStoreFactory(global_router(), config.dedup)
+                if config.cache.impl:
+                    factory = CachingStoreFactory(factory, cache_backend(config.cache))
+                return factory
             case default:
                 assert_never(default)
 
 
+def cache_backend(config: CacheConfig) -> CacheBackend:
+    match config.impl:
+        case CacheImpl.mem | None:
+            from store.cache_mem import InMemoryCacheBackend
+
+            return InMemoryCacheBackend(config.ttl, config.maxsize)
+        case CacheImpl.redis:
+            from store.cache_redis import RedisCacheBackend
+
+            return RedisCacheBackend(config.url, config.ttl)
+        case default:
+            assert_never(default)
+
+
 class InMemoryStoreFactory(StoreFactory):
     """Cache instances in order to share in-memory rotations/shifts attached to cached instances."""
 
-    @functools.cache
+    def __init__(self, dedup_cfg: DedupConfig = DedupConfig()) -> None:
+        self.dedup_cfg = dedup_cfg
+        self._shifts: dict[str, InMemoryShiftStore] = {}
+        # shared by the stores' writes, snapshots copy under it while handlers keep writing
+        self._lock = threading.RLock()
+        self._rotations = InMemoryRotationStore(on_delete=self._drop, lock=self._lock)
+        # built on first lookup, then updated by shift writes
+        self._fighters: FighterIndex | None = None
+
     def rotation(self) -> RotationStore:
-        return InMemoryRotationStore()
+        return self._rotations
+
+    def shifts(self, rotation: Rotation) -> InMemoryShiftStore:
+        # keyed by id, rotation fields (ie end_date of rolling rotations) may change
+        if rotation.id not in self._shifts:
+            with self._lock:
+                if rotation.id not in self._shifts:
+                    self._shifts[rotation.id] = self._shift_store(rotation)
+        return self._shifts[rotation.id]
+
+    def _shift_store(
+        self, rotation: Rotation, load: "ShiftsLoader | None" = None
+    ) -> InMemoryShiftStore:
+        # shift writes bump the version of the stored rotation
+        log = functools.partial(self._log, rotation.id)
+        return InMemoryShiftStore(rotation, load, log, self._lock)
+
+    def _log(self, rotation_id: str, kind: ChangeKind, shifts: Sequence[Shift]) -> None:
+        self._rotations.log(rotation_id, kind, shifts)
+        if self._fighters is not None:
+            self._fighters.changed(rotation_id, kind, shifts)
+
+    def _drop(self, rotation_id: str) -> list[Shift]:
+        store = self._shifts.pop(rotation_id, None)
+        if store is None:
+            return []
+        shifts = store.list()
+        if self._fighters is not None:
+            self._fighters.remove(shifts)
+        return shifts
+
+    def shifts_of(
+        self, firefighter: str, dt: datetime.datetime
+    ) -> list[tuple[str, Shift]]:
+        if self._fighters is None:
+            with self._lock:
+                if self._fighters is None:
+                    fighters = FighterIndex()
+                    for rotation_id, store in self._shifts.items():
+                        fighters.add(rotation_id, store.list())
+                    self._fighters = fighters
+        live = {rotation.id for rotation in self._rotations.list(dt)}
+        return [
+            (rotation_id, shift)
+            for rotation_id, shift in self._fighters.upcoming(firefighter, dt)
+            if rotation_id in live
+        ]
 
     @functools.cache
-    def shifts(self, rotation: Rotation) -> ShiftStore:
-        return InMemoryShiftStore(rotation)
+    def dedup(self) -> DedupStore:
+        return InMemoryDedupStore(self.dedup_cfg.ttl, self.dedup_cfg.maxsize)
+
+    def save(self, path: str | Path) -> None:
+        """Snapshot rotations and shifts, see store.snapshot."""
+        from store import snapshot
+
+        start = time.perf_counter()
+        rotations = []
+        # copy under the lock, serialize outside of it to not block handlers
+        with self._lock:
+            for rotation in self.rotation().list():
+                shifts = self.shifts(rotation)
+                # archived shifts are restored as live ones, the next compaction archives them again
+                rotations.append((rotation, shifts.archived + shifts.list()))
+        snapshot.dump(path, rotations)
+        logger.info(
+            "saved %s rotations to %s in %.3fs",
+            len(rotations),
+            path,
+            time.perf_counter() - start,
+        )
+
+    def restore(self, path: str | Path) -> None:
+        from store import snapshot
+
+        start = time.perf_counter()
+        rotations = snapshot.load(path)
+        with self._lock:
+            for rotation, load in rotations:
+                self.rotation().create(rotation)
+                self._shifts[rotation.id] = self._shift_store(rotation, load)
+            self._fighters = None
+        logger.info(
+            "restored %s rotations from %s in %.3fs",
+            len(rotations),
+            path,
+            time.perf_counter() - start,
+        )
 
 
 class SQLStoreFactory(StoreFactory):
-    def __init__(self, engine: Engine) -> None:
-        self.engine = engine
+    def __init__(
+        self, engine: Engine | EngineRouter, dedup_cfg: DedupConfig = DedupConfig()
+    ) -> None:
+        self.router = as_router(engine)
+        self.dedup_cfg = dedup_cfg
+
+    @property
+    def engine(self) -> Engine:
+        return self.router.primary
+
+    def rotation(self) -> RotationStore:
+        return SQLAlchemyRotationStore(self.router)
+
+    def shifts(self, rotation: Rotation) -> ShiftStore:
+        return SQLAlchemyShiftStore(rotation, self.router)
+
+    def dedup(self) -> DedupStore:
+        # claims must be consistent, primary only
+        return SQLAlchemyDedupStore(self.router.pin(), self.dedup_cfg.ttl)
+
+    def shifts_of(
+        self, firefighter: str, dt: datetime.datetime
+    ) -> list[tuple[str, Shift]]:
+        return shifts_of(self.router.read, firefighter, dt)
+
+    def for_user(self, user_id: str | None) -> StoreFactory:
+        factory = copy.copy(self)
+        factory.router = self.router.for_user(user_id)
+        return factory
+
+    def primary(self) -> StoreFactory:
+        factory = copy.copy(self)
+        factory.router = self.router.pin()
+        return factory
+
+
+class CachingStoreFactory(StoreFactory):
+    """Shift reads of the wrapped factory cached in `backend` (see store.shift_cached), other stores as is."""
+
+    def __init__(self, factory: StoreFactory, backend: CacheBackend) -> None:
+        self.factory = factory
+        self.backend = backend
 
     def rotation(self) -> RotationStore:
-        return SQLAlchemyRotationStore(self.engine)
+        # a single row read, its version keys the shift reads
+        return self.factory.rotation()
 
     def shifts(self, rotation: Rotation) -> ShiftStore:
-        return SQLAlchemyShiftStore(rotation, self.engine)
+        return CachingShiftStore(self.factory.shifts(rotation), self.backend)
+
+    def dedup(self) -> DedupStore:
+        return self.factory.dedup()
+
+    def shifts_of(
+        self, firefighter: str, dt: datetime.datetime
+    ) -> list[tuple[str, Shift]]:
+        # a single indexed read, not cached
+        return self.factory.shifts_of(firefighter, dt)
+
+    def for_user(self, user_id: str | None) -> StoreFactory:
+        return CachingStoreFactory(self.factory.for_user(user_id), self.backend)
+
+    def primary(self) -> StoreFactory:
+        return CachingStoreFactory(self.factory.primary(), self.backend)
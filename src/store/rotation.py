@@ -2,7 +2,7 @@ import datetime
 import logging
 from abc import ABC, abstractmethod
 
-from models import Rotation
+from models import Change, Rotation
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +13,45 @@ class RotationStore(ABC):
 
     @abstractmethod
     # TODO unify naming with ShiftStore, ie get_by_date vs find
-    def get_by_date(self, dt: datetime.datetime) -> Rotation | None: ...
+    def get_by_date(self, dt: datetime.datetime, layer: int = 0) -> Rotation | None:
+        """Rotation of the layer active at `dt`, the latest started one if several."""
+
+    @abstractmethod
+    def list_rolling(self) -> list[Rotation]: ...
 
     @abstractmethod
     def create(self, rotation: Rotation) -> None: ...
+
+    @abstractmethod
+    def update(self, rotation: Rotation) -> None: ...
+
+    @abstractmethod
+    def delete(self, id: str) -> bool:
+        """
+        Soft-delete: the rotation is hidden right away, its live shifts are logged as deleted at a new version
+        (see `changes_since`), its rows are removed by `purge`. False if not found.
+        """
+
+    @abstractmethod
+    def purge(self, batch_size: int) -> int:
+        """Remove soft-deleted rotations with their shifts and change log, `batch_size` rows per transaction."""
+
+    @abstractmethod
+    def compact(self, before: datetime.datetime, batch_size: int) -> int:
+        """Drop logged changes of shifts ended before `before`, see `changes_since`."""
+
+    @abstractmethod
+    def changes_since(self, rotation_id: str, version: int) -> list[Change] | None:
+        """
+        Shift changes after `version` (the one the consumer holds), oldest first. Changes of a single write
+        share the version. None if the log doesn't reach back to `version` (ie compacted, store restored from a snapshot),
+        the consumer refetches the rotation and its shifts.
+        """
+
+    @abstractmethod
+    def list(
+        self,
+        dt_from: datetime.datetime | None = None,
+        dt_to: datetime.datetime | None = None,
+    ) -> list[Rotation]:
+        """Rotations overlapping [dt_from, dt_to), all if not set."""
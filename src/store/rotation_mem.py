@@ -1,24 +1,133 @@
+import bisect
 import datetime
+import threading
+from collections.abc import Callable, Sequence
 
-from models import Rotation
+from models import Change, ChangeKind, Rotation, Shift
 from store.rotation import RotationStore
 
 
 class InMemoryRotationStore(RotationStore):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        on_delete: Callable[[str], Sequence[Shift]] | None = None,
+        lock: "threading.RLock | None" = None,
+    ) -> None:
+        # held by writes, shared with the shift stores, see InMemoryStoreFactory.save
+        self._lock = lock or threading.RLock()
         self._rotations: dict[str, Rotation] = {}
+        # drops the rotation's shifts and returns them, see InMemoryStoreFactory
+        self._on_delete = on_delete
+        # deleted rotations, their change log is kept until purge
+        self._deleted: set[str] = set()
+        # sorted by version
+        self._changes: dict[str, list[Change]] = {}
+        # version the log starts from, changes before (ie snapshot restore) aren't known
+        self._floors: dict[str, int] = {}
 
     def create(self, rotation: Rotation) -> None:
-        self._rotations[rotation.id] = rotation
+        with self._lock:
+            self._rotations[rotation.id] = rotation
+            self._changes[rotation.id] = []
+            self._floors[rotation.id] = rotation.version
+
+    def update(self, rotation: Rotation) -> None:
+        with self._lock:
+            # stored version is bumped, the given one may be stale (ie read before its shifts were written)
+            current = self._rotations.get(rotation.id)
+            version = current.version + 1 if current else rotation.version
+            self._rotations[rotation.id] = rotation.model_copy(
+                update={"version": version}
+            )
+
+    def log(self, rotation_id: str, kind: ChangeKind, shifts: Sequence[Shift]) -> None:
+        """Bump rotation version and log shift changes at it, see InMemoryShiftStore."""
+        with self._lock:
+            rotation = self._rotations.get(rotation_id)
+            if rotation is None:
+                return
+            version = rotation.version + 1
+            self._rotations[rotation_id] = rotation.model_copy(
+                update={"version": version}
+            )
+            self._changes.setdefault(rotation_id, []).extend(
+                Change(version=version, kind=kind, shift=shift) for shift in shifts
+            )
+
+    def delete(self, id: str) -> bool:
+        with self._lock:
+            # shifts are freed right away, the change log tells consumers they're gone until purge
+            rotation = self._rotations.pop(id, None)
+            if rotation is None:
+                return False
+            shifts = self._on_delete(id) if self._on_delete else []
+            self._changes.setdefault(id, []).extend(
+                Change(
+                    version=rotation.version + 1, kind=ChangeKind.deleted, shift=shift
+                )
+                for shift in shifts
+            )
+            self._deleted.add(id)
+            return True
+
+    def purge(self, batch_size: int) -> int:
+        with self._lock:
+            purged = 0
+            for id in self._deleted:
+                purged += len(self._changes.pop(id, []))
+                self._floors.pop(id, None)
+            self._deleted.clear()
+            return purged
+
+    def compact(self, before: datetime.datetime, batch_size: int) -> int:
+        with self._lock:
+            dropped = 0
+            for rotation_id, changes in self._changes.items():
+                live = [c for c in changes if c.shift.end_date > before]
+                if len(live) == len(changes):
+                    continue
+                self._floors[rotation_id] = max(
+                    self._floors.get(rotation_id, 0),
+                    max(c.version for c in changes if c.shift.end_date <= before),
+                )
+                self._changes[rotation_id] = live
+                dropped += len(changes) - len(live)
+            return dropped
+
+    def changes_since(self, rotation_id: str, version: int) -> list[Change] | None:
+        if version < self._floors.get(rotation_id, 0):
+            return None
+        changes = self._changes.get(rotation_id, [])
+        start = bisect.bisect_right(changes, version, key=lambda change: change.version)
+        return changes[start:]
 
     def get_by_id(self, id: str) -> Rotation | None:
         return self._rotations.get(id)
 
-    def get_by_date(self, dt: datetime.datetime) -> Rotation | None:
+    def get_by_date(self, dt: datetime.datetime, layer: int = 0) -> Rotation | None:
         # explicit assignment is required for mypy: https://github.com/python/mypy/issues/14664
         rotation = min(
-            [r for r in self._rotations.values() if r.start_date <= dt < r.end_date],
+            [
+                r
+                for r in self._rotations.values()
+                if r.layer == layer and r.start_date <= dt < r.end_date
+            ],
             key=lambda r: dt - r.start_date,
             default=None,
         )
         return rotation
+
+    def list_rolling(self) -> list[Rotation]:
+        return [r for r in self._rotations.values() if r.horizon_weeks]
+
+    def list(
+        self,
+        dt_from: datetime.datetime | None = None,
+        dt_to: datetime.datetime | None = None,
+    ) -> list[Rotation]:
+        return [
+            r
+            for r in self._rotations.values()
+            if (dt_to is None or r.start_date < dt_to)
+            and (dt_from is None or dt_from < r.end_date)
+        ]
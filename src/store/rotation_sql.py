@@ -1,40 +1,191 @@
 import datetime
+from datetime import UTC
+from typing import Any
 
-from sqlalchemy import Engine
-from sqlmodel import Session, select
+from sqlalchemy import Engine, Enum, delete, insert, literal, update
+from sqlmodel import Session, col, select
 
-from models import Rotation, RotationORM
+from models import (
+    Change,
+    ChangeKind,
+    ChangeORM,
+    Rotation,
+    RotationORM,
+    Shift,
+    ShiftArchiveORM,
+    ShiftORM,
+)
 from store.rotation import RotationStore
+from store.sa import EngineRouter, as_router, delete_batches
 from sqlalchemy import func
 
+# soft-deleted rotations are hidden from reads
+LIVE = col(RotationORM.deleted_at).is_(None)
+
+
+def rotation_row(rotation: Rotation) -> dict[str, Any]:
+    """
+    RotationORM insert/update parameters read straight from the (already validated) model,
+    JSON columns (schedule, fighters) are encoded by the engine's json_serializer.
+    """
+    return {name: getattr(rotation, name) for name in Rotation.model_fields}
+
 
 class SQLAlchemyRotationStore(RotationStore):
-    def __init__(self, engine: Engine) -> None:
-        self._engine = engine
+    def __init__(self, engine: Engine | EngineRouter) -> None:
+        self._engines = as_router(engine)
 
     def get_by_id(self, id: str) -> Rotation | None:
-        stmt = select(RotationORM).where(RotationORM.id == id)
-        with Session(self._engine) as session:
+        stmt = select(RotationORM).where(RotationORM.id == id).where(LIVE)
+        with Session(self._engines.read) as session:
             result = session.exec(stmt).first()
             if result:
                 return Rotation.model_validate(result)
             return None
 
-    def get_by_date(self, dt: datetime.datetime) -> Rotation | None:
+    def get_by_date(self, dt: datetime.datetime, layer: int = 0) -> Rotation | None:
         stmt = (
             select(RotationORM)
+            .where(RotationORM.layer == layer)
             .where(RotationORM.start_date <= dt)
             .where(dt < RotationORM.end_date)
+            .where(LIVE)
             .order_by(func.abs(dt - RotationORM.start_date))
         )
-        with Session(self._engine) as session:
+        with Session(self._engines.read) as session:
             result = session.exec(stmt).first()
             if result:
                 return Rotation.model_validate(result)
             return None
 
+    def list_rolling(self) -> list[Rotation]:
+        stmt = (
+            select(RotationORM)
+            .where(col(RotationORM.horizon_weeks).is_not(None))
+            .where(LIVE)
+        )
+        with Session(self._engines.read) as session:
+            return [Rotation.model_validate(row) for row in session.exec(stmt).all()]
+
     def create(self, rotation: Rotation) -> None:
-        rotation_orm = RotationORM.model_validate(rotation.model_dump())
-        with Session(self._engine) as session:
-            session.add(rotation_orm)
-            session.commit()
+        with self._engines.write.begin() as conn:
+            conn.execute(insert(RotationORM).values(rotation_row(rotation)))
+
+    def update(self, rotation: Rotation) -> None:
+        row = rotation_row(rotation)
+        # stored version is bumped, the given one may be stale (ie read before its shifts were written)
+        stmt = (
+            update(RotationORM)
+            .where(col(RotationORM.id) == rotation.id)
+            .values(row | {"version": col(RotationORM.version) + 1})
+        )
+        with self._engines.write.begin() as conn:
+            if conn.execute(stmt).rowcount == 0:
+                conn.execute(insert(RotationORM).values(row))
+
+    def delete(self, id: str) -> bool:
+        stmt = (
+            update(RotationORM)
+            .where(col(RotationORM.id) == id)
+            .where(LIVE)
+            .values(
+                deleted_at=datetime.datetime.now(tz=UTC),
+                version=col(RotationORM.version) + 1,
+            )
+            .returning(col(RotationORM.version))
+        )
+        with self._engines.write.begin() as conn:
+            version = conn.execute(stmt).scalar_one_or_none()
+            if version is None:
+                return False
+            # live shifts are logged as deleted at the new version, copied in the database
+            shift_columns = ["id", "firefighter", "start_date", "end_date"]
+            rows = select(
+                literal(id),
+                literal(version),
+                literal(ChangeKind.deleted, Enum(ChangeKind)),
+                *(col(getattr(ShiftORM, c)) for c in shift_columns),
+            ).where(ShiftORM.rotation_id == id)
+            columns = ["rotation_id", "version", "kind", "shift_id", *shift_columns[1:]]
+            conn.execute(insert(ChangeORM).from_select(columns, rows))
+            return True
+
+    def purge(self, batch_size: int) -> int:
+        engine = self._engines.write
+        stmt = select(RotationORM.id).where(col(RotationORM.deleted_at).is_not(None))
+        with Session(engine) as session:
+            ids = session.exec(stmt).all()
+
+        deleted = 0
+        for rotation_id in ids:
+            # rotation row goes last, an interrupted purge is picked up by the next run
+            for key, rotation_key in [
+                (ShiftORM.id, ShiftORM.rotation_id),
+                (ShiftArchiveORM.id, ShiftArchiveORM.rotation_id),
+                (ChangeORM.seq, ChangeORM.rotation_id),
+            ]:
+                deleted += delete_batches(
+                    engine, key, col(rotation_key) == rotation_id, batch_size
+                )
+            with engine.begin() as conn:
+                deleted += conn.execute(
+                    delete(RotationORM).where(col(RotationORM.id) == rotation_id)
+                ).rowcount
+        return deleted
+
+    def compact(self, before: datetime.datetime, batch_size: int) -> int:
+        engine = self._engines.write
+        ended = col(ChangeORM.end_date) <= before
+        floors = (
+            select(col(ChangeORM.rotation_id), func.max(col(ChangeORM.version)))
+            .where(ended)
+            .group_by(col(ChangeORM.rotation_id))
+        )
+        # floors go first, so consumers refetch rather than miss the dropped changes
+        with engine.begin() as conn:
+            for rotation_id, version in conn.execute(floors).all():
+                conn.execute(
+                    update(RotationORM)
+                    .where(col(RotationORM.id) == rotation_id)
+                    .where(col(RotationORM.log_floor) < version)
+                    .values(log_floor=version)
+                )
+        return delete_batches(engine, ChangeORM.seq, ended, batch_size)
+
+    def changes_since(self, rotation_id: str, version: int) -> list[Change] | None:
+        floor = select(RotationORM.log_floor).where(RotationORM.id == rotation_id)
+        stmt = (
+            select(ChangeORM)
+            .where(ChangeORM.rotation_id == rotation_id)
+            .where(ChangeORM.version > version)
+            .order_by(col(ChangeORM.version), col(ChangeORM.seq))
+        )
+        with Session(self._engines.read) as session:
+            if version < (session.exec(floor).first() or 0):
+                return None
+            return [
+                Change(
+                    version=row.version,
+                    kind=row.kind,
+                    shift=Shift(
+                        id=row.shift_id,
+                        firefighter=row.firefighter,
+                        start_date=row.start_date,
+                        end_date=row.end_date,
+                    ),
+                )
+                for row in session.exec(stmt).all()
+            ]
+
+    def list(
+        self,
+        dt_from: datetime.datetime | None = None,
+        dt_to: datetime.datetime | None = None,
+    ) -> list[Rotation]:
+        stmt = select(RotationORM).where(LIVE).order_by(col(RotationORM.start_date))
+        if dt_to:
+            stmt = stmt.where(RotationORM.start_date < dt_to)
+        if dt_from:
+            stmt = stmt.where(dt_from < RotationORM.end_date)
+        with Session(self._engines.read) as session:
+            return [Rotation.model_validate(row) for row in session.exec(stmt).all()]
@@ -1,11 +1,23 @@
+import copy
 import functools
 import json
+import time
+from collections.abc import Callable
 from typing import Any
 
 from pydantic_core import to_jsonable_python
-from sqlalchemy import Engine, StaticPool
-from sqlmodel import create_engine, SQLModel
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Engine,
+    StaticPool,
+    delete,
+    event,
+    make_url,
+)
+from sqlmodel import col, create_engine, select, SQLModel
 
+from cache import TTLCache
 from config import Config
 
 
@@ -17,20 +29,186 @@ def json_serializer(obj: Any) -> str:
     return json.dumps(to_jsonable_python(obj))
 
 
+class EngineRouter:
+    """
+    CQRS-style split: writes go to the primary engine, reads to the replica (primary if not set).
+    Replicas lag behind, so a user's reads stick to the primary for `sticky` seconds after the user's
+    own writes (read-your-writes), see `for_user`. Pinned routers read from the primary only.
+    """
+
+    def __init__(
+        self,
+        primary: Engine | Callable[[], Engine],
+        replica: Engine | Callable[[], Engine] | None = None,
+        sticky: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # engines can be passed as factories, they're created on first query (cold start)
+        self._primary = primary
+        self._replica = replica
+        self.user_id: str | None = None
+        self.pinned = False
+        # users with recent writes, shared by all routers derived with for_user/pin
+        self._writes: TTLCache[str, bool] = TTLCache(10_000, sticky, clock)
+
+    @property
+    def primary(self) -> Engine:
+        if not isinstance(self._primary, Engine):
+            self._primary = self._primary()
+        return self._primary
+
+    @property
+    def replica(self) -> Engine | None:
+        if self._replica is not None and not isinstance(self._replica, Engine):
+            self._replica = self._replica()
+        return self._replica
+
+    def for_user(self, user_id: str | None) -> "EngineRouter":
+        router = copy.copy(self)
+        router.user_id = user_id
+        return router
+
+    def pin(self) -> "EngineRouter":
+        router = copy.copy(self)
+        router.pinned = True
+        return router
+
+    @property
+    def read(self) -> Engine:
+        if self._replica is None or self.pinned:
+            return self.primary
+        if self.user_id is not None and self._writes.get(self.user_id):
+            return self.primary
+        return self.replica or self.primary
+
+    @property
+    def write(self) -> Engine:
+        if self.user_id is not None:
+            self._writes.set(self.user_id, True)
+        return for_writes(self.primary)
+
+
+# execution option of the write path, SQLite transactions take the write lock upfront, see begin
+WRITES = "bob_writes"
+
+
 @functools.cache
-def global_engine() -> Engine:
-    cfg = Config()
-    if sql_cfg := cfg.sql:
-        # https://docs.sqlalchemy.org/en/13/dialects/sqlite.html#threading-pooling-behavior
-        # multithreading access to SQLLite memory connections
-        connect_args = {"check_same_thread": False}
-        engine = create_engine(
-            sql_cfg.url,
+def for_writes(engine: Engine) -> Engine:
+    """The engine (sharing its pool) of write transactions."""
+    return engine.execution_options(**{WRITES: True})
+
+
+def as_router(engine: Engine | EngineRouter) -> EngineRouter:
+    return engine if isinstance(engine, EngineRouter) else EngineRouter(engine)
+
+
+def in_memory(url: str) -> bool:
+    """In-memory SQLite, the database lives in its process only."""
+    sa_url = make_url(url)
+    return sa_url.get_backend_name() == "sqlite" and sa_url.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def create_sa_engine(url: str, echo: bool = False) -> Engine:
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url, json_serializer=json_serializer, echo=echo)
+    # https://docs.sqlalchemy.org/en/13/dialects/sqlite.html#threading-pooling-behavior
+    # multithreading access to SQLLite connections
+    connect_args = {"check_same_thread": False}
+    if in_memory(url):
+        # in-memory database lives in its single connection, shared by all threads (not safe for
+        # concurrent transactions)
+        return create_engine(
+            url,
             json_serializer=json_serializer,
-            echo=True,
+            echo=echo,
             connect_args=connect_args,
             poolclass=StaticPool,
         )
+
+    # file databases get a connection per thread from the default pool
+    engine = create_engine(
+        url, json_serializer=json_serializer, echo=echo, connect_args=connect_args
+    )
+    # pysqlite begins transactions on the first write, a transaction that has read already fails to take
+    # the write lock held by another connection/process ("database is locked") instead of waiting.
+    # Write transactions take the lock upfront, waiting within the busy timeout, reads stay deferred
+    # (concurrent, read-only replicas), see
+    # https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    event.listen(engine, "connect", autocommit_driver)
+    event.listen(engine, "begin", begin)
+    return engine
+
+
+def delete_batches(
+    engine: Engine,
+    key: Any,
+    where: ColumnElement[bool],
+    batch_size: int,
+) -> int:
+    """
+    Delete rows matching `where`, `batch_size` rows (by primary `key` column) per transaction,
+    so the write lock is held shortly and other writers interleave. Number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        batch = select(col(key)).where(where).limit(batch_size)
+        with engine.begin() as conn:
+            count = conn.execute(delete(key.class_).where(col(key).in_(batch))).rowcount
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def autocommit_driver(dbapi_connection: Any, connection_record: Any) -> None:
+    dbapi_connection.isolation_level = None
+
+
+def begin(conn: Connection) -> None:
+    if conn.get_execution_options().get(WRITES):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        conn.exec_driver_sql("BEGIN")
+
+
+@functools.cache
+def global_engine() -> Engine:
+    cfg = Config()
+    if sql_cfg := cfg.sql:
+        engine = create_sa_engine(sql_cfg.url, sql_cfg.echo)
         SQLModel.metadata.create_all(engine)
         return engine
     raise ValueError("SQL section is not set in Config")
+
+
+@functools.cache
+def global_replica() -> Engine:
+    # replica schema is managed by replication, no create_all
+    sql_cfg = Config().sql
+    if sql_cfg and sql_cfg.read_url:
+        return create_sa_engine(sql_cfg.read_url, sql_cfg.echo)
+    raise ValueError("SQL read_url is not set in Config")
+
+
+@functools.cache
+def global_router() -> EngineRouter:
+    cfg = Config()
+    if sql_cfg := cfg.sql:
+        # created once, routers derived with for_user/pin resolve engines on their own
+        replica = global_replica if sql_cfg.read_url else None
+        return EngineRouter(global_engine, replica, sql_cfg.read_your_writes)
+    raise ValueError("SQL section is not set in Config")
+
+
+def reset_global_engines() -> None:
+    """
+    Drop pooled connections inherited from the parent process, call in a forked worker before queries.
+    Parent's connections are left open, see
+    https://docs.sqlalchemy.org/en/20/core/pooling.html#using-connection-pools-with-multiprocessing-or-os-fork
+    """
+    for engine in (global_engine, global_replica):
+        if engine.cache_info().currsize:
+            engine().dispose(close=False)
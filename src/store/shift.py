@@ -2,19 +2,67 @@ import abc
 import datetime
 import logging
 from abc import abstractmethod
+from collections.abc import Sequence
+from datetime import UTC
+from typing import NamedTuple
 
 from models import Rotation, Shift
 
 logger = logging.getLogger(__name__)
 
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_micros(dt: datetime.datetime) -> int:
+    """Epoch microseconds, naive datetimes are UTC."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC).replace(tzinfo=None)
+    return (dt - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+class Cursor(NamedTuple):
+    """Keyset pagination position, shifts are ordered by (start_date, id)."""
+
+    start_date: datetime.datetime
+    id: str
+
+    @classmethod
+    def of(cls, shift: Shift) -> "Cursor":
+        return cls(shift.start_date, shift.id)
+
 
 class ShiftStore(abc.ABC):
+    """Writes bump the rotation version and are logged as changes, see RotationStore.changes_since."""
+
     def __init__(self, rotation: Rotation):
         self.rotation = rotation
 
     @abstractmethod
     def find(self, dt: datetime.datetime) -> Shift | None: ...
 
+    @abstractmethod
+    def last(self) -> Shift | None:
+        """The latest shift of the rotation."""
+
+    @abstractmethod
+    def page(
+        self,
+        cursor: Cursor,
+        limit: int,
+        backward: bool = False,
+        until: datetime.datetime | None = None,
+    ) -> list[Shift]:
+        """
+        Shifts right after (or right before if backward) the cursor, sorted by (start_date, id).
+        Forward pages stop at shifts starting at or after `until`.
+        """
+
+    @abstractmethod
+    def durations(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        """On-call time per firefighter within [dt_from, dt_to), shifts are clipped to the range."""
+
     @abstractmethod
     def list(
         self, dt_from: datetime.datetime | None = None, limit: int | None = None
@@ -24,5 +72,16 @@ class ShiftStore(abc.ABC):
     def create(self, shift: Shift) -> None: ...
 
     @abstractmethod
-    # TODO check/remove if not used
-    def update(self, shift: Shift, new_shift: Shift) -> None: ...
+    def create_many(self, shifts: Sequence[Shift]) -> None:
+        """Insert shifts in one go (single transaction for SQL)."""
+
+    @abstractmethod
+    def archive(self, before: datetime.datetime, batch_size: int) -> int:
+        """
+        Move shifts ended before `before` out of the live ones, `batch_size` per transaction, each one is a write.
+        Archived shifts still count in `durations`, other reads return live shifts only. Number of moved shifts.
+        """
+
+    @abstractmethod
+    def update(self, shift: Shift, new_shift: Shift) -> None:
+        """Replace `shift` (matched by id) with `new_shift`, ie swap the firefighter."""
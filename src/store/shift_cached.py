@@ -0,0 +1,165 @@
+"""
+Shift reads cached in a CacheBackend shared by replicas, see CachingStoreFactory.
+
+Entries are keyed by the rotation version, every write (archival included) bumps it (see RotationStore.changes_since):
+readers of a newer version never see older entries, those just expire.
+
+Values are compact JSON arrays of shift tuples `[id, firefighter, start, end, tz]`, epoch microseconds and
+a tz-aware flag (the SQL store returns naive UTC dates).
+"""
+
+import datetime
+import json
+from collections.abc import Sequence
+from datetime import UTC
+from typing import Any
+
+from models import Shift
+from store.cache import CacheBackend
+from store.shift import EPOCH, Cursor, ShiftStore, to_micros
+
+Row = list[Any]
+
+
+def dump_shift(shift: Shift) -> Row:
+    return [
+        shift.id,
+        shift.firefighter,
+        to_micros(shift.start_date),
+        to_micros(shift.end_date),
+        int(shift.start_date.tzinfo is not None),
+    ]
+
+
+def load_shift(row: Row) -> Shift:
+    id, firefighter, start, end, aware = row
+    start_date = EPOCH + datetime.timedelta(microseconds=start)
+    end_date = EPOCH + datetime.timedelta(microseconds=end)
+    if aware:
+        start_date, end_date = (
+            start_date.replace(tzinfo=UTC),
+            end_date.replace(tzinfo=UTC),
+        )
+    return Shift(
+        id=id, firefighter=firefighter, start_date=start_date, end_date=end_date
+    )
+
+
+class CachingShiftStore(ShiftStore):
+    """
+    Reads of the rotation version the store was created with. Writes go to the wrapped store, the version is stale
+    afterward and caching stops.
+
+    `find` and `list` take `now` and don't repeat, their entries hold the looked up shifts and are answered
+    for any instant the result is the same for: `find` within the found shift (shifts of a rotation don't overlap),
+    `list` from `dt_from` up to the start of the first listed shift.
+    """
+
+    def __init__(self, store: ShiftStore, backend: CacheBackend) -> None:
+        super().__init__(store.rotation)
+        self.store = store
+        self.backend = backend
+        self._prefix: str | None = f"shifts:{self.rotation.id}:{self.rotation.version}"
+
+    def find(self, dt: datetime.datetime) -> Shift | None:
+        at = to_micros(dt)
+        row = self._get("find")
+        if row is not None and row[2] <= at < row[3]:
+            return load_shift(row)
+        shift = self.store.find(dt)
+        if shift is not None:
+            self._set("find", dump_shift(shift))
+        return shift
+
+    def last(self) -> Shift | None:
+        row = self._get("last")
+        if row is not None:
+            return load_shift(row)
+        shift = self.store.last()
+        if shift is not None:
+            self._set("last", dump_shift(shift))
+        return shift
+
+    def page(
+        self,
+        cursor: Cursor,
+        limit: int,
+        backward: bool = False,
+        until: datetime.datetime | None = None,
+    ) -> list[Shift]:
+        key = f"page:{to_micros(cursor.start_date)}:{cursor.id}:{limit}:{int(backward)}"
+        if until is not None:
+            key += f":{to_micros(until)}"
+        rows = self._get(key)
+        if rows is not None:
+            return [load_shift(row) for row in rows]
+        shifts = self.store.page(cursor, limit, backward, until)
+        self._set(key, [dump_shift(s) for s in shifts])
+        return shifts
+
+    def durations(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        key = f"durations:{to_micros(dt_from)}:{to_micros(dt_to)}"
+        totals = self._get(key)
+        if totals is not None:
+            return {
+                firefighter: datetime.timedelta(microseconds=micros)
+                for firefighter, micros in totals.items()
+            }
+        durations = self.store.durations(dt_from, dt_to)
+        self._set(
+            key,
+            {
+                firefighter: duration // datetime.timedelta(microseconds=1)
+                for firefighter, duration in durations.items()
+            },
+        )
+        return durations
+
+    def create(self, shift: Shift) -> None:
+        self._prefix = None
+        self.store.create(shift)
+
+    def create_many(self, shifts: Sequence[Shift]) -> None:
+        self._prefix = None
+        self.store.create_many(shifts)
+
+    def archive(self, before: datetime.datetime, batch_size: int) -> int:
+        self._prefix = None
+        return self.store.archive(before, batch_size)
+
+    def update(self, shift: Shift, new_shift: Shift) -> None:
+        self._prefix = None
+        self.store.update(shift, new_shift)
+
+    def _get(self, key: str) -> Any:
+        if self._prefix is None:
+            return None
+        value = self.backend.get(f"{self._prefix}:{key}")
+        return None if value is None else json.loads(value)
+
+    def _set(self, key: str, value: Any) -> None:
+        if self._prefix is not None:
+            data = json.dumps(value, separators=(",", ":")).encode()
+            self.backend.set(f"{self._prefix}:{key}", data)
+
+    def list(
+        self, dt_from: datetime.datetime | None = None, limit: int | None = None
+    ) -> list[Shift]:
+        # [dt_from, rows]
+        key = f"list:{limit}"
+        at = None if dt_from is None else to_micros(dt_from)
+        cached = self._get(key)
+        if cached is not None:
+            since, rows = cached
+            if since == at or (
+                since is not None
+                and at is not None
+                and since <= at
+                and (not rows or at < rows[0][2])
+            ):
+                return [load_shift(row) for row in rows]
+        shifts = self.store.list(dt_from, limit)
+        self._set(key, [at, [dump_shift(s) for s in shifts]])
+        return shifts
@@ -1,18 +1,87 @@
+import bisect
 import datetime
+import threading
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, assert_never
 
-from models import Rotation, Shift
-from store.shift import ShiftStore
+from models import ChangeKind, Rotation, Shift
+from store.shift import Cursor, ShiftStore
+
+if TYPE_CHECKING:
+    from store.columns import Columns
+
+
+# (kind, shifts) -> None, see InMemoryRotationStore.log
+ChangeLog = Callable[[ChangeKind, Sequence[Shift]], None]
+
+
+def shift_key(shift: Shift) -> Cursor:
+    return Cursor.of(shift)
 
 
 class InMemoryShiftStore(ShiftStore):
-    def __init__(self, rotation: Rotation):
+    def __init__(
+        self,
+        rotation: Rotation,
+        load: Callable[[], list[Shift]] | None = None,
+        log: ChangeLog | None = None,
+        lock: "threading.RLock | None" = None,
+    ):
         super().__init__(rotation)
-        self._shifts: list[Shift] = []
+        # held by writes, see InMemoryStoreFactory.save
+        self._lock = lock or threading.RLock()
+        # sorted by (start_date, id) to bisect pages
+        self._data: list[Shift] = []
+        # deferred restore from snapshot, see store.snapshot
+        self._load = load
+        # rebuilt on first aggregation after changes
+        self._columns: "Columns | None" = None
+        self._log = log
+        # ended shifts moved out of the live ones, aggregations only
+        self.archived: list[Shift] = []
+
+    @property
+    def _shifts(self) -> list[Shift]:
+        if self._load is not None:
+            with self._lock:
+                if self._load is not None:
+                    self._data, self._load = self._load(), None
+        return self._data
 
     def find(self, dt: datetime.datetime) -> Shift | None:
         xl = filter(lambda shift: shift.start_date <= dt < shift.end_date, self._shifts)
         return next(xl, None)
 
+    def last(self) -> Shift | None:
+        return self._shifts[-1] if self._shifts else None
+
+    def page(
+        self,
+        cursor: Cursor,
+        limit: int,
+        backward: bool = False,
+        until: datetime.datetime | None = None,
+    ) -> list[Shift]:
+        if backward:
+            end = bisect.bisect_left(self._shifts, cursor, key=shift_key)
+            return self._shifts[max(end - limit, 0) : end]
+        start = bisect.bisect_right(self._shifts, cursor, key=shift_key)
+        end = min(start + limit, len(self._shifts))
+        if until is not None:
+            end = bisect.bisect_left(
+                self._shifts, until, start, end, key=lambda s: s.start_date
+            )
+        return self._shifts[start:end]
+
+    def durations(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        from store.columns import Columns
+
+        if self._columns is None:
+            self._columns = Columns.of(self.archived + self._shifts)
+        return self._columns.durations(dt_from, dt_to)
+
     def list(
         self, dt_from: datetime.datetime | None = None, limit: int | None = None
     ) -> list[Shift]:
@@ -25,8 +94,100 @@ class InMemoryShiftStore(ShiftStore):
         return shifts[:limit]
 
     def create(self, shift: Shift) -> None:
-        self._shifts.append(shift)
+        with self._lock:
+            bisect.insort_right(self._shifts, shift, key=shift_key)
+            self._columns = None
+            self._changed(ChangeKind.created, [shift])
+
+    def create_many(self, shifts: Sequence[Shift]) -> None:
+        with self._lock:
+            # new shifts are mostly a sorted run after the stored ones, timsort merges runs in linear time
+            self._shifts.extend(shifts)
+            self._shifts.sort(key=shift_key)
+            self._columns = None
+            self._changed(ChangeKind.created, shifts)
+
+    def archive(self, before: datetime.datetime, batch_size: int) -> int:
+        with self._lock:
+            ended = [s for s in self._shifts if s.end_date <= before]
+            if ended:
+                self._data = [s for s in self._shifts if s.end_date > before]
+                self.archived += ended
+                self._changed(ChangeKind.archived, ended)
+            return len(ended)
 
     def update(self, shift: Shift, new_shift: Shift) -> None:
-        # TODO implement
-        pass
+        with self._lock:
+            i = next((i for i, s in enumerate(self._shifts) if s.id == shift.id), None)
+            if i is None:
+                return
+            del self._shifts[i]
+            bisect.insort_right(self._shifts, new_shift, key=shift_key)
+            self._columns = None
+            self._changed(ChangeKind.swapped, [new_shift])
+
+    def _changed(self, kind: ChangeKind, shifts: Sequence[Shift]) -> None:
+        if self._log is not None and shifts:
+            self._log(kind, shifts)
+
+
+def _entry_key(entry: tuple[Shift, str]) -> Cursor:
+    return Cursor.of(entry[0])
+
+
+class FighterIndex:
+    """
+    Shifts of all rotations per firefighter sorted by (start_date, id), kept up to date by the logged changes,
+    see InMemoryStoreFactory.shifts_of.
+    """
+
+    def __init__(self) -> None:
+        # firefighter -> [(shift, rotation id)]
+        self._entries: dict[str, list[tuple[Shift, str]]] = {}
+        # shift id -> indexed shift, swaps log the new shift only
+        self._shifts: dict[str, Shift] = {}
+        # bounds the lookup of shifts in progress, they started at most that long ago
+        self._longest = datetime.timedelta(0)
+
+    def changed(
+        self, rotation_id: str, kind: ChangeKind, shifts: Sequence[Shift]
+    ) -> None:
+        match kind:
+            case ChangeKind.created:
+                self.add(rotation_id, shifts)
+            case ChangeKind.swapped:
+                self.remove(shifts)
+                self.add(rotation_id, shifts)
+            case ChangeKind.archived | ChangeKind.deleted:
+                self.remove(shifts)
+            case default:
+                assert_never(default)
+
+    def add(self, rotation_id: str, shifts: Sequence[Shift]) -> None:
+        for shift in shifts:
+            self._shifts[shift.id] = shift
+            self._longest = max(self._longest, shift.end_date - shift.start_date)
+            entries = self._entries.setdefault(shift.firefighter, [])
+            bisect.insort_right(entries, (shift, rotation_id), key=_entry_key)
+
+    def remove(self, shifts: Sequence[Shift]) -> None:
+        for shift in shifts:
+            indexed = self._shifts.pop(shift.id, None)
+            if indexed is None:
+                continue
+            entries = self._entries[indexed.firefighter]
+            del entries[bisect.bisect_left(entries, Cursor.of(indexed), key=_entry_key)]
+
+    def upcoming(
+        self, firefighter: str, dt: datetime.datetime
+    ) -> list[tuple[str, Shift]]:
+        """The firefighter's shifts not over at `dt` with their rotation id, sorted by (start_date, id)."""
+        entries = self._entries.get(firefighter, [])
+        i = bisect.bisect_right(
+            entries, dt - self._longest, key=lambda entry: entry[0].start_date
+        )
+        return [
+            (rotation_id, shift)
+            for shift, rotation_id in entries[i:]
+            if dt < shift.end_date
+        ]
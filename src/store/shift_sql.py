@@ -1,49 +1,285 @@
 import datetime
+from collections.abc import Sequence
+from typing import Any
 
-from sqlalchemy import Engine
-from sqlmodel import select, Session
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Engine,
+    Float,
+    case,
+    cast,
+    delete,
+    extract,
+    func,
+    insert,
+    literal,
+    tuple_,
+    update,
+)
+from sqlmodel import col, select, Session
 
-from models import Shift, ShiftORM, Rotation
-from store.shift import ShiftStore
+from models import (
+    ChangeKind,
+    ChangeORM,
+    Rotation,
+    RotationORM,
+    Shift,
+    ShiftArchiveORM,
+    ShiftORM,
+)
+from store.rotation_sql import LIVE
+from store.sa import EngineRouter, as_router
+from store.shift import Cursor, ShiftStore
+
+
+def seconds_between(
+    dialect: str,
+    start: ColumnElement[datetime.datetime],
+    end: ColumnElement[datetime.datetime],
+) -> ColumnElement[float] | None:
+    """Seconds from `start` to `end` computed by the database, None if the dialect isn't known."""
+    match dialect:
+        case "sqlite":
+            return (func.julianday(end) - func.julianday(start)) * 86400.0
+        case "postgresql":
+            return cast(extract("epoch", end - start), Float)
+        case _:
+            return None
+
+
+def shift_row(shift: Shift, rotation_id: str) -> dict[str, Any]:
+    """ShiftORM insert parameters read straight from the (already validated) model."""
+    return {
+        "id": shift.id,
+        "firefighter": shift.firefighter,
+        "start_date": shift.start_date,
+        "end_date": shift.end_date,
+        "rotation_id": rotation_id,
+    }
+
+
+def log_changes(
+    conn: Connection, rotation_id: str, kind: ChangeKind, shifts: Sequence[Shift]
+) -> None:
+    """
+    Bump rotation version and log shift changes at it, in the transaction of the shift writes.
+    The row lock serializes concurrent writers of the rotation, so versions are increasing.
+    """
+    bump = (
+        update(RotationORM)
+        .where(col(RotationORM.id) == rotation_id)
+        .values(version=col(RotationORM.version) + 1)
+        .returning(col(RotationORM.version))
+    )
+    version = conn.execute(bump).scalar_one_or_none()
+    if version is None:
+        # rotation isn't stored, nothing to version
+        return
+    rows = [
+        {
+            "rotation_id": rotation_id,
+            "version": version,
+            "kind": kind,
+            "shift_id": shift.id,
+            "firefighter": shift.firefighter,
+            "start_date": shift.start_date,
+            "end_date": shift.end_date,
+        }
+        for shift in shifts
+    ]
+    conn.execute(insert(ChangeORM), rows)
+
+
+def shifts_of(
+    engine: Engine, firefighter: str, dt: datetime.datetime
+) -> list[tuple[str, Shift]]:
+    """The firefighter's shifts of live rotations not over at `dt` with their rotation id, sorted by (start_date, id)."""
+    # one range scan over the (firefighter, start_date, id) index, ended shifts are mostly archived
+    stmt = (
+        select(ShiftORM)
+        .join(RotationORM, col(RotationORM.id) == ShiftORM.rotation_id)
+        .where(ShiftORM.firefighter == firefighter)
+        .where(dt < ShiftORM.end_date)
+        .where(LIVE)
+        .where(dt < RotationORM.end_date)
+        .order_by(col(ShiftORM.start_date), col(ShiftORM.id))
+    )
+    with Session(engine) as session:
+        return [
+            (row.rotation_id, Shift.model_validate(row))
+            for row in session.exec(stmt).all()
+        ]
 
 
 class SQLAlchemyShiftStore(ShiftStore):
-    def __init__(self, rotation: Rotation, engine: Engine) -> None:
+    def __init__(self, rotation: Rotation, engine: Engine | EngineRouter) -> None:
         super().__init__(rotation)
-        self._engine = engine
+        self._engines = as_router(engine)
 
     def find(self, dt: datetime.datetime) -> Shift | None:
         stmt = (
             select(ShiftORM)
+            .where(ShiftORM.rotation_id == self.rotation.id)
             .where(ShiftORM.start_date <= dt)
             .where(dt < ShiftORM.end_date)
         )
-        with Session(self._engine) as session:
+        with Session(self._engines.read) as session:
+            result = session.exec(stmt).first()
+            if result:
+                return Shift.model_validate(result)
+            return None
+
+    def last(self) -> Shift | None:
+        stmt = (
+            select(ShiftORM)
+            .where(ShiftORM.rotation_id == self.rotation.id)
+            .order_by(col(ShiftORM.start_date).desc(), col(ShiftORM.id).desc())
+        )
+        with Session(self._engines.read) as session:
             result = session.exec(stmt).first()
             if result:
                 return Shift.model_validate(result)
             return None
 
+    def page(
+        self,
+        cursor: Cursor,
+        limit: int,
+        backward: bool = False,
+        until: datetime.datetime | None = None,
+    ) -> list[Shift]:
+        # keyset (seek) pagination, range scan over (rotation_id, start_date, id) index
+        key = tuple_(col(ShiftORM.start_date), col(ShiftORM.id))
+        value = tuple_(literal(cursor.start_date), literal(cursor.id))
+        stmt = select(ShiftORM).where(ShiftORM.rotation_id == self.rotation.id)
+        if backward:
+            stmt = stmt.where(key < value).order_by(
+                col(ShiftORM.start_date).desc(), col(ShiftORM.id).desc()
+            )
+        else:
+            stmt = stmt.where(key > value).order_by(
+                col(ShiftORM.start_date), col(ShiftORM.id)
+            )
+            if until is not None:
+                stmt = stmt.where(ShiftORM.start_date < until)
+
+        with Session(self._engines.read) as session:
+            result = session.exec(stmt.limit(limit)).all()
+            shifts = [Shift.model_validate(row) for row in result]
+            return shifts[::-1] if backward else shifts
+
+    def durations(
+        self, dt_from: datetime.datetime, dt_to: datetime.datetime
+    ) -> dict[str, datetime.timedelta]:
+        # clip shifts to the range and sum per firefighter in the database, live and archived shifts
+        lo, hi = literal(dt_from), literal(dt_to)
+        engine = self._engines.read
+        totals: dict[str, float] = {}
+        with Session(engine) as session:
+            for table in (ShiftORM, ShiftArchiveORM):
+                start = case(
+                    (col(table.start_date) < lo, lo), else_=col(table.start_date)
+                )
+                end = case((col(table.end_date) > hi, hi), else_=col(table.end_date))
+                overlapping = (
+                    table.rotation_id == self.rotation.id,
+                    col(table.start_date) < hi,
+                    col(table.end_date) > lo,
+                )
+                seconds = seconds_between(engine.dialect.name, start, end)
+                if seconds is not None:
+                    stmt = (
+                        select(table.firefighter, func.sum(seconds))
+                        .where(*overlapping)
+                        .group_by(col(table.firefighter))
+                    )
+                    rows = session.exec(stmt).all()
+                else:
+                    # no datetime arithmetic for the dialect, clipped shifts are summed here
+                    clipped = select(table.firefighter, start, end).where(*overlapping)
+                    rows = [
+                        (firefighter, (shift_end - shift_start).total_seconds())
+                        for firefighter, shift_start, shift_end in session.exec(clipped)
+                    ]
+                for firefighter, total in rows:
+                    totals[firefighter] = totals.get(firefighter, 0) + total
+        return {
+            firefighter: datetime.timedelta(seconds=round(seconds))
+            for firefighter, seconds in totals.items()
+        }
+
     def list(
         self, dt_from: datetime.datetime | None = None, limit: int | None = None
     ) -> list[Shift]:
-        stmt = select(ShiftORM)
+        stmt = (
+            select(ShiftORM)
+            .where(ShiftORM.rotation_id == self.rotation.id)
+            .order_by(col(ShiftORM.start_date))
+        )
         if dt_from:
             stmt = stmt.where(ShiftORM.start_date > dt_from)
         if limit:
             stmt = stmt.limit(limit)
 
-        with Session(self._engine) as session:
+        with Session(self._engines.read) as session:
             result = session.exec(stmt).all()
             return [Shift.model_validate(row) for row in result]
 
     def create(self, shift: Shift) -> None:
-        shift_orm = ShiftORM.model_validate(
-            shift.model_dump() | {"rotation_id": self.rotation.id}
+        self.create_many([shift])
+
+    def create_many(self, shifts: Sequence[Shift]) -> None:
+        if not shifts:
+            return
+        # Core executemany of plain parameter dicts, no ShiftORM instances or unit of work
+        rows = [shift_row(shift, self.rotation.id) for shift in shifts]
+        with self._engines.write.begin() as conn:
+            conn.execute(insert(ShiftORM), rows)
+            log_changes(conn, self.rotation.id, ChangeKind.created, shifts)
+
+    def archive(self, before: datetime.datetime, batch_size: int) -> int:
+        # range scan over (rotation_id, start_date, id), shifts end after they start
+        ended = (
+            select(
+                col(ShiftORM.id),
+                col(ShiftORM.firefighter),
+                col(ShiftORM.start_date),
+                col(ShiftORM.end_date),
+            )
+            .where(ShiftORM.rotation_id == self.rotation.id)
+            .where(col(ShiftORM.start_date) < before)
+            .where(col(ShiftORM.end_date) <= before)
+            .order_by(col(ShiftORM.start_date), col(ShiftORM.id))
+            .limit(batch_size)
         )
-        with Session(self._engine) as session:
-            session.add(shift_orm)
-            session.commit()
+        columns = ["id", "firefighter", "start_date", "end_date", "rotation_id"]
+        moved = 0
+        while True:
+            with self._engines.write.begin() as conn:
+                shifts = [Shift(**row._mapping) for row in conn.execute(ended)]
+                ids = [shift.id for shift in shifts]
+                if ids:
+                    batch = select(*(col(getattr(ShiftORM, c)) for c in columns))
+                    conn.execute(
+                        insert(ShiftArchiveORM).from_select(
+                            columns, batch.where(col(ShiftORM.id).in_(ids))
+                        )
+                    )
+                    conn.execute(delete(ShiftORM).where(col(ShiftORM.id).in_(ids)))
+                    # live reads change, ie cached shifts and feed ETags are of the previous version
+                    log_changes(conn, self.rotation.id, ChangeKind.archived, shifts)
+            moved += len(ids)
+            if len(ids) < batch_size:
+                return moved
 
     def update(self, shift: Shift, new_shift: Shift) -> None:
-        pass
+        stmt = (
+            update(ShiftORM)
+            .where(col(ShiftORM.rotation_id) == self.rotation.id)
+            .where(col(ShiftORM.id) == shift.id)
+            .values(shift_row(new_shift, self.rotation.id))
+        )
+        with self._engines.write.begin() as conn:
+            if conn.execute(stmt).rowcount:
+                log_changes(conn, self.rotation.id, ChangeKind.swapped, [new_shift])
@@ -0,0 +1,134 @@
+"""
+Binary snapshot of in-memory rotations and shifts, see InMemoryStoreFactory.save/restore.
+
+Layout (little-endian):
+    header      magic, version, rotations/strings section sizes, shifts count
+    rotations   JSON list of [rotation, first shift row, shifts count]
+    strings     NUL separated UTF-8 table of shift ids and firefighters
+    shifts      fixed size records (id, firefighter string index, start/end epoch microseconds, tz flag)
+
+Shift records are read straight from the memory-mapped file, so restore costs only the rotations section,
+shifts of a rotation are turned into models on first access (see InMemoryShiftStore).
+"""
+
+import datetime
+import functools
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Callable, Iterable
+from datetime import UTC
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+
+from models import Rotation, Shift
+from store.shift import to_micros
+
+MAGIC = b"BOBSNAP\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQQ")
+SHIFT = np.dtype(
+    [
+        ("id", "<u4"),
+        ("firefighter", "<u4"),
+        ("start", "<i8"),
+        ("end", "<i8"),
+        ("aware", "u1"),
+    ]
+)
+
+ShiftsLoader = Callable[[], list[Shift]]
+
+
+def dump(path: str | Path, rotations: Iterable[tuple[Rotation, list[Shift]]]) -> None:
+    """Write snapshot atomically: readers see either the previous or the new file."""
+    strings: dict[str, int] = {}
+
+    def index(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    meta = []
+    records: list[tuple[int, int, int, int, bool]] = []
+    for rotation, shifts in rotations:
+        meta.append([rotation.model_dump(mode="json"), len(records), len(shifts)])
+        records += [
+            (
+                index(s.id),
+                index(s.firefighter),
+                to_micros(s.start_date),
+                to_micros(s.end_date),
+                s.start_date.tzinfo is not None,
+            )
+            for s in shifts
+        ]
+
+    meta_data = json.dumps(meta).encode()
+    strings_data = "\0".join(strings).encode()
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        try:
+            f.write(
+                HEADER.pack(
+                    MAGIC, VERSION, len(meta_data), len(strings_data), len(records)
+                )
+            )
+            f.write(meta_data)
+            f.write(strings_data)
+            f.write(np.array(records, dtype=SHIFT).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def load(path: str | Path) -> list[tuple[Rotation, ShiftsLoader]]:
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, meta_size, strings_size, n_shifts = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported snapshot {path}: {magic!r} v{version}")
+
+    meta_start = HEADER.size
+    strings_start = meta_start + meta_size
+    shifts_start = strings_start + strings_size
+    meta = json.loads(buf[meta_start:strings_start])
+    rows = np.frombuffer(buf, dtype=SHIFT, count=n_shifts, offset=shifts_start)
+
+    @functools.cache
+    def strings() -> list[str]:
+        return buf[strings_start:shifts_start].decode().split("\0")
+
+    def loader(start: int, count: int) -> ShiftsLoader:
+        return lambda: to_shifts(rows[start : start + count], strings())
+
+    return [
+        (Rotation.model_validate(rotation), loader(start, count))
+        for rotation, start, count in meta
+    ]
+
+
+def to_shifts(rows: np.ndarray[Any, Any], strings: list[str]) -> list[Shift]:
+    # vectorized epoch -> datetime conversion, validation is skipped: snapshot holds validated shifts
+    ids = cast(list[int], rows["id"].tolist())
+    fighters = cast(list[int], rows["firefighter"].tolist())
+    starts = cast(
+        list[datetime.datetime], rows["start"].astype("datetime64[us]").tolist()
+    )
+    ends = cast(list[datetime.datetime], rows["end"].astype("datetime64[us]").tolist())
+    aware = cast(list[int], rows["aware"].tolist())
+    return [
+        Shift.model_construct(
+            id=strings[id_],
+            firefighter=strings[fighter],
+            start_date=start.replace(tzinfo=UTC) if tz else start,
+            end_date=end.replace(tzinfo=UTC) if tz else end,
+        )
+        for id_, fighter, start, end, tz in zip(ids, fighters, starts, ends, aware)
+    ]
@@ -0,0 +1,31 @@
+import datetime
+import functools
+from datetime import UTC
+from zoneinfo import ZoneInfo
+
+
+@functools.lru_cache(maxsize=None)
+def get_timezone(name: str) -> ZoneInfo:
+    """Registry of tz objects, keeps strong references (ZoneInfo cache holds only a few)."""
+    return ZoneInfo(name)
+
+
+class DateFormatter:
+    """Render UTC datetimes in a timezone, both timezone and format are resolved once."""
+
+    __slots__ = ("tz", "fmt")
+
+    def __init__(self, tz: str, fmt: str) -> None:
+        self.tz = get_timezone(tz)
+        self.fmt = fmt
+
+    def __call__(self, dt: datetime.datetime) -> str:
+        # dates are stored in UTC, SQLite doesn't persist timezone
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=UTC)
+        return dt.astimezone(self.tz).strftime(self.fmt)
+
+
+@functools.lru_cache(maxsize=256)
+def date_formatter(tz: str, fmt: str) -> DateFormatter:
+    return DateFormatter(tz, fmt)
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import Counter
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+from store.cache_redis import read_reply
+
+
+class RedisStub:
+    """
+    In-process stand-in for a Redis server: PING, AUTH, SELECT, GET, SET (with EX/PX), DEL and FLUSHALL.
+    Every command is counted by name.
+    """
+
+    def __init__(self, password: str | None = None, port: int = 0) -> None:
+        self.password = password
+        # key -> (value, expires at monotonic or None)
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingTCPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host!s}:{port}/1"
+
+    def start(self) -> "RedisStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def execute(self, args: list[bytes]) -> bytes:
+        name = args[0].decode().upper()
+        with self._lock:
+            self.calls[name] += 1
+            match name, args[1:]:
+                case "PING", _:
+                    return b"+PONG\r\n"
+                case "AUTH", [password]:
+                    if password.decode() != self.password:
+                        return b"-WRONGPASS invalid password\r\n"
+                    return b"+OK\r\n"
+                case "SELECT", [_]:
+                    return b"+OK\r\n"
+                case "GET", [key]:
+                    value, expires_at = self.data.get(key, (None, None))
+                    if value is None or (expires_at and expires_at <= time.monotonic()):
+                        return b"$-1\r\n"
+                    return b"$%d\r\n%s\r\n" % (len(value), value)
+                case "SET", [key, value, *options]:
+                    self.data[key] = (value, self._expires_at(options))
+                    return b"+OK\r\n"
+                case "DEL", keys:
+                    deleted = sum(self.data.pop(key, None) is not None for key in keys)
+                    return b":%d\r\n" % deleted
+                case "FLUSHALL", _:
+                    self.data.clear()
+                    return b"+OK\r\n"
+                case _:
+                    return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    @staticmethod
+    def _expires_at(options: list[bytes]) -> float | None:
+        match [o.upper() if i % 2 == 0 else o for i, o in enumerate(options)]:
+            case [b"EX", seconds]:
+                return time.monotonic() + int(seconds)
+            case [b"PX", millis]:
+                return time.monotonic() + int(millis) / 1000
+            case _:
+                return None
+
+    def _handler(self) -> type[StreamRequestHandler]:
+        stub = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self) -> None:
+                while True:
+                    try:
+                        args = read_reply(self.rfile)
+                    except ConnectionError:
+                        return
+                    assert isinstance(args, list)
+                    self.wfile.write(
+                        stub.execute([a for a in args if isinstance(a, bytes)])
+                    )
+
+        return Handler
@@ -0,0 +1,86 @@
+import datetime as dt
+
+import pytest
+
+from models import Rotation, Schedule, Temporal
+from service.ics import IcsService, fold
+from service.oncall import OncallService
+from store.factory import InMemoryStoreFactory, SQLStoreFactory, StoreFactory
+from tests.conftest import engine
+
+
+@pytest.fixture(params=["mem", "sql"])
+def store_factory(request: pytest.FixtureRequest) -> StoreFactory:
+    if request.param == "mem":
+        return InMemoryStoreFactory()
+    return SQLStoreFactory(engine)
+
+
+@pytest.fixture()
+def rotation(store_factory: StoreFactory) -> Rotation:
+    rotation = Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1", "f2", "f3"],
+        start_date=dt.datetime(2025, 1, 1, 9),
+        end_date=dt.datetime(2025, 1, 8, 9),
+    )
+    OncallService(store_factory).create_rotation(rotation)
+    # in-memory shift stores are bound to the stored (UTC) rotation
+    stored = store_factory.rotation().get_by_id(rotation.id)
+    assert stored
+    return stored
+
+
+def test_ics__iter_lines(store_factory: StoreFactory, rotation: Rotation) -> None:
+    ics = "".join(IcsService(store_factory).iter_lines(rotation))
+
+    assert ics.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    assert ics.endswith("END:VCALENDAR\r\n")
+    assert ics.count("BEGIN:VEVENT") == 7
+    assert "DTSTART:20250101T090000Z\r\nDTEND:20250102T090000Z\r\n" in ics
+    assert "SUMMARY:On-call: f1\r\n" in ics
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 7, 100])
+def test_ics__iter_shifts__should_stream_all_pages(
+    store_factory: StoreFactory, rotation: Rotation, page_size: int
+) -> None:
+    shifts = list(IcsService(store_factory, page_size).iter_shifts(rotation))
+    assert [s.firefighter for s in shifts] == ["f1", "f2", "f3"] * 2 + ["f1"]
+
+
+def test_ics__iter_shifts__should_filter_by_user(
+    store_factory: StoreFactory, rotation: Rotation
+) -> None:
+    shifts = list(IcsService(store_factory, 2).iter_shifts(rotation, user="f2"))
+    assert [s.start_date.day for s in shifts] == [2, 5]
+
+
+def test_ics__etag__should_depend_on_user(
+    store_factory: StoreFactory, rotation: Rotation
+) -> None:
+    ics = IcsService(store_factory)
+    assert ics.etag(rotation) == ics.etag(rotation)
+    assert ics.etag(rotation) != ics.etag(rotation, user="f1")
+
+
+def test_ics__etag__should_change_with_shifts(
+    store_factory: StoreFactory, rotation: Rotation
+) -> None:
+    ics = IcsService(store_factory)
+    shift = store_factory.shifts(rotation).list()[0]
+    store_factory.shifts(rotation).update(
+        shift, shift.model_copy(update={"firefighter": "f3"})
+    )
+
+    swapped = store_factory.rotation().get_by_id(rotation.id)
+    assert swapped
+    assert ics.etag(swapped) != ics.etag(rotation)
+
+
+def test_ics__fold__should_split_long_lines() -> None:
+    line = "SUMMARY:" + "ü" * 100
+    folded = fold(line)
+    assert all(len(part.encode()) <= 75 for part in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "") == line + "\r\n"
@@ -1,11 +1,15 @@
 import datetime as dt
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pytest
 
-from models import Rotation, Schedule, Shift, Temporal
+from models import Allocation, ChangeKind, Rotation, Schedule, Shift, Temporal
 from service.oncall import OncallService
 from store.factory import InMemoryStoreFactory, SQLStoreFactory
+from store.shift import Cursor
+from store.shift_mem import InMemoryShiftStore
+from store.shift_sql import SQLAlchemyShiftStore
 from tests.conftest import engine
 
 
@@ -26,6 +30,25 @@ def test_oncall_service__create_rotation(rotation: Rotation) -> None:
     assert len(shifts) == 12
 
 
+def test_oncall_service__create_rotation__should_load_calendar_for_bdays_only() -> None:
+    svc = OncallService(InMemoryStoreFactory())
+    rotation = Rotation(
+        schedule=Schedule(each=1, temporal=Temporal.week),
+        fighters=["f1", "f2"],
+        start_date=dt.datetime(2025, 1, 1),
+        end_date=dt.datetime(2025, 2, 1),
+        calendar="missing",
+    )
+    assert len(svc.create_rotation(rotation)) == 4
+
+    with pytest.raises(ValueError, match="not found"):
+        svc.create_rotation(
+            rotation.model_copy(
+                update={"schedule": Schedule(each=1, temporal=Temporal.bday)}
+            )
+        )
+
+
 def test_oncall_service__create_rotation_with_timezone() -> None:
     svc = OncallService(InMemoryStoreFactory())
 
@@ -94,6 +117,28 @@ def test_oncall_service__create_rotation_with_timezone_over_dst() -> None:
     ]
 
 
+def test_oncall_service__create_rotation_with_rrule() -> None:
+    svc = OncallService(InMemoryStoreFactory())
+
+    rotation = Rotation(
+        # hand over on every Monday and Thursday 10:00
+        schedule=Schedule(
+            each=1, temporal=Temporal.rrule, rule="FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=10"
+        ),
+        fighters=["f1", "f2"],
+        start_date=dt.datetime(2025, 1, 6, 10),
+        end_date=dt.datetime(2025, 1, 20, 10),
+    )
+
+    shifts = svc.create_rotation(rotation)
+    assert [(s.firefighter, s.start_date.day, s.end_date.day) for s in shifts] == [
+        ("f1", 6, 9),
+        ("f2", 9, 13),
+        ("f1", 13, 16),
+        ("f2", 16, 20),
+    ]
+
+
 def test_oncall_service__get_current_shift(rotation: Rotation) -> None:
     svc = OncallService(InMemoryStoreFactory())
     svc.create_rotation(rotation)
@@ -217,3 +262,308 @@ def test_oncall_service__get_shifts_returns_empty_list_if_shift_not_exists(
     svc.create_rotation(rotation)
 
     assert svc.get_shifts(now) == []
+
+
+def test_oncall_service__get_shifts_page(rotation: Rotation) -> None:
+    svc = OncallService(InMemoryStoreFactory())
+    shifts = svc.create_rotation(rotation)
+
+    cursor = Cursor.of(shifts[3])
+    assert svc.get_shifts_page("id0", cursor, limit=2) == shifts[4:6]
+    assert svc.get_shifts_page("id0", cursor, limit=2, backward=True) == shifts[1:3]
+    assert svc.get_shifts_page("unknown", cursor) == []
+
+
+def test_oncall_service__create_rotation_balanced() -> None:
+    svc = OncallService(InMemoryStoreFactory())
+
+    rotation = Rotation(
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1", "f2", "f3"],
+        # Fri - Wed
+        start_date=dt.datetime(2025, 1, 3, 9),
+        end_date=dt.datetime(2025, 1, 8, 9),
+        allocation=Allocation.balanced,
+    )
+
+    shifts = svc.create_rotation(rotation)
+    # f2 took the whole weekend (Sat-Sun shift), so f3 goes next instead of f2
+    assert [s.firefighter for s in shifts] == ["f1", "f2", "f3", "f1", "f3"]
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__roll(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+
+    rotation = Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1", "f2", "f3"],
+        start_date=dt.datetime(2025, 1, 1, 9),
+        timezone="America/New_York",
+        horizon_weeks=1,
+    )
+    shifts = svc.create_rotation(rotation)
+    assert len(shifts) == 7
+
+    # nothing to do within the horizon
+    assert svc.roll(dt.datetime(2025, 1, 1, 14, tzinfo=dt.UTC)) == 0
+
+    now = dt.datetime(2025, 1, 3, 14, tzinfo=dt.UTC)
+    assert svc.roll(now) == 2
+    assert svc.roll(now) == 0
+
+    extended = svc.get_shifts_page("id0", Cursor.of(shifts[-1]), limit=5)
+    # f1 took the last materialized shift (Jan 7), cycle continues
+    assert [(s.firefighter, s.start_date.replace(tzinfo=dt.UTC)) for s in extended] == [
+        ("f2", dt.datetime(2025, 1, 8, 14, tzinfo=dt.UTC)),
+        ("f3", dt.datetime(2025, 1, 9, 14, tzinfo=dt.UTC)),
+    ]
+    current = svc.get_current_shift(dt.datetime(2025, 1, 9, 15, tzinfo=dt.UTC))
+    assert current
+    assert current.id == extended[-1].id
+
+    stored = store_factory.rotation().get_by_id("id0")
+    assert stored
+    assert stored.end_date.replace(tzinfo=dt.UTC) == dt.datetime(
+        2025, 1, 10, 14, tzinfo=dt.UTC
+    )
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__changes_since(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    rotation = Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1", "f2", "f3"],
+        start_date=dt.datetime(2025, 1, 1, 9),
+        horizon_weeks=1,
+    )
+    shifts = svc.create_rotation(rotation)
+    rotations = store_factory.rotation()
+    created = rotations.get_by_id("id0")
+    assert created
+    assert created.version == 1
+
+    # shifts are appended, then end_date is updated
+    svc.roll(dt.datetime(2025, 1, 3, 9, tzinfo=dt.UTC))
+    store_factory.shifts(created).update(
+        shifts[0], shifts[0].model_copy(update={"firefighter": "f3"})
+    )
+    current = rotations.get_by_id("id0")
+    assert current
+    assert current.version == 4
+
+    changes = rotations.changes_since("id0", created.version)
+    assert changes is not None
+    assert [(c.version, c.kind, c.shift.firefighter) for c in changes] == [
+        (2, ChangeKind.created, "f2"),
+        (2, ChangeKind.created, "f3"),
+        (4, ChangeKind.swapped, "f3"),
+    ]
+    assert changes[-1].shift.id == shifts[0].id
+    assert rotations.changes_since("id0", current.version) == []
+    all_changes = rotations.changes_since("id0", 0)
+    assert all_changes is not None
+    assert len(all_changes) == len(shifts) + 3
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__changes_since__should_log_deleted_shifts(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    shifts = svc.create_rotation(
+        Rotation(
+            id="id0",
+            schedule=Schedule(each=1, temporal=Temporal.day),
+            fighters=["f1", "f2"],
+            start_date=dt.datetime(2025, 1, 1),
+            end_date=dt.datetime(2025, 1, 4),
+        )
+    )
+    rotation = store_factory.rotation().get_by_id("id0")
+    assert rotation
+
+    assert svc.delete_rotation("id0")
+    changes = store_factory.rotation().changes_since("id0", rotation.version)
+    assert changes is not None
+    assert [(c.version, c.kind, c.shift.id) for c in changes] == [
+        (rotation.version + 1, ChangeKind.deleted, s.id) for s in shifts
+    ]
+
+    svc.compact(None, batch_size=10)
+    assert store_factory.rotation().changes_since("id0", rotation.version) == []
+
+
+def test_oncall_service__changes_since__should_not_reach_before_restore(
+    tmp_path: Path,
+) -> None:
+    store_factory = InMemoryStoreFactory()
+    OncallService(store_factory).create_rotation(
+        Rotation(
+            id="id0",
+            schedule=Schedule(each=1, temporal=Temporal.day),
+            fighters=["f1", "f2"],
+            start_date=dt.datetime(2025, 1, 1),
+            end_date=dt.datetime(2025, 1, 8),
+        )
+    )
+    store_factory.save(tmp_path / "snapshot")
+
+    restored = InMemoryStoreFactory()
+    restored.restore(tmp_path / "snapshot")
+    assert restored.rotation().changes_since("id0", 0) is None
+    assert restored.rotation().changes_since("id0", 1) == []
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__compact(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    for i in range(2):
+        svc.create_rotation(
+            Rotation(
+                id=f"id{i}",
+                schedule=Schedule(each=1, temporal=Temporal.day),
+                fighters=["f1", "f2"],
+                start_date=dt.datetime(2025, 1, 1),
+                end_date=dt.datetime(2025, 1, 11),
+            )
+        )
+    assert svc.delete_rotation("id1")
+    now = dt.datetime(2025, 1, 15, tzinfo=dt.UTC)
+    report = svc.report(dt.datetime(2025, 1, 1), dt.datetime(2025, 1, 11))
+
+    # nothing is archived without retention, only the deleted rotation is purged
+    purged = svc.compact(None, batch_size=3, now=now)
+    # shifts and their created and deleted changes, the rotation row
+    assert purged == (10 + 10 if impl == "mem" else 10 + 10 + 10 + 1)
+    # archived shifts, then their created and archived changes
+    assert svc.compact(dt.timedelta(days=7), batch_size=3, now=now) == 7 + 7 + 7
+
+    rotation = store_factory.rotation().get_by_id("id0")
+    assert rotation
+    shifts = store_factory.shifts(rotation)
+    assert [s.start_date.day for s in shifts.list()] == [8, 9, 10]
+    # archived shifts still count
+    assert svc.report(dt.datetime(2025, 1, 1), dt.datetime(2025, 1, 11)) == report
+    # archival is a write, its change log is gone with the one of archived shifts
+    assert store_factory.rotation().changes_since("id0", 1) is None
+    assert store_factory.rotation().changes_since("id0", rotation.version) == []
+    assert store_factory.rotation().get_by_id("id1") is None
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__get_oncall__should_return_every_layer(
+    impl: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    for layer, fighters, temporal in [
+        (1, ["s1", "s2"], Temporal.week),
+        (0, ["p1", "p2"], Temporal.day),
+    ]:
+        svc.create_rotation(
+            Rotation(
+                schedule=Schedule(each=1, temporal=temporal),
+                fighters=fighters,
+                start_date=dt.datetime(2025, 1, 1, 9),
+                timezone="America/New_York",
+                layer=layer,
+            )
+        )
+
+    # a seek per rotation, no paging through upcoming shifts
+    with monkeypatch.context() as m:
+        for store in (InMemoryShiftStore, SQLAlchemyShiftStore):
+            m.setattr(store, "page", None)
+        oncall = svc.get_oncall(dt.datetime(2025, 1, 2, 15, tzinfo=dt.UTC))
+    assert [(layer, s.firefighter) for layer, s in oncall.items()] == [
+        (0, "p2"),
+        (1, "s1"),
+    ]
+    # primary only for single rotation lookups
+    rotation = svc.get_rotation(dt.datetime(2025, 1, 2, 15, tzinfo=dt.UTC))
+    assert rotation
+    assert rotation.fighters == ["p1", "p2"]
+    assert svc.get_oncall(dt.datetime(2024, 1, 1, tzinfo=dt.UTC)) == {}
+
+    timeline = svc.timeline(
+        dt.datetime(2025, 1, 2, tzinfo=dt.UTC), dt.datetime(2025, 1, 4, tzinfo=dt.UTC)
+    )
+    assert [
+        tuple(s.firefighter if s else None for s in segment.shifts)
+        for segment in timeline.segments
+    ] == [("p1", "s1"), ("p2", "s1"), ("p1", "s1")]
+    assert timeline.segments[-1].end == dt.datetime(2025, 1, 4, tzinfo=dt.UTC)
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__next_shifts(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    for layer, fighters, start_date in [
+        (0, ["p1", "s1"], dt.datetime(2025, 1, 1, 9)),
+        (1, ["s1", "s2", "s3"], dt.datetime(2025, 1, 1, 9)),
+        # replaces the first rotation of the layer from Jan 10th, mid-shift
+        (0, ["p2", "p3"], dt.datetime(2025, 1, 10, 21)),
+    ]:
+        svc.create_rotation(
+            Rotation(
+                schedule=Schedule(each=1, temporal=Temporal.day),
+                fighters=fighters,
+                start_date=start_date,
+                end_date=start_date + dt.timedelta(days=30),
+                layer=layer,
+            )
+        )
+
+    def next_shifts(firefighter: str, now: dt.datetime) -> list[tuple[int, int, int]]:
+        shifts = svc.next_shifts(firefighter, now.replace(tzinfo=dt.UTC))
+        return [
+            (layer, s.start_date.day, s.end_date.day) for layer, s in shifts.items()
+        ]
+
+    # on call now in the secondary layer, next primary shift tomorrow
+    assert next_shifts("s1", dt.datetime(2025, 1, 1, 10)) == [(0, 2, 3), (1, 1, 2)]
+    # p1's shifts are replaced from Jan 10th
+    assert next_shifts("p1", dt.datetime(2025, 1, 8, 10)) == [(0, 9, 10)]
+    assert next_shifts("p1", dt.datetime(2025, 1, 10, 10)) == []
+    # cut where the replacing rotation starts
+    assert next_shifts("s1", dt.datetime(2025, 1, 10, 10)) == [(0, 10, 10), (1, 10, 11)]
+    assert next_shifts("s1", dt.datetime(2025, 1, 10, 22)) == [(1, 10, 11)]
+    assert next_shifts("p3", dt.datetime(2025, 1, 1)) == [(0, 11, 12)]
+    assert next_shifts("nobody", dt.datetime(2025, 1, 1)) == []
+
+
+@pytest.mark.parametrize("impl", ["mem", "sql"])
+def test_oncall_service__report(impl: str) -> None:
+    store_factory = InMemoryStoreFactory() if impl == "mem" else SQLStoreFactory(engine)
+    svc = OncallService(store_factory)
+    for i, fighters in enumerate([["f1", "f2"], ["f2", "f3"]]):
+        svc.create_rotation(
+            Rotation(
+                id=f"id{i}",
+                schedule=Schedule(each=1, temporal=Temporal.day),
+                fighters=fighters,
+                start_date=dt.datetime(2025, 1, 1) + dt.timedelta(days=10 * i),
+                end_date=dt.datetime(2025, 1, 11) + dt.timedelta(days=10 * i),
+                timezone="America/New_York",
+            )
+        )
+
+    tz = ZoneInfo("America/New_York")
+    report = svc.report(
+        dt.datetime(2025, 1, 5, 12, tzinfo=tz), dt.datetime(2025, 1, 15, tzinfo=tz)
+    )
+    # id0 (Jan 5 12:00 - Jan 11): f1 on 5th (half), 7th, 9th, f2 on 6th, 8th, 10th
+    # id1 (Jan 11 - Jan 15): f2 on 11th, 13th, f3 on 12th, 14th
+    assert report == {
+        "f2": dt.timedelta(days=5),
+        "f1": dt.timedelta(days=2, hours=12),
+        "f3": dt.timedelta(days=2),
+    }
+    assert list(report) == ["f2", "f1", "f3"]
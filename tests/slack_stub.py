@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs
+
+# (params) -> (status, headers, json body)
+Route = Callable[[dict[str, Any]], tuple[int, dict[str, str], dict[str, Any]]]
+
+
+def ok(payload: dict[str, Any]) -> Route:
+    return lambda params: (200, {}, {"ok": True, **payload})
+
+
+class SlackStub:
+    """
+    Local stand-in for Slack Web API, point WebClient to it with `WebClient(base_url=stub.base_url)`.
+    Unknown methods answer `{"ok": true}`, every call is counted by method name.
+    """
+
+    def __init__(self, delay: float = 0.0, port: int = 0) -> None:
+        self.delay = delay
+        self.routes: dict[str, Route] = {}
+        self.calls: Counter[str] = Counter()
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/api/"
+
+    def route(self, method: str, route: Route) -> None:
+        self.routes[method] = route
+
+    def start(self) -> "SlackStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                method = self.path.removeprefix("/api/").split("?")[0]
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    params = json.loads(raw or b"{}")
+                else:
+                    params = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+
+                with stub._lock:
+                    stub.calls[method] += 1
+                    stub.requests.append((method, params))
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                route = stub.routes.get(method, ok({}))
+                status, headers, body = route(params)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,146 @@
+import datetime as dt
+import time
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from sqlalchemy import delete
+
+from models import Rotation, Schedule, Shift, ShiftORM, Temporal
+from service.oncall import OncallService
+from store.cache import CacheBackend
+from store.cache_mem import InMemoryCacheBackend
+from store.cache_redis import RedisCacheBackend
+from store.factory import CachingStoreFactory, SQLStoreFactory
+from store.shift import Cursor
+from store.shift_cached import dump_shift, load_shift
+from tests.conftest import engine
+from tests.redis_stub import RedisStub
+
+
+@pytest.fixture()
+def redis() -> Generator[RedisStub, None, None]:
+    stub = RedisStub(password="secret").start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture(params=["mem", "redis"])
+def backend(request: Any, redis: RedisStub) -> CacheBackend:
+    if request.param == "mem":
+        return InMemoryCacheBackend(ttl=60, maxsize=100)
+    return RedisCacheBackend(redis.url, ttl=60)
+
+
+@pytest.fixture()
+def rotation() -> Rotation:
+    return Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1", "f2", "f3"],
+        start_date=dt.datetime(2025, 1, 1, 9),
+        end_date=dt.datetime(2025, 1, 11, 9),
+    )
+
+
+def drop_shifts() -> None:
+    """Delete shifts behind the store's back, the rotation version stays, so cached reads still answer."""
+    with engine.begin() as conn:
+        conn.execute(delete(ShiftORM))
+
+
+def test_backend(backend: CacheBackend) -> None:
+    assert backend.get("k") is None
+    backend.set("k", b"\x00value\r\n")
+    assert backend.get("k") == b"\x00value\r\n"
+
+
+def test_redis_backend__should_auth_select_and_expire(redis: RedisStub) -> None:
+    backend = RedisCacheBackend(redis.url, ttl=0.05)
+    backend.set("k", b"v")
+    assert backend.get("k") == b"v"
+    time.sleep(0.1)
+    assert backend.get("k") is None
+    # connection is reused
+    assert redis.calls["AUTH"] == 1
+    assert redis.calls["SELECT"] == 1
+
+
+def test_redis_backend__should_miss_if_unavailable(redis: RedisStub) -> None:
+    # nothing listens on port 1
+    backend = RedisCacheBackend("redis://127.0.0.1:1", ttl=60)
+    backend.set("k", b"v")
+    assert backend.get("k") is None
+
+    backend = RedisCacheBackend(redis.url.replace("secret", "wrong"), ttl=60)
+    backend.set("k", b"v")
+    assert backend.get("k") is None
+    assert redis.calls["SET"] == 0
+
+
+def test_dump_shift() -> None:
+    aware = Shift(
+        firefighter="f1",
+        start_date=dt.datetime(2025, 1, 1, 9, 30, 0, 1, tzinfo=dt.UTC),
+        end_date=dt.datetime(2025, 1, 2, 9, tzinfo=dt.UTC),
+    )
+    naive = aware.model_copy(
+        update={
+            "start_date": aware.start_date.replace(tzinfo=None),
+            "end_date": aware.end_date.replace(tzinfo=None),
+        }
+    )
+    assert load_shift(dump_shift(aware)) == aware
+    assert load_shift(dump_shift(naive)) == naive
+
+
+def test_caching_factory__should_read_cached_shifts(
+    backend: CacheBackend, rotation: Rotation
+) -> None:
+    factory = CachingStoreFactory(SQLStoreFactory(engine), backend)
+    svc = OncallService(factory)
+    svc.create_rotation(rotation)
+    now = dt.datetime(2025, 1, 3, 10, tzinfo=dt.UTC)
+
+    shifts = svc.get_shifts(now)
+    assert shifts == OncallService(SQLStoreFactory(engine)).get_shifts(now)
+    stored = factory.rotation().get_by_id("id0")
+    assert stored
+    page = svc.get_shifts_page("id0", Cursor.of(shifts[-1]), limit=3)
+    report = svc.report(now, now + dt.timedelta(days=2))
+    last = factory.shifts(stored).last()
+
+    drop_shifts()
+    # within the current shift and before the next one starts, same result
+    assert svc.get_shifts(now + dt.timedelta(hours=20)) == shifts
+    assert svc.get_shifts_page("id0", Cursor.of(shifts[-1]), limit=3) == page
+    assert svc.report(now, now + dt.timedelta(days=2)) == report
+    assert factory.shifts(stored).last() == last
+    # the next shift is not cached
+    assert svc.get_shifts(now + dt.timedelta(days=1)) == []
+
+
+def test_caching_factory__should_read_new_version(
+    backend: CacheBackend, rotation: Rotation
+) -> None:
+    factory = CachingStoreFactory(SQLStoreFactory(engine), backend)
+    svc = OncallService(factory)
+    svc.create_rotation(rotation)
+    now = dt.datetime(2025, 1, 3, 10, tzinfo=dt.UTC)
+    shifts = svc.get_shifts(now)
+
+    # swapped by another replica, bumps the version
+    uncached = SQLStoreFactory(engine)
+    stored = uncached.rotation().get_by_id("id0")
+    assert stored
+    uncached.shifts(stored).update(
+        shifts[1], shifts[1].model_copy(update={"firefighter": "f9"})
+    )
+
+    assert [s.firefighter for s in svc.get_shifts(now)] == [
+        "f3",
+        "f9",
+        "f2",
+        "f3",
+        "f1",
+    ]
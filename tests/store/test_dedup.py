@@ -0,0 +1,86 @@
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlmodel import SQLModel, create_engine
+
+from models import Outcome
+from store.dedup import DedupStore
+from store.dedup_mem import InMemoryDedupStore
+from store.dedup_sql import SQLAlchemyDedupStore
+from tests.conftest import engine
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = dt.datetime(2025, 1, 1)
+
+    def __call__(self) -> dt.datetime:
+        return self.now
+
+    def monotonic(self) -> float:
+        return (self.now - dt.datetime(2025, 1, 1)).total_seconds()
+
+
+@pytest.fixture()
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture(params=["mem", "sql"])
+def store(request: Any, clock: Clock) -> DedupStore:
+    if request.param == "mem":
+        mem = InMemoryDedupStore(ttl=60, maxsize=100)
+        mem._requests.clock = clock.monotonic
+        return mem
+    return SQLAlchemyDedupStore(engine, ttl=60, clock=clock)
+
+
+def test_dedup_store__should_claim_once(store: DedupStore) -> None:
+    assert store.claim("k1")
+    assert not store.claim("k1")
+    assert store.claim("k2")
+
+
+def test_dedup_store__should_record_outcome(store: DedupStore) -> None:
+    store.claim("k1")
+    assert store.get("k1") is None  # in progress
+
+    outcome = Outcome(status=200, body='{"ok": true}', headers={"x": ["1"]})
+    store.put("k1", outcome)
+    assert store.get("k1") == outcome
+    assert not store.claim("k1")
+
+
+def test_dedup_store__should_release(store: DedupStore) -> None:
+    store.claim("k1")
+    store.release("k1")
+    assert store.get("k1") is None
+    assert store.claim("k1")
+
+
+def test_dedup_store__should_expire(store: DedupStore, clock: Clock) -> None:
+    store.claim("k1")
+    store.put("k1", Outcome())
+    clock.now += dt.timedelta(seconds=61)
+    assert store.get("k1") is None
+    assert store.claim("k1")
+
+
+@pytest.fixture(params=["mem", "sql"])
+def shared_store(request: Any, tmp_path: Path) -> DedupStore:
+    if request.param == "mem":
+        return InMemoryDedupStore(ttl=60, maxsize=100)
+    # workers don't share in-memory SQLite connections, use a database file
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+    SQLModel.metadata.create_all(file_engine)
+    return SQLAlchemyDedupStore(file_engine, ttl=60)
+
+
+def test_dedup_store__should_claim_once_concurrently(shared_store: DedupStore) -> None:
+    store = shared_store
+    with ThreadPoolExecutor(10) as pool:
+        claims = list(pool.map(lambda _: store.claim("k1"), range(50)))
+    assert claims.count(True) == 1
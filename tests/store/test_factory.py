@@ -0,0 +1,95 @@
+from collections.abc import Generator
+from datetime import datetime
+
+import pytest
+from _pytest.fixtures import FixtureRequest
+
+from models import Rotation, Schedule, Shift, Temporal
+from store.factory import InMemoryStoreFactory, SQLStoreFactory, StoreFactory
+from tests.conftest import engine
+
+
+@pytest.fixture(scope="function", params=["mem", "sql"])
+def factory(
+    request: FixtureRequest, clear_sqlmodel: Generator[None, None, None]
+) -> StoreFactory:
+    if request.param == "mem":
+        return InMemoryStoreFactory()
+    return SQLStoreFactory(engine)
+
+
+def rotation(id: str) -> Rotation:
+    return Rotation(
+        id=id,
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["usr_1", "usr_2"],
+        start_date=datetime(2025, 1, 1),
+    )
+
+
+def shift(id: str, firefighter: str, start: int, end: int) -> Shift:
+    return Shift(
+        id=id,
+        firefighter=firefighter,
+        start_date=datetime(2025, 1, start),
+        end_date=datetime(2025, 1, end),
+    )
+
+
+def ids(shifts: list[tuple[str, Shift]]) -> list[tuple[str, str]]:
+    return [(rotation_id, s.id) for rotation_id, s in shifts]
+
+
+def test_factory__shifts_of__should_merge_rotations(factory: StoreFactory) -> None:
+    for r in (rotation("r0"), rotation("r1")):
+        factory.rotation().create(r)
+    # looked up before and after writes, the memory index is kept up to date
+    assert factory.shifts_of("usr_1", datetime(2025, 1, 2)) == []
+    factory.shifts(rotation("r0")).create_many(
+        [
+            shift("a", "usr_1", 1, 3),
+            shift("b", "usr_2", 3, 5),
+            shift("c", "usr_1", 5, 7),
+        ]
+    )
+    factory.shifts(rotation("r1")).create_many(
+        [shift("d", "usr_2", 1, 2), shift("e", "usr_1", 2, 4)]
+    )
+
+    assert ids(factory.shifts_of("usr_1", datetime(2025, 1, 2))) == [
+        ("r0", "a"),
+        ("r1", "e"),
+        ("r0", "c"),
+    ]
+    # ended ones are skipped
+    assert ids(factory.shifts_of("usr_1", datetime(2025, 1, 3))) == [
+        ("r1", "e"),
+        ("r0", "c"),
+    ]
+    assert factory.shifts_of("usr_9", datetime(2025, 1, 2)) == []
+
+
+def test_factory__shifts_of__should_follow_writes(factory: StoreFactory) -> None:
+    for r in (rotation("r0"), rotation("r1")):
+        factory.rotation().create(r)
+    factory.shifts(rotation("r0")).create_many(
+        [shift("a", "usr_1", 1, 3), shift("b", "usr_2", 3, 5)]
+    )
+    factory.shifts(rotation("r1")).create_many([shift("c", "usr_1", 2, 4)])
+    assert ids(factory.shifts_of("usr_1", datetime(2025, 1, 1))) == [
+        ("r0", "a"),
+        ("r1", "c"),
+    ]
+
+    swapped = shift("b", "usr_1", 3, 5)
+    factory.shifts(rotation("r0")).update(shift("b", "usr_2", 3, 5), swapped)
+    assert ids(factory.shifts_of("usr_1", datetime(2025, 1, 1))) == [
+        ("r0", "a"),
+        ("r1", "c"),
+        ("r0", "b"),
+    ]
+    assert factory.shifts_of("usr_2", datetime(2025, 1, 1)) == []
+
+    factory.shifts(rotation("r0")).archive(datetime(2025, 1, 3), batch_size=10)
+    factory.rotation().delete("r1")
+    assert ids(factory.shifts_of("usr_1", datetime(2025, 1, 1))) == [("r0", "b")]
@@ -86,3 +86,54 @@ def test_rotation__get_by_date__should_return_none_if_not_exists(
     store: RotationStore,
 ) -> None:
     assert store.get_by_date(datetime(2026, 1, 1)) is None
+
+
+def test_rotation__update(store: RotationStore, rotations: list[Rotation]) -> None:
+    for r in rotations:
+        store.create(r)
+
+    updated = rotations[0].model_copy(update={"end_date": datetime(2030, 1, 1)})
+    store.update(updated)
+    assert store.get_by_id("id0") == updated.model_copy(update={"version": 1})
+
+
+def test_rotation__list_rolling(
+    store: RotationStore, rotations: list[Rotation]
+) -> None:
+    rotations[1].horizon_weeks = 4
+    for r in rotations:
+        store.create(r)
+
+    assert store.list_rolling() == [rotations[1]]
+
+
+def test_rotation__list__should_return_overlapping_rotations(
+    store: RotationStore, rotations: list[Rotation]
+) -> None:
+    for r in rotations:
+        store.create(r)
+
+    assert [r.id for r in store.list()] == ["id0", "id1", "id2"]
+    # id0 ends 2024-12-31, id1 ends 2025-06-01
+    assert [r.id for r in store.list(datetime(2025, 1, 1), datetime(2025, 2, 1))] == [
+        "id1"
+    ]
+    assert [r.id for r in store.list(dt_to=datetime(2024, 6, 1))] == ["id0"]
+
+
+def test_rotation__delete__should_hide_rotation(
+    store: RotationStore, rotations: list[Rotation]
+) -> None:
+    for r in rotations:
+        store.create(r)
+
+    assert store.delete("id1")
+    assert not store.delete("id1")
+    assert not store.delete("unknown")
+
+    assert store.get_by_id("id1") is None
+    # id0 overlaps, id1 would be the closest one
+    rotation = store.get_by_date(datetime(2024, 7, 1))
+    assert rotation
+    assert rotation.id == "id0"
+    assert [r.id for r in store.list()] == ["id0", "id2"]
@@ -0,0 +1,151 @@
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine
+from sqlmodel import SQLModel
+
+from models import Rotation, Schedule, Temporal
+from service.oncall import OncallService
+from store.factory import SQLStoreFactory
+from store.sa import (
+    EngineRouter,
+    create_sa_engine,
+    global_engine,
+    global_replica,
+    global_router,
+)
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def sqlite_file(path: Path) -> Engine:
+    engine = create_sa_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture()
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture()
+def factory(tmp_path: Path, clock: Clock) -> SQLStoreFactory:
+    # replica is never synced, so reads show which engine served them
+    router = EngineRouter(
+        sqlite_file(tmp_path / "primary.db"),
+        sqlite_file(tmp_path / "replica.db"),
+        sticky=10,
+        clock=clock,
+    )
+    return SQLStoreFactory(router)
+
+
+@pytest.fixture()
+def rotation() -> Rotation:
+    return Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.week),
+        fighters=["f1", "f2"],
+        start_date=dt.datetime(2025, 1, 1),
+        end_date=dt.datetime(2025, 2, 1),
+    )
+
+
+def test_sql_factory__should_read_own_writes(
+    factory: SQLStoreFactory, rotation: Rotation, clock: Clock
+) -> None:
+    OncallService(factory.for_user("U1")).create_rotation(rotation)
+    now = dt.datetime(2025, 1, 10, tzinfo=dt.UTC)
+
+    # writer reads from primary
+    assert OncallService(factory.for_user("U1")).get_current_shift(now) is not None
+    # others read from (stale) replica
+    assert OncallService(factory.for_user("U2")).get_current_shift(now) is None
+    assert OncallService(factory).get_current_shift(now) is None
+    # pinned reads are always consistent
+    assert OncallService(factory.primary()).get_current_shift(now) is not None
+
+    clock.now = 11
+    assert OncallService(factory.for_user("U1")).get_current_shift(now) is None
+
+
+def test_sql_factory__should_use_primary_without_replica(
+    tmp_path: Path, rotation: Rotation
+) -> None:
+    factory = SQLStoreFactory(sqlite_file(tmp_path / "primary.db"))
+    OncallService(factory).create_rotation(rotation)
+
+    assert factory.router.read is factory.engine
+    assert factory.rotation().get_by_id("id0") is not None
+
+
+def test_global_router__should_share_replica_engine(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("BOB_SQL__URL", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("BOB_SQL__READ_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+
+    def clear() -> None:
+        global_engine.cache_clear()
+        global_replica.cache_clear()
+        global_router.cache_clear()
+
+    clear()
+    try:
+        # routers derived per request don't create engines of their own
+        reads = {global_router().for_user(f"U{i}").read for i in range(3)}
+        assert reads == {global_replica()}
+    finally:
+        clear()
+
+
+def test_create_sa_engine__should_not_share_file_connections_between_threads(
+    tmp_path: Path,
+) -> None:
+    engine = sqlite_file(tmp_path / "bob.db")
+    svc = OncallService(SQLStoreFactory(engine))
+
+    def create(n: int) -> None:
+        svc.create_rotation(
+            Rotation(
+                id=f"r{n}",
+                schedule=Schedule(each=1, temporal=Temporal.day),
+                fighters=["f1", "f2"],
+                start_date=dt.datetime(2025, 1, 1),
+                end_date=dt.datetime(2025, 2, 1),
+            )
+        )
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(create, range(8)))
+
+    assert len(SQLStoreFactory(engine).rotation().list()) == 8
+
+
+def test_create_sa_engine__should_not_lock_reads(tmp_path: Path) -> None:
+    engine = sqlite_file(tmp_path / "bob.db")
+    router = EngineRouter(engine)
+    OncallService(SQLStoreFactory(router)).create_rotation(
+        Rotation(
+            id="r0",
+            schedule=Schedule(each=1, temporal=Temporal.day),
+            fighters=["f1", "f2"],
+            start_date=dt.datetime(2025, 1, 1),
+            end_date=dt.datetime(2025, 2, 1),
+        )
+    )
+    # read-only replica, a write lock can't be taken
+    replica = create_sa_engine(f"sqlite:///file:{tmp_path / 'bob.db'}?mode=ro&uri=true")
+
+    # reads go on while a write transaction holds the lock
+    with router.write.begin():
+        for read in (router.read, replica):
+            assert [r.id for r in SQLStoreFactory(read).rotation().list()] == ["r0"]
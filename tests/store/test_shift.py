@@ -1,12 +1,13 @@
 from collections.abc import Generator
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 from _pytest.fixtures import FixtureRequest
 
 from models import Rotation, Schedule, Shift, Temporal
-from store.shift import ShiftStore
+from store.shift import Cursor, ShiftStore
 from store.shift_mem import InMemoryShiftStore
+from store import shift_sql
 from store.shift_sql import SQLAlchemyShiftStore
 from tests.conftest import engine
 
@@ -203,3 +204,140 @@ def test_shift__list__should_return_shifts_by_date_with_limit(
             end_date=datetime(2025, 1, 7),
         ),
     ]
+
+
+@pytest.mark.parametrize(
+    ["cursor", "backward", "expected_ids"],
+    [
+        (Cursor(datetime(2025, 1, 1), "id0"), False, ["id1", "id2"]),
+        (Cursor(datetime(2025, 1, 3), "id1"), False, ["id2", "id00"]),
+        (Cursor(datetime(2025, 1, 7), "id00"), False, []),
+        (Cursor(datetime(2024, 1, 1), ""), False, ["id0", "id1"]),
+        (Cursor(datetime(2025, 1, 7), "id00"), True, ["id1", "id2"]),
+        (Cursor(datetime(2025, 1, 3), "id1"), True, ["id0"]),
+        (Cursor(datetime(2025, 1, 1), "id0"), True, []),
+    ],
+    ids=[
+        "next",
+        "next-last",
+        "next-after-last",
+        "next-before-first",
+        "prev",
+        "prev-first",
+        "prev-before-first",
+    ],
+)
+def test_shift__page(
+    store: ShiftStore,
+    shifts: list[Shift],
+    cursor: Cursor,
+    backward: bool,
+    expected_ids: list[str],
+) -> None:
+    for s in shifts:
+        store.create(s)
+
+    assert [s.id for s in store.page(cursor, limit=2, backward=backward)] == (
+        expected_ids
+    )
+
+
+def test_shift__page__should_stop_before_until(
+    store: ShiftStore, shifts: list[Shift]
+) -> None:
+    for s in shifts:
+        store.create(s)
+
+    cursor = Cursor(datetime(2025, 1, 1), "")
+    assert [s.id for s in store.page(cursor, 5, until=datetime(2025, 1, 5))] == [
+        "id0",
+        "id1",
+    ]
+    assert [s.id for s in store.page(cursor, 1, until=datetime(2025, 1, 5))] == ["id0"]
+
+
+def test_shift__page__should_break_ties_by_id(store: ShiftStore) -> None:
+    for shift_id in ["b", "a", "c"]:
+        store.create(
+            Shift(
+                id=shift_id,
+                firefighter="usr_1",
+                start_date=datetime(2025, 1, 1),
+                end_date=datetime(2025, 1, 2),
+            )
+        )
+
+    assert [s.id for s in store.page(Cursor(datetime(2025, 1, 1), "a"), 5)] == [
+        "b",
+        "c",
+    ]
+
+
+def test_shift__create_many__should_merge_with_stored_shifts(
+    store: ShiftStore, shifts: list[Shift]
+) -> None:
+    store.create(shifts[2])
+    store.create_many([shifts[0], shifts[1], shifts[3]])
+    store.create_many([])
+
+    assert store.list() == shifts
+
+
+def test_shift__last(store: ShiftStore, shifts: list[Shift]) -> None:
+    assert store.last() is None
+    for s in shifts:
+        store.create(s)
+
+    assert store.last() == shifts[-1]
+
+
+def test_shift__durations__should_clip_shifts(
+    store: ShiftStore, shifts: list[Shift]
+) -> None:
+    for s in shifts:
+        store.create(s)
+
+    assert store.durations(datetime(2025, 1, 2), datetime(2025, 1, 8, 12)) == {
+        "usr_1": timedelta(days=2, hours=12),
+        "usr_2": timedelta(days=2),
+        "usr_3": timedelta(days=2),
+    }
+    assert store.durations(datetime(2025, 1, 4), datetime(2025, 1, 5)) == {
+        "usr_2": timedelta(days=1)
+    }
+    assert store.durations(datetime(2026, 1, 1), datetime(2026, 2, 1)) == {}
+
+
+def test_shift__durations__should_sum_clipped_shifts_for_other_dialects(
+    monkeypatch: pytest.MonkeyPatch,
+    clear_sqlmodel: Generator[None, None, None],
+    rotation: Rotation,
+    shifts: list[Shift],
+) -> None:
+    monkeypatch.setattr(shift_sql, "seconds_between", lambda *args: None)
+    store = SQLAlchemyShiftStoreTest(rotation)
+    store.create_many(shifts)
+    store.archive(datetime(2025, 1, 3), batch_size=10)
+
+    assert store.durations(datetime(2025, 1, 2), datetime(2025, 1, 8, 12)) == {
+        "usr_1": timedelta(days=2, hours=12),
+        "usr_2": timedelta(days=2),
+        "usr_3": timedelta(days=2),
+    }
+
+
+def test_shift__archive__should_keep_archived_shifts_in_durations(
+    store: ShiftStore, shifts: list[Shift]
+) -> None:
+    store.create_many(shifts)
+
+    assert store.archive(datetime(2025, 1, 5), batch_size=1) == 2
+    assert store.archive(datetime(2025, 1, 5), batch_size=1) == 0
+
+    assert store.list() == shifts[2:]
+    assert store.find(datetime(2025, 1, 2)) is None
+    assert store.durations(datetime(2025, 1, 2), datetime(2025, 1, 6)) == {
+        "usr_1": timedelta(days=1),
+        "usr_2": timedelta(days=2),
+        "usr_3": timedelta(days=1),
+    }
@@ -0,0 +1,130 @@
+import datetime as dt
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from models import Rotation, Schedule, Shift, Temporal
+from service.oncall import OncallService
+from store import snapshot
+from store.factory import InMemoryStoreFactory
+
+
+@pytest.fixture()
+def factory() -> InMemoryStoreFactory:
+    factory = InMemoryStoreFactory()
+    svc = OncallService(factory)
+    svc.create_rotation(
+        Rotation(
+            id="id0",
+            schedule=Schedule(each=1, temporal=Temporal.day),
+            fighters=["f1", "f2", "f3"],
+            start_date=dt.datetime(2025, 1, 1, 9),
+            timezone="America/New_York",
+        )
+    )
+    svc.create_rotation(
+        Rotation(
+            id="id1",
+            schedule=Schedule(each=1, temporal=Temporal.week),
+            fighters=["f3", "f4"],
+            start_date=dt.datetime(2026, 1, 1, 9),
+            horizon_weeks=4,
+        )
+    )
+    return factory
+
+
+def test_snapshot__should_restore_rotations_and_shifts(
+    factory: InMemoryStoreFactory, tmp_path: Path
+) -> None:
+    path = tmp_path / "bob.snapshot"
+    factory.save(path)
+
+    restored = InMemoryStoreFactory()
+    restored.restore(path)
+
+    for rotation in factory.rotation().list():
+        assert restored.rotation().get_by_id(rotation.id) == rotation
+        shifts = restored.shifts(rotation).list()
+        assert shifts == factory.shifts(rotation).list()
+        assert all(s.start_date.tzinfo is not None for s in shifts)
+
+    now = dt.datetime(2025, 3, 1, tzinfo=ZoneInfo("UTC"))
+    svc, restored_svc = OncallService(factory), OncallService(restored)
+    assert restored_svc.get_current_shift(now) == svc.get_current_shift(now)
+
+
+def test_snapshot__should_replace_file_atomically(
+    factory: InMemoryStoreFactory, tmp_path: Path
+) -> None:
+    path = tmp_path / "bob.snapshot"
+    factory.save(path)
+    previous = snapshot.load(path)
+
+    InMemoryStoreFactory().save(path)
+
+    # already loaded snapshot is still readable from the replaced file
+    assert len(previous[0][1]()) == 365
+    assert snapshot.load(path) == []
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_snapshot__should_copy_stores_before_serializing(
+    factory: InMemoryStoreFactory, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    dump = snapshot.dump
+    rotation = factory.rotation().get_by_id("id1")
+    assert rotation
+    shifts = factory.shifts(rotation)
+    late = Shift(
+        id="late",
+        firefighter="f4",
+        start_date=dt.datetime(2027, 1, 1, tzinfo=ZoneInfo("UTC")),
+        end_date=dt.datetime(2027, 1, 2, tzinfo=ZoneInfo("UTC")),
+    )
+
+    def write_then_dump(
+        path: str | Path, rotations: Iterable[tuple[Rotation, list[Shift]]]
+    ) -> None:
+        # handlers keep writing while the snapshot is serialized
+        writer = threading.Thread(target=shifts.create, args=(late,))
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        dump(path, rotations)
+
+    monkeypatch.setattr(snapshot, "dump", write_then_dump)
+    path = tmp_path / "bob.snapshot"
+    factory.save(path)
+
+    assert shifts.last() == late
+    [_, (_, load)] = snapshot.load(path)
+    assert late not in load()
+
+
+def test_snapshot__should_keep_naive_dates(tmp_path: Path) -> None:
+    rotation = Rotation(
+        id="id0",
+        schedule=Schedule(each=1, temporal=Temporal.day),
+        fighters=["f1"],
+        start_date=dt.datetime(2025, 1, 1),
+    )
+    shift = Shift(
+        id="s1",
+        firefighter="f1",
+        start_date=dt.datetime(2025, 1, 1, 0, 0, 0, 1),
+        end_date=dt.datetime(2025, 1, 2),
+    )
+    snapshot.dump(tmp_path / "s", [(rotation, [shift])])
+    [(_, load)] = snapshot.load(tmp_path / "s")
+    assert load() == [shift]
+
+
+def test_snapshot__should_reject_unknown_files(tmp_path: Path) -> None:
+    path = tmp_path / "s"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="Unsupported snapshot"):
+        snapshot.load(path)
@@ -0,0 +1,63 @@
+import datetime as dt
+from collections import Counter, defaultdict
+from itertools import pairwise
+
+from allocator import BalancedAllocator, RoundRobinAllocator
+
+FIGHTERS = [f"f{i}" for i in range(7)]
+
+
+def daily(days: int) -> list[tuple[dt.datetime, dt.datetime]]:
+    start = dt.datetime(2025, 1, 6, 9)  # Monday
+    return list(pairwise(start + dt.timedelta(days=i) for i in range(days + 1)))
+
+
+def weekend_shifts(
+    intervals: list[tuple[dt.datetime, dt.datetime]], fighters: list[str]
+) -> Counter[str]:
+    return Counter(f for (s, _), f in zip(intervals, fighters) if s.weekday() >= 5)
+
+
+def test_round_robin_allocator__should_cycle_fighters() -> None:
+    allocator = RoundRobinAllocator(fighters=["f1", "f2", "f3"])
+    assert list(allocator.assign(daily(5))) == ["f1", "f2", "f3", "f1", "f2"]
+
+
+def test_balanced_allocator__should_keep_order_on_equal_load() -> None:
+    allocator = BalancedAllocator(fighters=["f1", "f2", "f3"], weekend_weight=0)
+    assert list(allocator.assign(daily(5))) == ["f1", "f2", "f3", "f1", "f2"]
+
+
+def test_balanced_allocator__cost() -> None:
+    allocator = BalancedAllocator(
+        fighters=FIGHTERS,
+        holidays=frozenset({dt.date(2025, 1, 1)}),
+        weekend_weight=1,
+        holiday_weight=2,
+    )
+    # Fri 09:00 - Sat 09:00
+    assert allocator.cost(dt.datetime(2025, 1, 3, 9), dt.datetime(2025, 1, 4, 9)) == (
+        15 + 9 * 2
+    )
+    # Tue 12:00 - Wed (holiday) 12:00
+    assert allocator.cost(
+        dt.datetime(2024, 12, 31, 12), dt.datetime(2025, 1, 1, 12)
+    ) == (12 + 12 * 3)
+
+
+def test_balanced_allocator__should_spread_weekends() -> None:
+    intervals = daily(7 * 14)
+
+    round_robin = RoundRobinAllocator(fighters=FIGHTERS).assign(intervals)
+    # 7 fighters and daily shifts, the same 2 fighters take every weekend
+    assert len(weekend_shifts(intervals, list(round_robin))) == 2
+
+    allocator = BalancedAllocator(fighters=FIGHTERS, weekend_weight=1)
+    balanced = list(allocator.assign(intervals))
+    assert set(weekend_shifts(intervals, balanced)) == set(FIGHTERS)
+
+    load: defaultdict[str, float] = defaultdict(float)
+    for (start, end), fighter in zip(intervals, balanced):
+        load[fighter] += allocator.cost(start, end)
+    # greedy keeps loads within a single (weekend) shift cost
+    assert max(load.values()) - min(load.values()) <= 48
@@ -0,0 +1,31 @@
+from cache import TTLCache
+
+
+def test_ttl_cache__should_expire() -> None:
+    now = 0.0
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5, clock=lambda: now)
+    cache.set("a", 1)
+    now = 4.9
+    assert cache.get("a") == 1
+    now = 5
+    assert cache.get("a") is None
+
+
+def test_ttl_cache__should_evict_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_ttl_cache__add__should_set_only_missing_or_expired() -> None:
+    now = 0.0
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5, clock=lambda: now)
+    assert cache.add("a", 1)
+    assert not cache.add("a", 2)
+    assert cache.get("a") == 1
+    now = 5
+    assert cache.add("a", 3)
+    assert cache.get("a") == 3
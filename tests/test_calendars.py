@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from calendars import CalendarRegistry
+
+
+@pytest.fixture()
+def registry(tmp_path: Path) -> CalendarRegistry:
+    (tmp_path / "us.txt").write_text(
+        "# US holidays\n2025-01-01  # New Year's Day\n\n2025-01-20\n"
+    )
+    (tmp_path / "nl.txt").write_text("2025-04-27\n")
+    return CalendarRegistry(tmp_path)
+
+
+def test_calendar_registry__ids(registry: CalendarRegistry) -> None:
+    assert registry.ids() == ["nl", "us"]
+
+
+def test_calendar_registry__get__should_parse_holidays(
+    registry: CalendarRegistry,
+) -> None:
+    assert [str(h) for h in registry.get("us").holidays] == [
+        "2025-01-01",
+        "2025-01-20",
+    ]
+
+
+def test_calendar_registry__get__should_cache_by_id(
+    registry: CalendarRegistry,
+) -> None:
+    assert registry.get("us") is registry.get("us")
+    assert registry.get("us") is not registry.get("nl")
+
+
+@pytest.mark.parametrize("calendar_id", ["unknown", "../us", ""])
+def test_calendar_registry__get__should_raise_if_not_exists(
+    registry: CalendarRegistry, calendar_id: str
+) -> None:
+    with pytest.raises(ValueError):
+        registry.get(calendar_id)
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from slack_bolt import Ack, App, BoltRequest, BoltResponse
+from slack_bolt.authorization import AuthorizeResult
+
+from dedup import dedup_requests, request_key
+from store.dedup_mem import InMemoryDedupStore
+
+VIEW_BODY: dict[str, Any] = {
+    "type": "view_submission",
+    "team": {"id": "T1"},
+    "user": {"id": "U1", "team_id": "T1"},
+    "api_app_id": "A1",
+    "trigger_id": "t1",
+    "view": {
+        "id": "V1",
+        "type": "modal",
+        "callback_id": "view-test",
+        "state": {"values": {}},
+    },
+}
+EVENT_BODY = {
+    "type": "event_callback",
+    "team_id": "T1",
+    "api_app_id": "A1",
+    "event_id": "Ev1",
+    "event": {
+        "type": "app_mention",
+        "user": "U1",
+        "text": "hi",
+        "ts": "1.0",
+        "channel": "C1",
+    },
+}
+
+
+class Handled:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        with self._lock:
+            self.count += 1
+        time.sleep(self.delay)
+
+
+@pytest.fixture()
+def handled() -> Handled:
+    return Handled(delay=0.2)
+
+
+@pytest.fixture()
+def app(handled: Handled) -> App:
+    app = App(
+        signing_secret="secret",
+        # no auth.test calls
+        authorize=lambda: AuthorizeResult(
+            enterprise_id=None, team_id="T1", bot_token="xoxb-test", bot_user_id="UB"
+        ),
+        request_verification_enabled=False,
+    )
+    app.use(dedup_requests(InMemoryDedupStore(ttl=60, maxsize=100)))
+
+    @app.view("view-test")
+    def on_view(ack: Ack) -> None:
+        handled()
+        ack(response_action="clear")
+
+    @app.view("view-form")
+    def on_form(ack: Ack, body: dict[str, Any]) -> None:
+        handled()
+        if not body["view"]["state"]["values"]:
+            ack(response_action="errors", errors={"name": "Required"})
+            return
+        ack(response_action="clear")
+
+    @app.event("app_mention")
+    def on_mention(ack: Ack) -> None:
+        ack()
+        handled()
+
+    return app
+
+
+def dispatch(app: App, body: dict[str, Any], retry: int) -> BoltResponse:
+    headers: dict[str, str | Sequence[str]] = (
+        {"x-slack-retry-num": [str(retry)]} if retry else {}
+    )
+    return app.dispatch(BoltRequest(body=body, headers=headers, mode="socket_mode"))
+
+
+@pytest.mark.parametrize("body", [VIEW_BODY, EVENT_BODY], ids=["view", "event"])
+def test_dedup__should_handle_retry_storm_once(
+    app: App, handled: Handled, body: dict[str, Any]
+) -> None:
+    with ThreadPoolExecutor(20) as pool:
+        responses = list(pool.map(lambda i: dispatch(app, body, i), range(20)))
+
+    assert handled.count == 1
+    assert {r.status for r in responses} == {200}
+
+
+def test_dedup__should_replay_recorded_outcome(app: App, handled: Handled) -> None:
+    handled.delay = 0
+    first = dispatch(app, VIEW_BODY, 0)
+    retry = dispatch(app, VIEW_BODY, 1)
+
+    assert handled.count == 1
+    assert first.body == '{"response_action": "clear"}'
+    assert (retry.status, retry.body, retry.headers) == (
+        first.status,
+        first.body,
+        first.headers,
+    )
+
+
+def test_dedup__should_process_resubmission_after_errors(
+    app: App, handled: Handled
+) -> None:
+    handled.delay = 0
+    form = {**VIEW_BODY, "view": {**VIEW_BODY["view"], "callback_id": "view-form"}}
+    invalid = dispatch(app, form, 0)
+    values = {"name": {"name": {"type": "plain_text_input", "value": "ops"}}}
+    valid = dispatch(
+        app, {**form, "view": {**form["view"], "state": {"values": values}}}, 0
+    )
+    retry = dispatch(app, form, 1)
+
+    assert handled.count == 2
+    assert '"errors"' in invalid.body
+    assert valid.body == '{"response_action": "clear"}'
+    # the accepted submission is recorded
+    assert retry.body == valid.body
+
+
+def test_dedup__should_handle_distinct_requests(app: App, handled: Handled) -> None:
+    handled.delay = 0
+    dispatch(app, EVENT_BODY, 0)
+    dispatch(app, {**EVENT_BODY, "event_id": "Ev2"}, 0)
+    assert handled.count == 2
+
+
+def test_request_key() -> None:
+    assert request_key(VIEW_BODY) == "view:V1"
+    assert request_key(EVENT_BODY) == "event:Ev1"
+    action = {
+        "user": {"id": "U1"},
+        "actions": [{"action_ts": "2.0"}],
+        "trigger_id": "t",
+    }
+    assert request_key(action) == "action:U1:2.0"
+    assert request_key({"command": "/oncall", "trigger_id": "t2"}) == "trigger:t2"
+    assert request_key({"type": "url_verification"}) is None
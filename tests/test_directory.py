@@ -0,0 +1,132 @@
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from directory import SlackDirectory
+from tests.slack_stub import Route, SlackStub, ok
+
+
+def user(user_id: str, **kwargs: Any) -> dict[str, Any]:
+    return {
+        "id": user_id,
+        "name": user_id.lower(),
+        "tz": "Europe/Amsterdam",
+        "profile": {"display_name": f"name-{user_id}"},
+        **kwargs,
+    }
+
+
+def paged(key: str, items: list[Any]) -> Route:
+    """Cursor pagination: cursor is the offset of the next page."""
+
+    def route(params: dict[str, Any]) -> tuple[int, dict[str, str], dict[str, Any]]:
+        offset, limit = int(params.get("cursor") or 0), int(params["limit"])
+        next_offset = offset + limit
+        return (
+            200,
+            {},
+            {
+                "ok": True,
+                key: items[offset:next_offset],
+                "response_metadata": {
+                    "next_cursor": str(next_offset) if next_offset < len(items) else ""
+                },
+            },
+        )
+
+    return route
+
+
+@pytest.fixture()
+def stub() -> Generator[SlackStub, None, None]:
+    stub = SlackStub().start()
+    stub.route("conversations.members", paged("members", ["U1", "U2", "U3"]))
+    stub.route("users.info", lambda p: (200, {}, {"ok": True, "user": user(p["user"])}))
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture()
+def directory(stub: SlackStub) -> SlackDirectory:
+    return SlackDirectory(
+        WebClient(token="xoxb-test", base_url=stub.base_url),
+        page_size=2,
+        concurrency=3,
+    )
+
+
+def test_directory__members__should_page_and_cache(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    assert directory.members("C1") == ["U1", "U2", "U3"]
+    assert directory.members("C1") == ["U1", "U2", "U3"]
+    assert stub.calls["conversations.members"] == 2  # 2 pages, once
+
+
+def test_directory__user__should_cache(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    profile = directory.user("U1")
+    assert (profile.name, profile.tz) == ("name-U1", "Europe/Amsterdam")
+    assert directory.user("U1") is profile
+    assert stub.calls["users.info"] == 1
+
+
+def test_directory__user__should_deduplicate_concurrent_lookups(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    stub.delay = 0.2
+    with ThreadPoolExecutor(10) as pool:
+        profiles = list(pool.map(lambda _: directory.user("U1"), range(10)))
+
+    assert {p.id for p in profiles} == {"U1"}
+    assert stub.calls["users.info"] == 1
+
+
+def test_directory__users__should_lookup_missing_users_only(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    directory.user("U1")
+    profiles = directory.users(["U1", "U2", "U3", "U2", "U4"])
+
+    assert list(profiles) == ["U1", "U2", "U3", "U4"]
+    assert stub.calls["users.info"] == 4
+    assert stub.calls["users.list"] == 0
+
+
+def test_directory__users__should_bound_concurrent_lookups(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, max
+
+    def users_info(
+        params: dict[str, Any],
+    ) -> tuple[int, dict[str, str], dict[str, Any]]:
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return 200, {}, {"ok": True, "user": user(params["user"])}
+
+    stub.route("users.info", users_info)
+    directory.users([f"U{i}" for i in range(9)])
+
+    assert stub.calls["users.info"] == 9
+    assert 1 < in_flight[1] <= 3
+
+
+def test_directory__should_raise_api_errors(
+    directory: SlackDirectory, stub: SlackStub
+) -> None:
+    stub.route("conversations.members", ok({"ok": False, "error": "not_in_channel"}))
+    with pytest.raises(SlackApiError, match="not_in_channel"):
+        directory.members("C1")
@@ -0,0 +1,82 @@
+import datetime as dt
+from collections.abc import Iterable
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from feed import FeedApp
+from models import Rotation, Schedule, Temporal
+from service.oncall import OncallService
+from store.factory import InMemoryStoreFactory
+
+
+class Response:
+    status: str
+    headers: dict[str, str]
+    body: bytes
+
+    def __init__(self, app: FeedApp, path: str, **environ: str) -> None:
+        path, _, query = path.partition("?")
+        env = {"PATH_INFO": path, "QUERY_STRING": query, **environ}
+        setup_testing_defaults(env)
+        body: Iterable[bytes] = app(env, self.start_response)
+        self.body = b"".join(body)
+
+    def start_response(
+        self, status: str, headers: list[tuple[str, str]], exc_info: Any = None
+    ) -> Any:
+        self.status = status
+        self.headers = dict(headers)
+
+
+@pytest.fixture()
+def app() -> FeedApp:
+    store_factory = InMemoryStoreFactory()
+    OncallService(store_factory).create_rotation(
+        Rotation(
+            id="id0",
+            schedule=Schedule(each=1, temporal=Temporal.week),
+            fighters=["f1", "f2"],
+            start_date=dt.datetime(2025, 1, 1),
+        )
+    )
+    return FeedApp(store_factory, token="secret")
+
+
+def test_feed__should_return_calendar(app: FeedApp) -> None:
+    resp = Response(app, "/ics/id0.ics?token=secret")
+    assert resp.status == "200 OK"
+    assert resp.headers["Content-Type"].startswith("text/calendar")
+    assert resp.body.count(b"BEGIN:VEVENT") == 52
+
+
+def test_feed__should_return_not_modified_if_etag_matches(app: FeedApp) -> None:
+    etag = Response(app, "/ics/id0.ics?token=secret&user=f1").headers["ETag"]
+
+    resp = Response(app, "/ics/id0.ics?token=secret&user=f1", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status == "304 Not Modified"
+    assert resp.body == b""
+
+    resp = Response(app, "/ics/id0.ics?token=secret", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status == "200 OK"
+
+    # archived shifts leave the feed
+    OncallService(app.store_factory).compact(
+        dt.timedelta(days=7), batch_size=10, now=dt.datetime(2025, 2, 1, tzinfo=dt.UTC)
+    )
+    resp = Response(app, "/ics/id0.ics?token=secret&user=f1", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status == "200 OK"
+
+
+@pytest.mark.parametrize(
+    ["path", "status"],
+    [
+        ("/ics/id0.ics", "403 Forbidden"),
+        ("/ics/id0.ics?token=wrong", "403 Forbidden"),
+        ("/ics/unknown.ics?token=secret", "404 Not Found"),
+        ("/other?token=secret", "404 Not Found"),
+    ],
+)
+def test_feed__should_return_error(app: FeedApp, path: str, status: str) -> None:
+    assert Response(app, path).status == status
@@ -0,0 +1,28 @@
+import threading
+
+from jobs import PeriodicJob
+
+
+def test_periodic_job__should_run_until_stopped() -> None:
+    runs = threading.Semaphore(0)
+
+    def fn() -> None:
+        runs.release()
+        raise RuntimeError("failed runs don't stop the job")
+
+    job = PeriodicJob("test", 0.01, fn)
+    job.start()
+    assert all(runs.acquire(timeout=1) for _ in range(3))
+    job.stop()
+    job.join(timeout=1)
+    assert not job.is_alive()
+
+
+def test_periodic_job__should_wait_initial_delay() -> None:
+    runs = threading.Semaphore(0)
+    job = PeriodicJob("test", 0.01, runs.release, delay=60)
+    job.start()
+    assert not runs.acquire(timeout=0.1)
+    job.stop()
+    job.join(timeout=1)
+    assert not job.is_alive()
@@ -0,0 +1,85 @@
+import datetime as dt
+
+from layers import Segment, Timeline, sweep
+from models import Shift
+
+
+def shift(firefighter: str, start: int, end: int) -> Shift:
+    """Shift between hours of 2025-01-01."""
+    day = dt.datetime(2025, 1, 1)
+    return Shift(
+        id=f"{firefighter}-{start}",
+        firefighter=firefighter,
+        start_date=day + dt.timedelta(hours=start),
+        end_date=day + dt.timedelta(hours=end),
+    )
+
+
+def hours(segments: list[Segment]) -> list[tuple[int, int, tuple[str | None, ...]]]:
+    day = dt.datetime(2025, 1, 1)
+    return [
+        (
+            (s.start - day) // dt.timedelta(hours=1),
+            (s.end - day) // dt.timedelta(hours=1),
+            tuple(shift.firefighter if shift else None for shift in s.shifts),
+        )
+        for s in segments
+    ]
+
+
+def test_sweep__should_merge_layers() -> None:
+    primary = [shift("p1", 0, 8), shift("p2", 8, 16)]
+    secondary = [shift("s1", 4, 12), shift("s2", 14, 20)]
+
+    assert hours(sweep([primary, secondary])) == [
+        (0, 4, ("p1", None)),
+        (4, 8, ("p1", "s1")),
+        (8, 12, ("p2", "s1")),
+        (12, 14, ("p2", None)),
+        (14, 16, ("p2", "s2")),
+        (16, 20, (None, "s2")),
+    ]
+
+
+def test_sweep__should_prefer_latest_started_shift_within_layer() -> None:
+    # follow-the-sun: eu hands off to us and back, gap at night
+    layer = [shift("eu", 0, 12), shift("us", 8, 20), shift("eu2", 18, 22)]
+
+    assert hours(sweep([layer])) == [
+        (0, 8, ("eu",)),
+        (8, 18, ("us",)),
+        (18, 22, ("eu2",)),
+    ]
+    assert hours(sweep([[shift("a", 0, 4), shift("b", 6, 8)]])) == [
+        (0, 4, ("a",)),
+        (6, 8, ("b",)),
+    ]
+
+
+def test_sweep__should_fall_back_to_covering_shift() -> None:
+    # short override on top of a long shift
+    layer = [shift("long", 0, 24), shift("override", 6, 10)]
+
+    assert hours(sweep([layer])) == [
+        (0, 6, ("long",)),
+        (6, 10, ("override",)),
+        (10, 24, ("long",)),
+    ]
+    assert sweep([]) == []
+    assert sweep([[], []]) == []
+
+
+def test_timeline__at() -> None:
+    timeline = Timeline.of(
+        {2: [shift("t1", 0, 24)], 0: [shift("p1", 0, 8), shift("p2", 10, 24)]}
+    )
+    at = dt.datetime(2025, 1, 1, 9)
+
+    assert timeline.layers == [0, 2]
+    assert {k: s.firefighter for k, s in timeline.at(at).items()} == {2: "t1"}
+    assert list(timeline.at(at + dt.timedelta(hours=2))) == [0, 2]
+    assert timeline.at(at - dt.timedelta(days=1)) == {}
+    assert timeline.at(at + dt.timedelta(days=1)) == {}
+
+    clipped = timeline.clip(at, at + dt.timedelta(hours=2))
+    assert [(s.start.hour, s.end.hour) for s in clipped.segments] == [(9, 10), (10, 11)]
@@ -0,0 +1,34 @@
+import logging
+
+import pytest
+
+from logs import BodySampler, StructuredMessage
+
+
+class Unrenderable:
+    def __repr__(self) -> str:
+        raise AssertionError("should not be rendered")
+
+
+def test_structured_message__should_render_kwargs_as_json() -> None:
+    assert str(StructuredMessage("request", id="id0", n=1)) == (
+        'request {"id": "id0", "n": 1}'
+    )
+
+
+def test_structured_message__should_not_render_below_level(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    caplog.set_level(logging.INFO)
+    logging.getLogger("test").debug(StructuredMessage("request", body=Unrenderable()))
+    logging.getLogger("test").debug("shift=%s", Unrenderable())
+    assert caplog.records == []
+
+
+@pytest.mark.parametrize(
+    ["rate", "expected"],
+    [(0.0, False), (-1.0, False), (1.0, True), (2.0, True)],
+)
+def test_body_sampler__should_respect_bounds(rate: float, expected: bool) -> None:
+    sample = BodySampler(rate)
+    assert all(sample() is expected for _ in range(100))
@@ -0,0 +1,180 @@
+import time
+from collections.abc import Callable, Generator
+from typing import Any
+
+import pytest
+from slack_sdk import WebClient
+
+from outbound import Dispatcher, Limit, TokenBucket
+from tests.slack_stub import Route, SlackStub, ok
+
+
+def ratelimited(times: int, retry_after: int = 1) -> Route:
+    """429 for the first `times` calls."""
+    calls = 0
+
+    def route(params: dict[str, Any]) -> tuple[int, dict[str, str], dict[str, Any]]:
+        nonlocal calls
+        calls += 1
+        if calls <= times:
+            return (
+                429,
+                {"Retry-After": str(retry_after)},
+                {"ok": False, "error": "ratelimited"},
+            )
+        return 200, {}, {"ok": True}
+
+    return route
+
+
+class FakeClock:
+    """Dispatcher clock moved by the test, sends are timed in its seconds."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def timed(route: Route, clock: FakeClock, sent: list[tuple[float, str]]) -> Route:
+    def timed_route(
+        params: dict[str, Any],
+    ) -> tuple[int, dict[str, str], dict[str, Any]]:
+        sent.append((clock.now, params["channel"]))
+        return route(params)
+
+    return timed_route
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def stub() -> Generator[SlackStub, None, None]:
+    stub = SlackStub().start()
+    yield stub
+    stub.stop()
+
+
+def dispatcher(stub: SlackStub, **kwargs: Any) -> Dispatcher:
+    return Dispatcher(WebClient(token="xoxb-test", base_url=stub.base_url), **kwargs)
+
+
+def posted(stub: SlackStub) -> list[dict[str, Any]]:
+    return [params for method, params in stub.requests if method == "chat.postMessage"]
+
+
+def test_token_bucket() -> None:
+    bucket = TokenBucket(rate=1, burst=2, now=0)
+    assert bucket.take(0)
+    assert bucket.take(0)
+    assert not bucket.take(0)
+    assert bucket.wait(0) == 1
+    assert bucket.take(1)
+    # refilled up to burst only
+    assert bucket.take(10)
+    assert bucket.take(10)
+    assert not bucket.take(10)
+
+
+def test_token_bucket_pause() -> None:
+    bucket = TokenBucket(rate=1, burst=2, now=0)
+    bucket.pause(0, 5)
+    assert bucket.wait(3) == 2
+    # a single token after the pause
+    assert bucket.take(5)
+    assert not bucket.take(5)
+    assert bucket.take(6)
+
+
+def test_coalesce(stub: SlackStub) -> None:
+    outbound = dispatcher(stub)
+    outbound.post("C1", "a")
+    outbound.post("C1", "b")
+    outbound.post("C1", "c", thread_ts="1.0")
+    outbound.post("C2", "d")
+    assert outbound.flush(timeout=5)
+
+    assert sorted(
+        (p["channel"], p.get("thread_ts", ""), p["text"]) for p in posted(stub)
+    ) == [
+        ("C1", "", "a\nb"),
+        ("C1", "1.0", "c"),
+        ("C2", "", "d"),
+    ]
+    # not coalesced into sent messages
+    outbound.post("C1", "e")
+    assert outbound.flush(timeout=5)
+    assert posted(stub)[-1]["text"] == "e"
+
+
+def test_blocks_not_coalesced(stub: SlackStub) -> None:
+    outbound = dispatcher(stub, coalesce_window=0)
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "x"}}]
+    outbound.post("C1", "a", blocks=blocks)
+    outbound.post("C1", "b", blocks=blocks)
+    assert outbound.flush(timeout=5)
+    assert [p["text"] for p in posted(stub)] == ["a", "b"]
+    assert posted(stub)[0]["blocks"] == blocks
+
+
+def test_rate_limit_per_channel(stub: SlackStub) -> None:
+    clock = FakeClock()
+    sent: list[tuple[float, str]] = []
+    stub.route("chat.postMessage", timed(ok({}), clock, sent))
+    limits = {"chat.postMessage": Limit(240, burst=1, per_channel=True)}
+    outbound = dispatcher(stub, limits=limits, coalesce_window=0, clock=clock)
+    blocks = [{"type": "divider"}]
+    for _ in range(4):
+        outbound.post("C1", "x", blocks=blocks)
+        outbound.post("C2", "x", blocks=blocks)
+
+    for n in range(2, 10, 2):
+        # nothing more is sent until the clock moves
+        assert wait_for(lambda: len(sent) >= n)
+        clock.now += 0.25
+    assert outbound.flush(timeout=5)
+    # 4/s per channel, channels don't wait on each other
+    assert sorted(sent) == [(0.25 * i, c) for i in range(4) for c in ["C1", "C2"]]
+
+
+def test_retry_after(stub: SlackStub) -> None:
+    clock = FakeClock()
+    sent: list[tuple[float, str]] = []
+    stub.route("chat.postMessage", timed(ratelimited(1), clock, sent))
+    outbound = dispatcher(stub, coalesce_window=0, clock=clock)
+    outbound.post("C1", "a")
+    while not outbound.flush(timeout=0.01):
+        clock.now += 0.25
+
+    [(first, _), (retried, _)] = sent
+    assert retried - first >= 1
+    assert posted(stub)[-1]["text"] == "a"
+
+
+def test_retries_exhausted(stub: SlackStub) -> None:
+    stub.route("reactions.add", ratelimited(10, retry_after=0))
+    limits = {"reactions.add": Limit(6000)}
+    outbound = dispatcher(stub, limits=limits, coalesce_window=0, max_retries=2)
+    outbound.call("reactions.add", channel="C1", timestamp="1.0", name="fire")
+    outbound.post("C1", "a")
+    assert outbound.flush(timeout=5)
+    # dropped after retries, other calls are sent
+    assert stub.calls["reactions.add"] == 3
+    assert stub.calls["chat.postMessage"] == 1
+
+
+def test_stop(stub: SlackStub) -> None:
+    outbound = dispatcher(stub)
+    outbound.post("C1", "a")
+    outbound.stop(timeout=5)
+    assert stub.calls["chat.postMessage"] == 1
+    with pytest.raises(RuntimeError):
+        outbound.post("C1", "b")
@@ -0,0 +1,133 @@
+import copy
+import datetime as dt
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from models import Allocation, Temporal
+from payloads import create_rotation_submission, view_errors
+
+BODY: dict[str, Any] = {
+    "type": "view_submission",
+    "user": {"id": "U0"},
+    "view": {
+        "id": "V1",
+        "callback_id": "view-oncall-create",
+        "blocks": [
+            {"type": "input", "block_id": "fighters_block"},
+            {"type": "actions", "block_id": "schedule_block"},
+            {"type": "input", "block_id": "rule_block"},
+            {"type": "actions", "block_id": "start_end_block"},
+        ],
+        "state": {
+            "values": {
+                "fighters_block": {
+                    "fighters_select": {
+                        "type": "multi_static_select",
+                        "selected_options": [{"value": "U1"}, {"value": "U2"}],
+                    }
+                },
+                "schedule_block": {
+                    "schedule_each_select": {"selected_option": {"value": "2"}},
+                    "schedule_temporal_select": {"selected_option": {"value": "bday"}},
+                    "schedule_allocation_select": {
+                        "selected_option": {"value": "balanced"}
+                    },
+                    "schedule_horizon_select": {"selected_option": {"value": "4"}},
+                },
+                "start_end_block": {
+                    "start_date_select": {"selected_date": "2025-01-01"},
+                    "start_time_select": {
+                        "selected_time": "09:30",
+                        "timezone": "Europe/Amsterdam",
+                    },
+                },
+            }
+        },
+    },
+}
+
+
+def test_create_rotation_submission() -> None:
+    rotation = create_rotation_submission.validate_python(BODY).to_rotation()
+
+    assert (rotation.schedule.each, rotation.schedule.temporal) == (2, Temporal.bday)
+    assert rotation.fighters == ["U1", "U2"]
+    assert rotation.start_date == dt.datetime(2025, 1, 1, 9, 30)
+    assert rotation.timezone == "Europe/Amsterdam"
+    assert rotation.allocation == Allocation.balanced
+    assert rotation.horizon_weeks == 4
+    assert rotation.layer == 0
+
+
+def test_create_rotation_submission__layer() -> None:
+    body = copy.deepcopy(BODY)
+    values = body["view"]["state"]["values"]
+    values["schedule_block"]["schedule_layer_select"] = {
+        "selected_option": {"value": "1"}
+    }
+
+    rotation = create_rotation_submission.validate_python(body).to_rotation()
+    assert rotation.layer == 1
+
+
+def test_create_rotation_submission__users_select_and_fixed_horizon() -> None:
+    body = copy.deepcopy(BODY)
+    values = body["view"]["state"]["values"]
+    values["fighters_block"]["fighters_select"] = {"selected_users": ["U3"]}
+    values["schedule_block"]["schedule_horizon_select"]["selected_option"] = {
+        "value": "0"
+    }
+
+    rotation = create_rotation_submission.validate_python(body).to_rotation()
+    assert rotation.fighters == ["U3"]
+    assert rotation.horizon_weeks is None
+
+
+def test_create_rotation_submission__should_report_errors_by_block() -> None:
+    body = copy.deepcopy(BODY)
+    values = body["view"]["state"]["values"]
+    values["schedule_block"]["schedule_temporal_select"]["selected_option"] = {
+        "value": "month"
+    }
+    values["fighters_block"]["fighters_select"] = {"selected_options": []}
+    del values["start_end_block"]["start_time_select"]["timezone"]
+
+    with pytest.raises(ValidationError) as e:
+        create_rotation_submission.validate_python(body)
+
+    # actions blocks can't show errors, they go to the input block above
+    errors = view_errors(e.value, body["view"]["blocks"])
+    assert set(errors) == {"fighters_block", "rule_block"}
+    assert "select at least one fighter" in errors["fighters_block"]
+
+
+def test_create_rotation_submission__rrule() -> None:
+    body = copy.deepcopy(BODY)
+    values = body["view"]["state"]["values"]
+    values["schedule_block"]["schedule_temporal_select"]["selected_option"] = {
+        "value": "rrule"
+    }
+    values["rule_block"] = {"schedule_rule_input": {"value": "FREQ=WEEKLY;BYDAY=MO"}}
+
+    rotation = create_rotation_submission.validate_python(body).to_rotation()
+    assert rotation.schedule.temporal == Temporal.rrule
+    assert rotation.schedule.rule == "FREQ=WEEKLY;BYDAY=MO"
+
+
+@pytest.mark.parametrize("rule", [None, "FREQ=MONTHLY"])
+def test_create_rotation_submission__should_report_rule_errors(
+    rule: str | None,
+) -> None:
+    body = copy.deepcopy(BODY)
+    values = body["view"]["state"]["values"]
+    values["schedule_block"]["schedule_temporal_select"]["selected_option"] = {
+        "value": "rrule"
+    }
+    values["rule_block"] = {"schedule_rule_input": {"value": rule}}
+
+    with pytest.raises(ValidationError) as e:
+        create_rotation_submission.validate_python(body)
+
+    assert set(view_errors(e.value, body["view"]["blocks"])) == {"rule_block"}
@@ -0,0 +1,106 @@
+import pstats
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from slack_bolt.util.utils import get_arg_names_of_callable
+
+from profiling import Profiler
+
+
+def busy(seconds: float) -> int:
+    n = 0
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        n += 1
+    return n
+
+
+def listener(body: dict[str, Any], ack: Any) -> int:
+    return busy(body["seconds"])
+
+
+def test_profiler__should_skip_when_off(tmp_path: Path) -> None:
+    profiler = Profiler(0, tmp_path)
+    wrapped = profiler.wrap(listener)
+    assert wrapped({"seconds": 0}, None) >= 0
+    assert profiler.calls == 0
+    assert profiler.dump() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiler__should_keep_listener_signature(tmp_path: Path) -> None:
+    # Bolt injects arguments by name
+    wrapped = Profiler(1, tmp_path).wrap(listener)
+    assert get_arg_names_of_callable(wrapped) == ["body", "ack"]
+
+
+def test_profiler__should_dump_stats_and_stacks(tmp_path: Path) -> None:
+    profiler = Profiler(1, tmp_path / "profiles", interval=0.001)
+    wrapped = profiler.wrap(listener)
+    for _ in range(2):
+        assert wrapped(body={"seconds": 0.05}, ack=None) > 0
+    assert profiler.calls == 2
+
+    stats_path, stacks_path = profiler.dump()
+    stats = pstats.Stats(str(stats_path))
+    functions = {name: stat for (_, _, name), stat in stats.stats.items()}  # type: ignore[attr-defined]
+    # primitive calls
+    assert functions["listener"][0] == 2
+    assert functions["busy"][0] == 2
+
+    stacks = dict(line.rsplit(" ", 1) for line in stacks_path.read_text().splitlines())
+    # rooted at the listener
+    assert all(stack.startswith("test_profiling.py:listener") for stack in stacks)
+    assert "test_profiling.py:listener;test_profiling.py:busy" in stacks
+    assert sum(map(int, stacks.values())) > 10
+
+
+def test_profiler__should_dump_after_interval(tmp_path: Path) -> None:
+    profiler = Profiler(1, tmp_path, dump_interval=0)
+    profiler.wrap(listener)({"seconds": 0}, None)
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".collapsed", ".pstats"]
+
+
+def test_profiler__should_profile_one_call_at_a_time(tmp_path: Path) -> None:
+    profiler = Profiler(1, tmp_path)
+    started, release = threading.Event(), threading.Event()
+
+    @profiler.wrap
+    def blocking(seconds: float) -> int:
+        started.set()
+        release.wait(5)
+        return busy(seconds)
+
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(blocking, 0)
+        assert started.wait(5)
+        # runs as is while the first call is profiled
+        assert profiler.wrap(listener)({"seconds": 0}, None) >= 0
+        release.set()
+        assert first.result() >= 0
+    assert profiler.calls == 1
+
+
+def test_profiler__should_not_fail_listener(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def broken(*args: Any) -> None:
+        raise TypeError("Cannot create or construct a pstats.Stats")
+
+    monkeypatch.setattr(pstats, "Stats", broken)
+    profiler = Profiler(1, tmp_path)
+    assert profiler.wrap(listener)({"seconds": 0}, None) >= 0
+    assert profiler.dump() == []
+
+
+def test_profiler__should_clamp_rate(tmp_path: Path) -> None:
+    profiler = Profiler(2, tmp_path)
+    assert profiler.rate == 1
+    profiler.rate = -1
+    assert profiler.rate == 0
+    profiler.rate = float("nan")
+    assert profiler.rate == 0
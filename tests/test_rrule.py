@@ -0,0 +1,93 @@
+import datetime as dt
+import itertools
+
+import pytest
+
+from rrule import Freq, Recurrence, RRule
+
+
+def take(
+    recurrence: Recurrence, n: int, t: dt.datetime | None = None
+) -> list[dt.datetime]:
+    return list(itertools.islice(recurrence.after(t or recurrence.start), n))
+
+
+def test_rrule__parse() -> None:
+    rule = RRule.parse(
+        "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;BYHOUR=10,18;BYMINUTE=30"
+    )
+    assert rule == RRule(
+        freq=Freq.WEEKLY, interval=2, byday=(0, 3), byhour=(10, 18), byminute=(30,)
+    )
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "",
+        "FREQ=MONTHLY",
+        "FREQ=WEEKLY;INTERVAL=0",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=DAILY;BYHOUR=24",
+        "FREQ=DAILY;COUNT=3",
+        "FREQ=DAILY;BYHOUR",
+    ],
+)
+def test_rrule__parse__should_reject_invalid_rules(rule: str) -> None:
+    with pytest.raises(ValueError):
+        RRule.parse(rule)
+
+
+def test_recurrence__weekdays_at_time() -> None:
+    # Wednesday
+    recurrence = Recurrence(
+        RRule.parse("FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=10"), dt.datetime(2025, 1, 1, 9)
+    )
+    assert take(recurrence, 4) == [
+        dt.datetime(2025, 1, 2, 10),
+        dt.datetime(2025, 1, 6, 10),
+        dt.datetime(2025, 1, 9, 10),
+        dt.datetime(2025, 1, 13, 10),
+    ]
+
+
+def test_recurrence__every_other_week_from_start() -> None:
+    recurrence = Recurrence(
+        RRule.parse("FREQ=WEEKLY;INTERVAL=2"), dt.datetime(2025, 1, 1, 9)
+    )
+    assert take(recurrence, 3) == [
+        dt.datetime(2025, 1, 1, 9),
+        dt.datetime(2025, 1, 15, 9),
+        dt.datetime(2025, 1, 29, 9),
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=DAILY",
+        "FREQ=DAILY;INTERVAL=3;BYHOUR=8,20",
+        "FREQ=WEEKLY;INTERVAL=2;BYDAY=WE,SU;BYHOUR=10;BYMINUTE=0,30",
+        "FREQ=WEEKLY;INTERVAL=5;BYDAY=MO",
+    ],
+)
+def test_recurrence__after_should_match_iteration_from_start(rule: str) -> None:
+    recurrence = Recurrence(RRule.parse(rule), dt.datetime(2025, 1, 3, 15, 45))
+    occurrences = take(recurrence, 200)
+    for t in [
+        dt.datetime(2024, 1, 1),
+        occurrences[17],
+        occurrences[17] + dt.timedelta(seconds=1),
+        dt.datetime(2025, 2, 11, 10, 15),
+        dt.datetime(2025, 3, 30, 23, 59),
+    ]:
+        expected = [o for o in occurrences if o >= t][:5]
+        assert take(recurrence, 5, t) == expected
+
+
+def test_recurrence__after_should_jump_far_ahead() -> None:
+    recurrence = Recurrence(RRule.parse("FREQ=DAILY;BYHOUR=9"), dt.datetime(1900, 1, 1))
+    assert take(recurrence, 1, dt.datetime(9000, 1, 1, 10)) == [
+        dt.datetime(9000, 1, 2, 9)
+    ]
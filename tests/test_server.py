@@ -0,0 +1,69 @@
+import io
+import json
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+from slack_bolt import Ack, App
+from slack_bolt.authorization import AuthorizeResult
+
+from config import ServerConfig
+from server import BoltServer
+
+
+def make_app() -> App:
+    app = App(
+        signing_secret="secret",
+        # no auth.test calls
+        authorize=lambda: AuthorizeResult(
+            enterprise_id=None, team_id="T1", bot_token="xoxb-test", bot_user_id="UB"
+        ),
+        request_verification_enabled=False,
+    )
+
+    @app.view("view-test")
+    def on_view(ack: Ack) -> None:
+        ack(response_action="clear")
+
+    return app
+
+
+def test_bolt_server__should_apply_config() -> None:
+    server = BoltServer(
+        make_app(),
+        ServerConfig(workers=3, threads=2, keepalive=7, graceful_timeout=11),
+        port=3333,
+    )
+
+    assert server.cfg.bind == ["0.0.0.0:3333"]
+    assert (server.cfg.workers, server.cfg.threads) == (3, 2)
+    assert (server.cfg.keepalive, server.cfg.graceful_timeout) == (7, 11)
+    assert server.cfg.worker_class_str == "gthread"
+
+
+def test_bolt_server__should_serve_bolt_app_over_wsgi() -> None:
+    body = json.dumps(
+        {
+            "type": "view_submission",
+            "team": {"id": "T1"},
+            "user": {"id": "U1", "team_id": "T1"},
+            "api_app_id": "A1",
+            "view": {"id": "V1", "type": "modal", "callback_id": "view-test"},
+        }
+    ).encode()
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/slack/events",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+
+    handler = BoltServer(make_app(), ServerConfig(), port=3333).wsgi()
+    response = b"".join(
+        handler(environ, lambda status, headers: statuses.append(status))
+    )
+
+    assert statuses == ["200 OK"]
+    assert json.loads(response) == {"response_action": "clear"}
@@ -1,6 +1,9 @@
 import datetime as dt
+from pathlib import Path
 
-from shifter import BDayShifter
+from calendars import CalendarRegistry
+from models import Temporal
+from shifter import BDayShifter, RRuleShifter, Shifter
 
 
 def test_bdayshifter__should_skip_weekends() -> None:
@@ -26,3 +29,37 @@ def test_bdayshifter__should_start_on_first_bday_after_weekend() -> None:
         dt.datetime(2025, 1, 8),
         dt.datetime(2025, 1, 9),
     ]
+
+
+def test_bdayshifter__should_skip_holidays(tmp_path: Path) -> None:
+    (tmp_path / "us.txt").write_text("2025-01-01\n")
+    shifter = BDayShifter(
+        start_dt=dt.datetime(2024, 12, 30),
+        end_dt=dt.datetime(2025, 1, 12),
+        calendar=CalendarRegistry(tmp_path).get("us"),
+    )
+    assert list(shifter.get_index(2)) == [
+        dt.datetime(2024, 12, 30),
+        dt.datetime(2025, 1, 2),
+        dt.datetime(2025, 1, 6),
+        dt.datetime(2025, 1, 8),
+        dt.datetime(2025, 1, 10),
+    ]
+
+
+def test_rruleshifter__should_take_every_freq_occurrence() -> None:
+    shifter = Shifter.apply(
+        start_dt=dt.datetime(2025, 1, 1, 9),
+        end_dt=dt.datetime(2025, 1, 20, 10),
+        temporal=Temporal.rrule,
+        rule="FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=10",
+    )
+    assert list(shifter.get_index(2)) == [
+        dt.datetime(2025, 1, 2, 10),
+        dt.datetime(2025, 1, 9, 10),
+        dt.datetime(2025, 1, 16, 10),
+    ]
+    assert isinstance(shifter, RRuleShifter)
+    assert next(shifter.iter_after(dt.datetime(2025, 1, 14))) == dt.datetime(
+        2025, 1, 16, 10
+    )
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+# cumulative `import main` time, generous for slow CI runners (~0.4s locally)
+IMPORT_BUDGET_US = 1_500_000
+# loaded on first use only
+LAZY_MODULES = ["pandas", "numpy", "lenses", "feed"]
+
+SCRIPT = """
+import sys
+
+import slack_bolt.app.app
+
+# skip auth.test call in App constructor
+init = slack_bolt.app.app.App.__init__
+slack_bolt.app.app.App.__init__ = lambda self, *args, **kwargs: init(
+    self, *args, **kwargs, token_verification_enabled=False
+)
+
+import main
+from store.sa import global_engine
+
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+print(global_engine.cache_info().currsize)
+"""
+
+
+def import_main() -> tuple[list[str], int, dict[str, int]]:
+    env = os.environ | {
+        "PYTHONPATH": str(SRC),
+        "SLACK_BOT_TOKEN": "xoxb-test",
+        "SLACK_SIGNING_SECRET": "secret",
+        "BOB_IMPL": "sql",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(lazy=LAZY_MODULES)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded, engines = proc.stdout.splitlines()
+    # import time: self [us] | cumulative | imported package
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+    return [m for m in loaded.split(",") if m], int(engines), cumulative
+
+
+def test_startup__should_import_main_within_budget() -> None:
+    loaded, engines, cumulative = import_main()
+
+    assert loaded == []
+    assert engines == 0, "engine is created on first query"
+    assert cumulative["main"] < IMPORT_BUDGET_US, sorted(
+        cumulative.items(), key=lambda item: item[1]
+    )[-20:]
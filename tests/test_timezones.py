@@ -0,0 +1,32 @@
+import datetime as dt
+
+import pytest
+
+from timezones import date_formatter, get_timezone
+
+FMT = "%a, %Y-%m-%d %H:%M"
+
+
+@pytest.mark.parametrize(
+    ["date", "tz", "expected"],
+    [
+        # SQLite returns naive UTC datetimes
+        (dt.datetime(2025, 3, 8, 14), "America/New_York", "Sat, 2025-03-08 09:00"),
+        (dt.datetime(2025, 3, 10, 13), "America/New_York", "Mon, 2025-03-10 09:00"),
+        (
+            dt.datetime(2025, 3, 10, 13, tzinfo=dt.UTC),
+            "Europe/Amsterdam",
+            "Mon, 2025-03-10 14:00",
+        ),
+        (dt.datetime(2025, 1, 1, tzinfo=dt.UTC), "UTC", "Wed, 2025-01-01 00:00"),
+    ],
+    ids=["naive-est", "naive-edt", "aware", "utc"],
+)
+def test_date_formatter(date: dt.datetime, tz: str, expected: str) -> None:
+    assert date_formatter(tz, FMT)(date) == expected
+
+
+def test_date_formatter__should_cache_by_tz_and_format() -> None:
+    assert date_formatter("UTC", FMT) is date_formatter("UTC", FMT)
+    assert date_formatter("UTC", FMT) is not date_formatter("UTC", "%H:%M")
+    assert get_timezone("UTC") is get_timezone("UTC")